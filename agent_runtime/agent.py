@@ -29,6 +29,13 @@ class ExamTutorAgent:
         self.config = config
         self._system_prompt = self._load_system_prompt()
         self._mcp_tools: dict[str, Any] = {}
+        self._store: Any = None  # AsyncSessionStore behind the direct tools
+
+    def close(self) -> None:
+        """Close the direct tools' session store, committing answers still queued."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
 
     def _load_system_prompt(self) -> str:
         """Load the system prompt from file or use default."""
@@ -89,13 +96,13 @@ class ExamTutorAgent:
         import random
 
         sys.path.insert(0, str(Path(__file__).parent.parent / "mcp_server" / "src"))
-        from aws_exam_tools.exam_bank import ExamBank
-        from aws_exam_tools.session_store import SessionStore
-        from aws_exam_tools.tagging import infer_tags
+        from aws_exam_tools.exam_bank import QUESTION_FIELDS, ExamBank, bulk_request_error, project_question
+        from aws_exam_tools.session_store import AsyncSessionStore, SessionStore
+        from aws_exam_tools.snapshot import SNAPSHOT_FILENAME
         from aws_exam_tools.models import (
             ExamInfo, ExamListResponse, ExplanationResponse,
-            NextQuestionResponse, SessionStatusResponse,
-            StartSessionResponse, SubmitAnswerResponse,
+            KbSearchHit, KbSearchResponse, NextQuestionResponse, QuestionsResponse,
+            SessionStatusResponse, StartSessionResponse, SubmitAnswerResponse,
         )
 
         # Resolve question directory
@@ -109,9 +116,26 @@ class ExamTutorAgent:
         if not db_path:
             db_path = os.getenv("AWS_EXAM_DB_PATH", "./state/aws_exam.sqlite")
 
-        bank = ExamBank(Path(question_dir))
+        snapshot = os.getenv("AWS_EXAM_BANK_SNAPSHOT")
+        if snapshot is None:
+            snapshot_path: Path | None = Path(db_path).parent / SNAPSHOT_FILENAME
+        else:
+            snapshot_path = Path(snapshot) if snapshot else None
+
+        image = os.getenv("AWS_EXAM_BANK_IMAGE")
+
+        budget_mb = self.config.memory_budget_mb
+        bank = ExamBank(
+            Path(question_dir),
+            cache_path=snapshot_path,
+            lazy=self.config.lazy_load,
+            memory_budget_bytes=budget_mb * 1024 * 1024 if budget_mb > 0 else None,
+            workers=self.config.load_workers,
+            image_path=Path(image) if image else None,
+        )
         bank.load_all()
-        store = SessionStore(Path(db_path))
+        self.close()
+        store = self._store = AsyncSessionStore(SessionStore(Path(db_path), pool_size=self.config.db_pool_size))
 
         # Build tool functions that mirror the MCP server's async tools
 
@@ -124,40 +148,33 @@ class ExamTutorAgent:
 
         async def exam_start_session_tool(exam_id: str, mode: str = "learning", user_id: str | None = None) -> dict:
             total = bank.question_count(exam_id)
-            s = store.create(exam_id=exam_id, mode=mode, user_id=user_id)
+            s = await store.create(exam_id=exam_id, mode=mode, user_id=user_id)
             return StartSessionResponse(
                 session_id=s.session_id, exam_id=exam_id, mode=mode, total_questions=total,
             ).model_dump()
 
         async def exam_next_question_tool(session_id: str) -> dict:
-            s = store.load(session_id)
+            s = await store.load(session_id)
             total = bank.question_count(s.exam_id)
-            all_ids = set(bank.all_question_ids(s.exam_id))
-            seen_ids = set(s.asked_ids)
-            unseen_ids = all_ids - seen_ids
+            unseen_list = bank.unseen_question_ids(s.exam_id, s.asked_ids, skip_duplicates=s.mode != "exam")
 
-            if not unseen_ids:
+            if not unseen_list:
                 if s.mode == "exam":
                     return {"error": "exam_complete", "message": "All questions answered."}
-                unseen_ids = all_ids
+                unseen_list = bank.all_question_ids(s.exam_id)
 
-            unseen_list = list(unseen_ids)
             # Adaptive: bias toward weak tags
             if s.mode in ("learning", "practice"):
-                weak = store.weak_tags(session_id, min_asked=2, top_n=3)
+                weak = await store.weak_tags(session_id, min_asked=2, top_n=3)
                 if weak:
-                    candidates = []
-                    for qid in unseen_list:
-                        q = bank.get_question_by_id(qid)
-                        tags = infer_tags(q.question)
-                        if any(t in tags for t in weak):
-                            candidates.append(qid)
+                    unseen = set(unseen_list)
+                    candidates = [qid for qid in bank.question_ids_with_tags(s.exam_id, weak) if qid in unseen]
                     if candidates:
                         unseen_list = candidates
 
             chosen_id = random.choice(unseen_list)
             q = bank.get_question_by_id(chosen_id)
-            tags = infer_tags(q.question)
+            tags = list(q.tags)
             return NextQuestionResponse(
                 session_id=session_id, exam_id=s.exam_id, question_id=q.question_id,
                 question_number=len(s.asked_ids) + 1, total_questions=total,
@@ -168,7 +185,7 @@ class ExamTutorAgent:
             session_id: str, question_id: str,
             answer_text: str | None = None, answer_index: int | None = None,
         ) -> dict:
-            s = store.load(session_id)
+            s = await store.load(session_id)
             q = bank.get_question_by_id(question_id)
 
             # Normalize answer
@@ -179,14 +196,11 @@ class ExamTutorAgent:
             else:
                 raise ValueError("Provide answer_text or answer_index")
 
-            # Check correctness
-            correct = (
-                submitted.strip() == q.correct.strip()
-                or submitted.strip().lower() == q.correct.strip().lower()
-            )
+            # Check correctness against the answer key normalized at load
+            correct = submitted == q.correct or submitted.lower() == q.correct_key
 
-            tags = infer_tags(q.question)
-            store.record_answer(session_id=session_id, question_id=question_id, tags=tags, correct=correct)
+            tags = list(q.tags)
+            await store.record_answer(session_id=session_id, question_id=question_id, tags=tags, correct=correct)
 
             remediation: dict = {"tags": tags}
             if not correct:
@@ -213,27 +227,48 @@ class ExamTutorAgent:
             ).model_dump()
 
         async def session_get_status_tool(session_id: str) -> dict:
-            s = store.load(session_id)
-            total = bank.question_count(s.exam_id)
-            asked = len(s.asked_ids)
-            accuracy = (s.correct_count / asked) if asked else 0.0
+            st = await store.status(session_id)
+            total = bank.question_count(st.exam_id)
             return SessionStatusResponse(
-                session_id=session_id, exam_id=s.exam_id, mode=s.mode,
-                asked_count=asked, correct_count=s.correct_count,
-                incorrect_count=s.incorrect_count, accuracy=round(accuracy, 4),
-                weak_tags=store.weak_tags(session_id, min_asked=2, top_n=5),
-                strong_tags=store.strong_tags(session_id, min_asked=3, top_n=5),
-                remaining_questions=max(0, total - asked),
-                mastery_level=store.mastery_level(session_id),
+                session_id=session_id, exam_id=st.exam_id, mode=st.mode,
+                asked_count=st.asked_count, correct_count=st.correct_count,
+                incorrect_count=st.incorrect_count, accuracy=round(st.accuracy, 4),
+                weak_tags=list(st.weak_tags), strong_tags=list(st.strong_tags),
+                remaining_questions=max(0, total - st.asked_count),
+                mastery_level=st.mastery_level,
+            ).model_dump()
+
+        async def exam_get_questions_tool(question_ids: list[str], fields: list[str] | None = None) -> dict:
+            fields = list(QUESTION_FIELDS) if fields is None else fields
+            error = bulk_request_error(question_ids, fields)
+            if error is not None:
+                return error
+            found = bank.get_questions(question_ids, skip_missing=True)
+            found_ids = {q.question_id for q in found}
+            return QuestionsResponse(
+                questions=[project_question(q, fields) for q in found],
+                missing=[qid for qid in question_ids if qid not in found_ids],
             ).model_dump()
 
+        async def kb_search_tool(query: str, exam_id: str | None = None, limit: int = 5) -> dict:
+            results = []
+            for hit in bank.search(query, exam_id=exam_id, limit=max(1, min(limit, 50))):
+                q = bank.get_question_by_id(hit.question_id)
+                results.append(KbSearchHit(
+                    question_id=hit.question_id, exam_id=hit.exam_id, score=hit.score,
+                    question=q.question, correct_answer=q.correct, explanation=q.explanation,
+                ))
+            return KbSearchResponse(query=query, exam_id=exam_id, results=results).model_dump()
+
         self._mcp_tools = {
             "exam_list": exam_list_tool,
             "exam_start_session": exam_start_session_tool,
             "exam_next_question": exam_next_question_tool,
             "exam_submit_answer": exam_submit_answer_tool,
             "exam_get_explanation": exam_get_explanation_tool,
+            "exam_get_questions": exam_get_questions_tool,
             "session_get_status": session_get_status_tool,
+            "kb_search": kb_search_tool,
         }
         self._direct_mode = True
         logger.info("Loaded %d tools via direct import (no FastMCP)", len(self._mcp_tools))
@@ -403,4 +438,7 @@ async def main_interactive() -> None:
     logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler(sys.stderr)])
     config = load_config()
     agent = ExamTutorAgent(config)
-    await agent.run_interactive()
+    try:
+        await agent.run_interactive()
+    finally:
+        agent.close()
@@ -38,6 +38,12 @@ class AgentConfig:
     # Question bank path (for direct MCP server)
     question_dir: str = ""
     db_path: str = "./state/aws_exam.sqlite"
+    db_pool_size: int = 4  # pooled SQLite connections for the session store
+
+    # Question bank loading (lazy per-exam parsing with LRU eviction)
+    lazy_load: bool = False
+    memory_budget_mb: int = 0  # 0 = unlimited
+    load_workers: int = 1  # processes used to parse banks; 0 = one per CPU
 
 
 def load_config() -> AgentConfig:
@@ -61,4 +67,8 @@ def load_config() -> AgentConfig:
         port=int(os.getenv("AGENT_PORT", "8080")),
         question_dir=os.getenv("AWS_EXAM_QUESTION_DIR", ""),
         db_path=os.getenv("AWS_EXAM_DB_PATH", "./state/aws_exam.sqlite"),
+        db_pool_size=int(os.getenv("AWS_EXAM_DB_POOL_SIZE", "4")),
+        lazy_load=os.getenv("AWS_EXAM_LAZY_LOAD", "false").lower() == "true",
+        memory_budget_mb=int(os.getenv("AWS_EXAM_MEMORY_BUDGET_MB", "0")),
+        load_workers=int(os.getenv("AWS_EXAM_LOAD_WORKERS", "1")),
     )
@@ -14,10 +14,13 @@ Endpoints:
 """
 from __future__ import annotations
 
+import hashlib
 import json
+import mmap
 import os
 import random
 import re
+import struct
 import sys
 import uuid
 import urllib.error
@@ -34,56 +37,217 @@ OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "qwen2.5:3b")
 HOST = os.getenv("TUTOR_HOST", "0.0.0.0")
 PORT = int(os.getenv("TUTOR_PORT", "8081"))
 QUESTION_DIR = Path(os.getenv("AWS_EXAM_QUESTION_DIR", "./questions"))
+BANK_IMAGE = os.getenv("AWS_EXAM_BANK_IMAGE", "")
+TAG_SIDECAR_FILENAME = "question_tags.sidecar"  # tagsidecar.SIDECAR_FILENAME
 
 # ---------------------------------------------------------------------------
 # Tag inference (inline copy from tagging.py for self-containment)
 # ---------------------------------------------------------------------------
+# TAG_RULES must stay identical to tagging.TAG_RULES: the tag sidecar is
+# only used when its rules hash equals _TAG_RULES_HASH.
 TAG_RULES: list[tuple[str, list[str]]] = [
-    ("iam", [r"\bIAM\b", r"\bpolicy\b", r"\brole\b", r"\bpermission\b",
-             r"\bSTS\b", r"\bfederat", r"\bidentity\b", r"\baccess control\b"]),
-    ("vpc_networking", [r"\bVPC\b", r"\bsubnet\b", r"\brout(e|ing)\b", r"\bNACL\b",
-                        r"\bsecurity group\b", r"\bVPN\b", r"\bDirect Connect\b",
-                        r"\bTransit Gateway\b", r"\bPrivateLink\b"]),
-    ("s3_storage", [r"\bS3\b", r"\bbucket\b", r"\bobject storage\b", r"\bGlacier\b",
-                    r"\bversioning\b", r"\bstorage class\b"]),
-    ("ec2_compute", [r"\bEC2\b", r"\bAMI\b", r"\bAuto Scaling\b", r"\bELB\b",
-                     r"\bALB\b", r"\bNLB\b", r"\binstance\b", r"\bEBS\b"]),
-    ("serverless", [r"\bLambda\b", r"\bAPI Gateway\b", r"\bStep Functions\b",
-                    r"\bserverless\b", r"\bFargate\b"]),
-    ("containers", [r"\bECS\b", r"\bEKS\b", r"\bDocker\b", r"\bcontainer\b",
-                    r"\bKubernetes\b"]),
-    ("databases", [r"\bRDS\b", r"\bDynamoDB\b", r"\bAurora\b", r"\bElastiCache\b",
-                   r"\bRedshift\b", r"\bdatabase\b"]),
-    ("monitoring_logging", [r"\bCloudWatch\b", r"\bCloudTrail\b", r"\bX-Ray\b",
-                            r"\blog(s|ging)\b", r"\bmetric\b", r"\balarm\b"]),
-    ("security_encryption", [r"\bencrypt\b", r"\bKMS\b", r"\bHSM\b", r"\bWAF\b",
-                             r"\bShield\b", r"\bGuardDuty\b"]),
-    ("high_availability", [r"\bhigh availability\b", r"\bfailover\b", r"\bmulti-AZ\b",
-                           r"\brecovery\b", r"\bRPO\b", r"\bRTO\b"]),
-    ("cost_optimization", [r"\bcost\b", r"\bBudgets\b", r"\bpricing\b",
-                           r"\bfree tier\b", r"\bCost Explorer\b"]),
-    ("devops_cicd", [r"\bCodePipeline\b", r"\bCodeBuild\b", r"\bCloudFormation\b",
-                     r"\bCDK\b", r"\bElastic Beanstalk\b"]),
-    ("ml_ai", [r"\bSageMaker\b", r"\bmachine learning\b", r"\bML\b",
-               r"\bRekognition\b", r"\bComprehend\b"]),
-    ("messaging_integration", [r"\bSQS\b", r"\bSNS\b", r"\bKinesis\b",
-                               r"\bEventBridge\b", r"\bqueue\b"]),
-    ("content_delivery", [r"\bCloudFront\b", r"\bCDN\b", r"\bRoute\\s*53\b",
-                          r"\bDNS\b"]),
-    ("analytics", [r"\bAthena\b", r"\bGlue\b", r"\bEMR\b", r"\bQuickSight\b",
-                   r"\bdata lake\b"]),
-    ("migration", [r"\bmigrat\b", r"\bSnowball\b", r"\bDMS\b", r"\bDataSync\b"]),
+    # AWS Core Services
+    ("iam", [
+        r"\bIAM\b", r"\bpolicy\b", r"\brole\b", r"\bpermission\b",
+        r"\bSTS\b", r"\bfederat", r"\bidentity\b", r"\baccess control\b",
+        r"\bcredential\b", r"\bMFA\b", r"\bActive Directory\b",
+    ]),
+    ("vpc_networking", [
+        r"\bVPC\b", r"\bsubnet\b", r"\brout(e|ing)\b", r"\bNACL\b",
+        r"\bsecurity group\b", r"\bVPN\b", r"\bDirect Connect\b",
+        r"\bTransit Gateway\b", r"\bENI\b", r"\bElastic IP\b",
+        r"\bpeering\b", r"\bPrivateLink\b", r"\bNetwork Load\b",
+    ]),
+    ("s3_storage", [
+        r"\bS3\b", r"\bbucket\b", r"\bobject storage\b", r"\blifecycle\b",
+        r"\bGlacier\b", r"\bversioning\b", r"\bpre-signed\b",
+        r"\bstorage class\b", r"\bcross-region replication\b",
+    ]),
+    ("ec2_compute", [
+        r"\bEC2\b", r"\bAMI\b", r"\bAuto Scaling\b", r"\bELB\b",
+        r"\bALB\b", r"\bNLB\b", r"\binstance\b", r"\bplacement group\b",
+        r"\bspot\b", r"\breserved\b", r"\bdedicated\b", r"\bEBS\b",
+    ]),
+    ("serverless", [
+        r"\bLambda\b", r"\bAPI Gateway\b", r"\bStep Functions\b",
+        r"\bserverless\b", r"\bFargate\b", r"\bSAM\b",
+    ]),
+    ("containers", [
+        r"\bECS\b", r"\bEKS\b", r"\bDocker\b", r"\bcontainer\b",
+        r"\bKubernetes\b", r"\bECR\b",
+    ]),
+    ("databases", [
+        r"\bRDS\b", r"\bDynamoDB\b", r"\bAurora\b", r"\bElastiCache\b",
+        r"\bRedshift\b", r"\bNeptune\b", r"\bDocumentDB\b",
+        r"\bdatabase\b", r"\bMySQL\b", r"\bPostgre\b",
+    ]),
+    ("monitoring_logging", [
+        r"\bCloudWatch\b", r"\bCloudTrail\b", r"\bX-Ray\b",
+        r"\blog(s|ging)\b", r"\bmetric\b", r"\balarm\b", r"\bSNS\b",
+    ]),
+    ("security_encryption", [
+        r"\bencrypt\b", r"\bKMS\b", r"\bHSM\b", r"\bTLS\b",
+        r"\bSSL\b", r"\bsecret\b", r"\bWAF\b", r"\bShield\b",
+        r"\bGuardDuty\b", r"\bInspector\b", r"\bMacie\b",
+    ]),
+    ("high_availability", [
+        r"\bhigh availability\b", r"\bfailover\b", r"\bmulti-AZ\b",
+        r"\brecovery\b", r"\bRPO\b", r"\bRTO\b", r"\bresilien\b",
+        r"\bbackup\b", r"\bdisaster\b",
+    ]),
+    ("cost_optimization", [
+        r"\bbilling\b", r"\bcost\b", r"\bBudgets\b", r"\bSupport Plan\b",
+        r"\bpricing\b", r"\bfree tier\b", r"\bCost Explorer\b",
+        r"\bSavings Plan\b", r"\bReserved\b",
+    ]),
+    ("devops_cicd", [
+        r"\bCodePipeline\b", r"\bCodeBuild\b", r"\bCodeDeploy\b",
+        r"\bCodeCommit\b", r"\bCI/CD\b", r"\bCloudFormation\b",
+        r"\bCDK\b", r"\bTerraform\b", r"\bElastic Beanstalk\b",
+    ]),
+    ("ml_ai", [
+        r"\bSageMaker\b", r"\bmachine learning\b", r"\bML\b",
+        r"\bdeep learning\b", r"\bRekognition\b", r"\bComprehend\b",
+        r"\bPolly\b", r"\bLex\b", r"\bTranscribe\b", r"\bTranslate\b",
+        r"\bPersonalize\b", r"\bForecast\b", r"\bTextract\b",
+    ]),
+    ("messaging_integration", [
+        r"\bSQS\b", r"\bSNS\b", r"\bKinesis\b", r"\bEventBridge\b",
+        r"\bqueue\b", r"\bstream\b", r"\bmessag\b",
+    ]),
+    ("content_delivery", [
+        r"\bCloudFront\b", r"\bCDN\b", r"\bRoute\s*53\b",
+        r"\bDNS\b", r"\bedge\b", r"\bglobal accelerator\b",
+    ]),
+    ("analytics", [
+        r"\bAthena\b", r"\bGlue\b", r"\bEMR\b", r"\bQuickSight\b",
+        r"\bdata lake\b", r"\banalytic\b", r"\bRedshift\b",
+    ]),
+    ("migration", [
+        r"\bmigrat\b", r"\bSnowball\b", r"\bDMS\b", r"\bSMS\b",
+        r"\bTransfer Family\b", r"\bDataSync\b",
+    ]),
 ]
 
 
-def _infer_tags(text: str) -> list[str]:
-    tags = []
+def _compile_tag_rules():
+    """Compile TAG_RULES once (see tagging._compile).
+
+    Patterns starting with \\b and two literal characters are tried only at
+    word starts with that prefix; the rest are searched per tag.
+    """
+    dispatch: dict[str, list[tuple[str, re.Pattern]]] = {}
+    fallback: list[tuple[str, re.Pattern]] = []
     for tag, patterns in TAG_RULES:
+        by_prefix: dict[str, list[str]] = {}
+        other = []
         for pat in patterns:
-            if re.search(pat, text, re.IGNORECASE):
-                tags.append(tag)
-                break
-    return sorted(set(tags)) if tags else ["general"]
+            m = re.match(r"\\b([A-Za-z0-9][A-Za-z0-9-])(?![?*{])", pat)
+            if m and "|" not in re.sub(r"\([^()]*\)", "", pat):  # no top-level alternation
+                by_prefix.setdefault(m.group(1).lower(), []).append(pat[2:])
+            else:
+                other.append(pat)
+        for prefix, bodies in by_prefix.items():
+            matcher = re.compile("|".join(f"(?:{b})" for b in bodies), re.IGNORECASE)
+            dispatch.setdefault(prefix, []).append((tag, matcher))
+        if other:
+            fallback.append((tag, re.compile("|".join(f"(?:{p})" for p in other), re.IGNORECASE)))
+    return dispatch, fallback
+
+
+_WORD_START = re.compile(r"\b\w")
+_TAG_DISPATCH, _TAG_FALLBACK = _compile_tag_rules()
+_TAG_RULES_HASH = hashlib.sha256(
+    json.dumps(TAG_RULES, separators=(",", ":")).encode("utf-8")).hexdigest()[:16]
+
+
+def _infer_tags(text: str) -> list[str]:
+    found = set()
+    for m in _WORD_START.finditer(text):
+        pos = m.start()
+        for tag, matcher in _TAG_DISPATCH.get(text[pos:pos + 2].lower(), ()):
+            if tag not in found and matcher.match(text, pos):
+                found.add(tag)
+    for tag, matcher in _TAG_FALLBACK:
+        if tag not in found and matcher.search(text):
+            found.add(tag)
+    return sorted(found) if found else ["general"]
+
+
+# ---------------------------------------------------------------------------
+# Streaming JSON array reader (inline copy from jsonstream.py)
+# ---------------------------------------------------------------------------
+_JSON_WS = re.compile(r"[ \t\n\r]*")
+_JSON_DECODER = json.JSONDecoder()
+_JSON_AFTER_VALUE = frozenset(",] \t\n\r")
+
+
+def _iter_json_array(path: Path, chunk_size: int = 1 << 16):
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Keeps only a read buffer and the current element in memory instead of
+    the whole file text plus the parsed list. Non-array files yield nothing;
+    malformed JSON raises ValueError when reached.
+    """
+    with path.open(encoding="utf-8") as fh:
+        buf = fh.read(chunk_size)
+        pos = 0
+        eof = not buf
+
+        def refill() -> None:
+            nonlocal buf, pos, eof
+            chunk = fh.read(max(chunk_size, len(buf) - pos))
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip_ws() -> bool:
+            nonlocal pos
+            while True:
+                pos = _JSON_WS.match(buf, pos).end()
+                if pos < len(buf):
+                    return True
+                if eof:
+                    return False
+                refill()
+
+        if not skip_ws() or buf[pos] != "[":
+            return
+        pos += 1
+        if not skip_ws():
+            raise json.JSONDecodeError("Unterminated array", buf, pos)
+        if buf[pos] == "]":
+            pos += 1
+        else:
+            while True:
+                while True:
+                    try:
+                        value, end = _JSON_DECODER.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        refill()
+                        continue
+                    if not eof and (end == len(buf) or buf[end] not in _JSON_AFTER_VALUE):
+                        refill()  # a number may continue into the next chunk
+                        continue
+                    break
+                pos = end
+                yield value
+
+                if not skip_ws():
+                    raise json.JSONDecodeError("Unterminated array", buf, pos)
+                sep = buf[pos]
+                pos += 1
+                if sep == "]":
+                    break
+                if sep != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos - 1)
+                if not skip_ws():
+                    raise json.JSONDecodeError("Unterminated array", buf, pos)
+
+        if skip_ws():
+            raise json.JSONDecodeError("Extra data", buf, pos)
 
 
 # ---------------------------------------------------------------------------
@@ -91,6 +255,8 @@ def _infer_tags(text: str) -> list[str]:
 # ---------------------------------------------------------------------------
 _question_bank: dict[str, list[dict]] = {}
 _exam_titles: dict[str, str] = {}
+# exam_id -> tag -> indices of the questions carrying it
+_tag_index: dict[str, dict[str, list[int]]] = {}
 
 TITLE_MAP = {
     "SAA-C03": "AWS Solutions Architect Associate",
@@ -118,69 +284,235 @@ def load_question_bank():
     global _question_bank, _exam_titles
     _question_bank.clear()
     _exam_titles.clear()
+    _tag_index.clear()
 
     if not QUESTION_DIR.exists():
         print(f"[tutor] Warning: question dir not found: {QUESTION_DIR}", file=sys.stderr)
         return
 
+    mapped = _open_bank_image(Path(BANK_IMAGE)) if BANK_IMAGE else None
+    if BANK_IMAGE and mapped is None:
+        print(f"[tutor] Bank image {BANK_IMAGE} missing or stale; parsing JSON", file=sys.stderr)
+
+    sidecar = _read_tag_sidecar() if mapped is None else None
+
     for f in sorted(QUESTION_DIR.glob("*.json")):
         exam_id = f.stem
-        try:
-            data = json.loads(f.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            continue
-        if not isinstance(data, list):
-            continue
-
-        questions = []
-        for i, raw in enumerate(data):
-            if not isinstance(raw, dict):
-                continue
-            q_text = str(raw.get("question", "")).strip()
-            if q_text.startswith(": "):
-                q_text = q_text[2:].strip()
-            if not q_text:
-                continue
-            options = [str(o).strip() for o in raw.get("options", []) if str(o).strip()]
-            if not options:
+        if mapped is not None:
+            questions = mapped[exam_id]
+        else:
+            try:
+                questions = _parse_bank_file(f, sidecar.get(exam_id) if sidecar else None)
+            except ValueError:  # JSONDecodeError / UnicodeDecodeError
                 continue
 
-            correct_raw = str(raw.get("correct", "")).strip()
-            multi_select = not correct_raw
-
-            # Find correct indices
-            correct_indices = []
-            if correct_raw:
-                for ci, opt in enumerate(options):
-                    if opt.strip().lower() == correct_raw.strip().lower():
-                        correct_indices = [ci]
-                        break
-                if not correct_indices:
-                    for ci, opt in enumerate(options):
-                        if opt.strip().lower().startswith(correct_raw.strip().lower()[:50]):
-                            correct_indices = [ci]
-                            break
-
-            questions.append({
-                "index": i,
-                "question": q_text,
-                "options": options,
-                "correct": correct_raw,
-                "correct_indices": correct_indices,
-                "multi_select": multi_select,
-                "explanation": str(raw.get("explanation", "")).strip() or None,
-                "references": raw.get("references"),
-                "tags": _infer_tags(q_text),
-            })
-
         if questions:
             _question_bank[exam_id] = questions
             _exam_titles[exam_id] = _derive_title(exam_id)
+            tag_index: dict[str, list[int]] = {}
+            for idx, q in enumerate(questions):
+                for tag in q["tags"]:
+                    tag_index.setdefault(tag, []).append(idx)
+            _tag_index[exam_id] = tag_index
 
     total = sum(len(q) for q in _question_bank.values())
     print(f"[tutor] Loaded {total} questions from {len(_question_bank)} exams", file=sys.stderr)
 
 
+def _read_tag_sidecar() -> dict[str, dict[str, list[str]]] | None:
+    """Precomputed tags (exam_id -> question_id -> tags) from the tag sidecar.
+
+    None if it is missing, unreadable, or written under other rules; see
+    tagsidecar.py (python -m aws_exam_tools.tagsidecar writes it).
+    """
+    path = QUESTION_DIR / TAG_SIDECAR_FILENAME
+    try:
+        with path.open("rb") as fh:
+            data = json.load(fh)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        data = None
+    if (not isinstance(data, dict) or data.get("version") != 1
+            or data.get("tag_rules") != _TAG_RULES_HASH or not isinstance(data.get("exams"), dict)):
+        print(f"[tutor] Tag sidecar {path} is stale or unreadable; tagging questions live", file=sys.stderr)
+        return None
+    return data["exams"]
+
+
+# Field normalization: inline copies of exam_bank's, so questions parsed
+# here have the same shape as those read from the bank image
+def _parse_references(raw) -> list[str]:
+    if not raw:
+        return []
+    if isinstance(raw, list):
+        return [str(r).strip() for r in raw if str(r).strip()]
+    refs = re.split(r'\s+(?=https?://)', str(raw).strip())
+    return [r.strip() for r in refs if r.strip()]
+
+
+def _clean_explanation(raw) -> str | None:
+    explanation = str(raw).strip() if raw else ""
+    if explanation.startswith("Explanation "):
+        explanation = explanation[len("Explanation "):]
+    elif explanation.startswith("Explanation\n"):
+        explanation = explanation[len("Explanation\n"):]
+    return explanation or None
+
+
+def _find_correct_indices(options: list[str], correct: str) -> list[int]:
+    if not correct:
+        return []
+    correct_key = correct.lower()
+    option_keys = [opt.lower() for opt in options]
+    for i, key in enumerate(option_keys):
+        if key == correct_key:
+            return [i]
+    for i, key in enumerate(option_keys):
+        if key.startswith(correct_key[:50]) or correct_key.startswith(key[:50]):
+            return [i]
+    if len(correct) <= 2:
+        letter = correct.upper().rstrip(".")
+        for i, opt in enumerate(options):
+            if opt.upper().startswith(f"{letter}.") or opt.upper().startswith(f"{letter} "):
+                return [i]
+    return []
+
+
+def _parse_bank_file(path: Path, known_tags: dict[str, list[str]] | None = None) -> list[dict]:
+    exam_id = path.stem
+    questions = []
+    for i, raw in enumerate(_iter_json_array(path)):
+        if not isinstance(raw, dict):
+            continue
+        q_text = str(raw.get("question", "")).strip()
+        if q_text.startswith(": "):
+            q_text = q_text[2:].strip()
+        if not q_text:
+            continue
+        options = [str(o).strip() for o in raw.get("options", []) if str(o).strip()]
+        if not options:
+            continue
+
+        tags = None
+        if known_tags:
+            # Same question_id as exam_bank._question_id
+            digest = hashlib.sha256(f"{exam_id}{i}{q_text}".encode("utf-8")).hexdigest()[:12]
+            tags = known_tags.get(f"{exam_id}:{i}:{digest}")
+
+        correct_raw = str(raw.get("correct", "")).strip()
+        multi_select = not correct_raw
+        correct_indices = _find_correct_indices(options, correct_raw)
+
+        questions.append({
+            "index": i,
+            "question": q_text,
+            "options": options,
+            "correct": correct_raw,
+            "correct_indices": correct_indices,
+            "multi_select": multi_select,
+            "explanation": _clean_explanation(raw.get("explanation")),
+            "references": _parse_references(raw.get("references")),
+            "tags": tags if tags is not None else _infer_tags(q_text),
+            # Derived once here instead of per request
+            "keywords": frozenset(q_text.lower().split()),
+        })
+    return questions
+
+
+# ---------------------------------------------------------------------------
+# Shared bank image reader (minimal inline copy of bankimage.py)
+# ---------------------------------------------------------------------------
+# The MCP server / A2A agent write the image (AWS_EXAM_BANK_IMAGE); reading
+# it instead of the JSON files shares question text with them through the
+# page cache. Questions are decoded on access.
+_IMAGE_MAGIC = b"AWSXIMG1"
+_IMAGE_RECORD = struct.Struct("<IB8s16I")
+_IMAGE_REF = struct.Struct("<II")
+
+
+class _MappedBank:
+    """Read-only sequence of one exam's question dicts, backed by the image."""
+
+    def __init__(self, mm: mmap.mmap, records: int, refs: int, strings: int, first: int, count: int):
+        self._mm = mm
+        self._records = records + first * _IMAGE_RECORD.size
+        self._refs = refs
+        self._strings = strings
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def _str(self, off: int, length: int) -> str:
+        return self._mm[self._strings + off:self._strings + off + length].decode("utf-8")
+
+    def _refs_at(self, first: int, n: int) -> list[tuple[int, int]]:
+        return [_IMAGE_REF.unpack_from(self._mm, self._refs + (first + k) * _IMAGE_REF.size) for k in range(n)]
+
+    def __getitem__(self, i: int) -> dict:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        (index, flags, _digest, _id_off, _id_len, q_off, q_len, c_off, c_len, e_off, e_len,
+         o_first, o_n, r_first, r_n, t_first, t_n, ci_first, ci_n) = _IMAGE_RECORD.unpack_from(
+            self._mm, self._records + i * _IMAGE_RECORD.size)
+        q_text = self._str(q_off, q_len)
+        options = [self._str(*ref) for ref in self._refs_at(o_first, o_n)]
+        return {
+            "index": index,
+            "question": q_text,
+            "options": options,
+            "correct": self._str(c_off, c_len),
+            "correct_indices": [ref[0] for ref in self._refs_at(ci_first, ci_n)],
+            "multi_select": bool(flags & 1),
+            "explanation": self._str(e_off, e_len) if flags & 2 else None,
+            "references": [self._str(*ref) for ref in self._refs_at(r_first, r_n)],
+            "tags": [self._str(*ref) for ref in self._refs_at(t_first, t_n)],
+            "keywords": frozenset(q_text.lower().split()),
+        }
+
+
+def _open_bank_image(path: Path) -> dict[str, _MappedBank] | None:
+    """Map the bank image if it matches QUESTION_DIR (by size and mtime) and our tag rules."""
+    try:
+        with path.open("rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        if mm[:8] != _IMAGE_MAGIC:
+            raise ValueError("bad magic")
+        (header_len,) = struct.unpack_from("<Q", mm, 8)
+        header = json.loads(mm[16:16 + header_len].decode("utf-8"))
+        if header.get("version") != 1:
+            raise ValueError("unsupported version")
+        if header.get("tag_rules") != _TAG_RULES_HASH:
+            raise ValueError("written under other tag rules")
+        exams = header["exams"]
+        files = {f.stem: f.stat() for f in QUESTION_DIR.glob("*.json")}
+        if set(files) != set(exams) or any(
+            files[eid].st_size != e["source"]["size"] or files[eid].st_mtime_ns != e["source"]["mtime_ns"]
+            for eid, e in exams.items()
+        ):
+            raise ValueError("stale image")
+        records = 16 + header_len
+        refs = records + header["records_length"]
+        strings = refs + header["refs_length"]
+        return {
+            eid: _MappedBank(mm, records, refs, strings, e["first"], e["count"])
+            for eid, e in exams.items()
+        }
+    except (OSError, ValueError, KeyError, TypeError, struct.error):
+        mm.close()
+        return None
+
+
 # ---------------------------------------------------------------------------
 # Session store (in-memory)
 # ---------------------------------------------------------------------------
@@ -263,11 +595,9 @@ def _pick_adaptive_question(session: LearningSession) -> int | None:
 
     if weak_tags and unseen:
         # Find unseen questions matching weak tags
-        candidates = []
-        for idx in unseen:
-            q = session.questions[idx]
-            if any(t in weak_tags for t in q.get("tags", [])):
-                candidates.append(idx)
+        tag_index = _tag_index.get(session.exam_id, {})
+        tagged = set().union(*(tag_index.get(t, ()) for t in weak_tags))
+        candidates = sorted(tagged & unseen)
         if candidates:
             return random.choice(candidates)
 
@@ -332,12 +662,12 @@ def _ollama_generate(prompt: str, system: str = "", temperature: float = 0.7) ->
 
 def _build_related_context(exam_id: str, question: dict, max_related: int = 3) -> str:
     qs = _question_bank.get(exam_id, [])
-    keywords = set(question["question"].lower().split())
+    keywords = question["keywords"]
     scored = []
     for q in qs:
         if q["index"] == question["index"]:
             continue
-        overlap = len(keywords & set(q["question"].lower().split()))
+        overlap = len(keywords & q["keywords"])
         if overlap > 3:
             scored.append((overlap, q))
     scored.sort(key=lambda x: x[0], reverse=True)
@@ -477,7 +807,7 @@ class TutorHandler(BaseHTTPRequestHandler):
             return
 
         sid = str(uuid.uuid4())[:12]
-        questions = list(_question_bank[exam_id])  # shallow copy
+        questions = _question_bank[exam_id]  # read-only; may be image-backed
         session = LearningSession(
             session_id=sid,
             exam_id=exam_id,
@@ -317,3 +317,5 @@ def run_server(host: str = "0.0.0.0", port: int = 8080) -> None:
     except KeyboardInterrupt:
         logger.info("Shutting down.")
         server.server_close()
+    finally:
+        agent.close()
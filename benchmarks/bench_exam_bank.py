@@ -0,0 +1,495 @@
+"""Micro-benchmarks for the ExamBank question loader.
+
+Builds synthetic question banks of increasing size in a temp directory
+and times the hot paths used by the MCP tools.
+
+Usage:
+    python benchmarks/bench_exam_bank.py            # run all benchmarks
+    python benchmarks/bench_exam_bank.py lookup     # run one benchmark
+
+Benchmarks that read real banks default to the repository's questions/
+directory; override with --question-dir.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "mcp_server" / "src"))
+
+from aws_exam_tools.exam_bank import (  # noqa: E402
+    ExamBank, _count_exam_file, _parse_exam_file, _parse_question, _search_text,
+)
+from aws_exam_tools.jsonstream import iter_json_array  # noqa: E402
+from aws_exam_tools import tagging  # noqa: E402
+from aws_exam_tools.aho_corasick import KeywordTagger  # noqa: E402
+from aws_exam_tools.tagging import TAG_RULES, infer_tags  # noqa: E402
+from aws_exam_tools.tagscoring import TagScore, TagScorer, evaluate  # noqa: E402
+
+SERVICES = [
+    "S3", "EC2", "Lambda", "DynamoDB", "CloudFront", "IAM", "VPC", "KMS",
+    "SageMaker", "Kinesis", "Route 53", "Aurora", "EKS", "CloudWatch",
+]
+
+
+def _synthetic_question(i: int) -> dict:
+    svc = SERVICES[i % len(SERVICES)]
+    options = [f"{letter}. Use Amazon {SERVICES[(i + k) % len(SERVICES)]} option {i}"
+               for k, letter in enumerate("ABCD")]
+    return {
+        "question": f"Question {i}: a company wants to use {svc} to solve problem {i}. What should they do?",
+        "options": options,
+        "correct": options[i % 4],
+        "explanation": f"Explanation for {svc} question {i}.",
+        "references": f"https://docs.aws.amazon.com/{svc.lower()}/{i} https://aws.amazon.com/{i}",
+    }
+
+
+def write_bank(qdir: Path, exam_id: str, size: int) -> Path:
+    """Write a synthetic bank of `size` questions and return its path."""
+    qdir.mkdir(parents=True, exist_ok=True)
+    path = qdir / f"{exam_id}.json"
+    path.write_text(json.dumps([_synthetic_question(i) for i in range(size)]), encoding="utf-8")
+    return path
+
+
+def _timeit(fn, repeat: int) -> float:
+    """Return mean seconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_lookup(sizes: list[int]) -> None:
+    """get_question_by_id cost should stay flat as the bank grows."""
+    print("== lookup: get_question_by_id ==")
+    print(f"{'bank size':>10} {'us/lookup':>12}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            qdir = Path(tmp)
+            write_bank(qdir, "BENCH", size)
+            bank = ExamBank(qdir)
+            bank.load_all()
+            ids = bank.all_question_ids("BENCH")
+            rng = random.Random(0)
+            sample = [rng.choice(ids) for _ in range(2000)]
+            it = iter(sample * 10)
+            per_call = _timeit(lambda: bank.get_question_by_id(next(it)), len(sample) * 10)
+            print(f"{size:>10} {per_call * 1e6:>12.3f}")
+
+
+def bench_startup(question_dir: Path, repeat: int = 5) -> None:
+    """Cold (parse JSON) vs warm (load snapshot) ExamBank.load_all."""
+    print(f"== startup: load_all on {question_dir} ==")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp) / "question_bank.snapshot"
+
+        def cold() -> None:
+            cache.unlink(missing_ok=True)
+            ExamBank(question_dir, cache_path=cache).load_all()
+
+        def no_cache() -> None:
+            ExamBank(question_dir).load_all()
+
+        def warm() -> None:
+            ExamBank(question_dir, cache_path=cache).load_all()
+
+        def lazy_warm() -> None:
+            ExamBank(question_dir, cache_path=cache, lazy=True).load_all()
+
+        t_plain = _timeit(no_cache, repeat)
+        t_cold = _timeit(cold, repeat)
+        t_warm = _timeit(warm, repeat)
+        t_lazy = _timeit(lazy_warm, repeat)
+        print(f"{'no snapshot':>22} {t_plain * 1e3:>9.1f} ms")
+        print(f"{'cold (parse + write)':>22} {t_cold * 1e3:>9.1f} ms")
+        print(f"{'warm (snapshot)':>22} {t_warm * 1e3:>9.1f} ms   ({t_plain / t_warm:.1f}x faster)")
+        print(f"{'lazy manifest (warm)':>22} {t_lazy * 1e3:>9.1f} ms   ({t_plain / t_lazy:.1f}x faster)")
+
+
+def bench_ingest(file_count: int, questions_per_file: int, worker_counts: list[int]) -> None:
+    """Cold load_all of a synthetic bank directory, serial vs process pool."""
+    print(f"== ingest: {file_count} files x {questions_per_file} questions ==")
+    with tempfile.TemporaryDirectory() as tmp:
+        qdir = Path(tmp)
+        for n in range(file_count):
+            write_bank(qdir, f"BENCH-{n:03d}", questions_per_file)
+        baseline = None
+        for workers in worker_counts:
+            elapsed = _timeit(lambda: ExamBank(qdir, workers=workers).load_all(), 3)
+            baseline = baseline or elapsed
+            print(f"{'workers=' + str(workers):>12} {elapsed * 1e3:>9.1f} ms   ({baseline / elapsed:.2f}x)")
+
+
+@dataclass(frozen=True)
+class LegacyQuestion:
+    """The pre-compaction Question layout: __dict__ instances, lists, no sharing."""
+    exam_id: str
+    index: int
+    question_id: str
+    question: str
+    options: list[str]
+    correct: str
+    correct_indices: list[int]
+    explanation: str | None
+    references: list[str]
+    multi_select: bool
+
+
+def _unshared(s: str | None) -> str | None:
+    # json.loads hands out a fresh str per occurrence; mimic that here
+    return None if s is None else (s + ".")[:-1]
+
+
+def _to_legacy(q) -> LegacyQuestion:
+    return LegacyQuestion(
+        exam_id=_unshared(q.exam_id),
+        index=q.index,
+        question_id=q.question_id,
+        question=q.question,
+        options=[_unshared(o) for o in q.options],
+        correct=_unshared(q.correct),
+        correct_indices=list(q.correct_indices),
+        explanation=_unshared(q.explanation),
+        references=[_unshared(r) for r in q.references],
+        multi_select=q.multi_select,
+    )
+
+
+def _legacy_bank(path: Path) -> list[LegacyQuestion]:
+    legacy = []
+    for i, raw in enumerate(json.loads(path.read_text(encoding="utf-8"))):
+        q = _parse_question(path.stem, i, raw)
+        if q is not None:
+            legacy.append(_to_legacy(q))
+    return legacy
+
+
+def _traced_bytes(build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, obj
+
+
+def bench_memory(question_dir: Path) -> None:
+    """Resident bytes per exam (tracemalloc): legacy layout vs compact Question."""
+    print(f"== memory: resident bytes per exam in {question_dir} ==")
+    print(f"{'exam':>18} {'questions':>10} {'legacy KiB':>11} {'compact KiB':>12} {'saved':>7}")
+    tot_legacy = tot_compact = 0
+    for f in sorted(question_dir.glob("*.json")):
+        compact_bytes, questions = _traced_bytes(lambda: _parse_exam_file(f))
+        if not questions:
+            continue
+        del questions
+        legacy_bytes, questions = _traced_bytes(lambda: _legacy_bank(f))
+        tot_legacy += legacy_bytes
+        tot_compact += compact_bytes
+        print(f"{f.stem:>18} {len(questions):>10} {legacy_bytes / 1024:>11.1f} "
+              f"{compact_bytes / 1024:>12.1f} {1 - compact_bytes / legacy_bytes:>7.1%}")
+    print(f"{'total':>18} {'':>10} {tot_legacy / 1024:>11.1f} {tot_compact / 1024:>12.1f} "
+          f"{1 - tot_compact / tot_legacy:>7.1%}")
+
+    def whole_bank() -> ExamBank:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        return bank
+
+    bank_bytes, bank = _traced_bytes(whole_bank)
+    m = bank.reload_metrics()
+    print(f"{'ExamBank (dedup)':>18} {m['resident_questions']:>10} {'':>11} {bank_bytes / 1024:>12.1f} "
+          f"{1 - bank_bytes / tot_legacy:>7.1%}   ({m['unique_questions']} unique bodies, incl. indexes)")
+
+
+def write_large_bank(path: Path, size_mb: int) -> int:
+    """Stream a synthetic bank of roughly ``size_mb`` MB to disk; return its question count."""
+    target = size_mb * 1024 * 1024
+    n = 0
+    with path.open("w", encoding="utf-8") as fh:
+        fh.write("[")
+        while fh.tell() < target:
+            fh.write(("," if n else "") + json.dumps(_synthetic_question(n)))
+            n += 1
+        fh.write("]")
+    return n
+
+
+def _peak_rss_mb(mode: str, path: str) -> float:
+    """Child-process body: load ``path`` one way and return peak RSS in MB."""
+    import resource
+
+    p = Path(path)
+    if mode == "baseline":
+        questions = [None]
+    elif mode == "json.loads":
+        raw = json.loads(p.read_text(encoding="utf-8"))
+        questions = [q for i, r in enumerate(raw) if (q := _parse_question(p.stem, i, r)) is not None]
+        del raw
+    elif mode == "streaming":
+        questions = _parse_exam_file(p)
+    elif mode.startswith("ExamBank.load_all"):
+        bank = ExamBank(p.parent, lazy=mode.endswith("(lazy)"))
+        bank.load_all()  # what the server runs: listing, fingerprinting and parsing
+        questions = [None] * bank.list_exams()[p.stem]
+    elif mode == "count (json.loads)":
+        questions = [None] * sum(1 for r in json.loads(p.read_text(encoding="utf-8")) if isinstance(r, dict))
+    else:
+        questions = [None] * _count_exam_file(p)
+    assert questions
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_stream(size_mb: int) -> None:
+    """Peak RSS of ingesting one large bank: whole-file json.loads vs streaming, and ExamBank.load_all."""
+    print(f"== stream: peak RSS ingesting a ~{size_mb} MB bank ==")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "BENCH-large.json"
+        n = write_large_bank(path, size_mb)
+        print(f"{'questions':>24} {n:>9}")
+        modes = (
+            "baseline", "json.loads", "streaming", "count (json.loads)", "count (streaming)",
+            "ExamBank.load_all", "ExamBank.load_all (lazy)",
+        )
+        for mode in modes:
+            # Fresh interpreter per mode so ru_maxrss reflects only that load
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                peak = pool.submit(_peak_rss_mb, mode, str(path)).result()
+            print(f"{mode:>24} {peak:>9.1f} MB")
+
+
+def _smaps_kb() -> dict[str, int]:
+    """Rss/Pss/Shared/Private totals (kB) of this process, from smaps_rollup."""
+    out = {}
+    for line in Path("/proc/self/smaps_rollup").read_text().splitlines()[1:]:
+        key, value = line.split(":", 1)
+        out[key] = int(value.split()[0])
+    return {
+        "rss": out["Rss"],
+        "pss": out["Pss"],
+        "shared": out["Shared_Clean"] + out["Shared_Dirty"],
+        "private": out["Private_Clean"] + out["Private_Dirty"],
+    }
+
+
+def _worker_rss(mode: str, question_dir: str, cache: str, barrier, results) -> None:
+    """Load the bank, read every question, then report memory once all workers have."""
+    if mode != "baseline":
+        kwargs = {"image_path": Path(cache)} if mode == "image" else {"cache_path": Path(cache)}
+        bank = ExamBank(Path(question_dir), **kwargs)
+        bank.load_all()
+        for exam_id, count in bank.list_exams().items():
+            for i in range(count):
+                assert bank.get_question_by_index(exam_id, i).question
+    barrier.wait()  # every worker is resident now, so shared pages count as shared
+    results.put(_smaps_kb())
+    barrier.wait()
+
+
+def bench_mmap(question_dir: Path, workers: int) -> None:
+    """Memory per worker process: private parsed banks vs one shared mmap image."""
+    if not Path("/proc/self/smaps_rollup").exists():
+        print("== mmap: needs /proc/self/smaps_rollup (Linux); skipped ==")
+        return
+    print(f"== mmap: {workers} worker processes serving {question_dir} ==")
+    print(f"{'mode':>22} {'RSS':>9} {'PSS':>9} {'private':>9} {'shared':>9}   (MB per worker)")
+    ctx = get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        caches = {"baseline": "", "snapshot": str(Path(tmp) / "bank.snapshot"), "image": str(Path(tmp) / "bank.image")}
+        ExamBank(question_dir, cache_path=Path(caches["snapshot"])).load_all()
+        ExamBank(question_dir, image_path=Path(caches["image"])).load_all()
+        for mode, cache in caches.items():
+            barrier, results = ctx.Barrier(workers), ctx.Queue()
+            procs = [ctx.Process(target=_worker_rss, args=(mode, str(question_dir), cache, barrier, results))
+                     for _ in range(workers)]
+            for proc in procs:
+                proc.start()
+            stats = [results.get() for _ in procs]
+            for proc in procs:
+                proc.join()
+            mean = {k: sum(st[k] for st in stats) / len(stats) / 1024 for k in stats[0]}
+            print(f"{mode:>22} {mean['rss']:>9.1f} {mean['pss']:>9.1f} {mean['private']:>9.1f} {mean['shared']:>9.1f}")
+
+
+def _legacy_infer_tags(text: str) -> list[str]:
+    """The original tagger: one re.search per pattern string, via re's cache."""
+    tags = [tag for tag, patterns in TAG_RULES if any(re.search(p, text, flags=re.IGNORECASE) for p in patterns)]
+    return sorted(set(tags)) if tags else ["general"]
+
+
+def _question_texts(question_dir: Path) -> list[str]:
+    texts: list[str] = []
+    for f in sorted(question_dir.glob("*.json")):
+        try:
+            texts.extend(str(raw.get("question", "")) for raw in iter_json_array(f) if isinstance(raw, dict))
+        except ValueError:
+            continue
+    return texts
+
+
+def bench_tagging(question_dir: Path) -> None:
+    """infer_tags per question over every bank: per-pattern re.search vs compiled single pass."""
+    texts = _question_texts(question_dir)
+    print(f"== tagging: {len(texts)} questions from {question_dir} ==")
+
+    def thrashed(text: str) -> list[str]:
+        re.purge()  # other regex users evicting the tag patterns from re's cache
+        return _legacy_infer_tags(text)
+
+    results = {}
+    for label, fn in (("re.search (cached)", _legacy_infer_tags), ("re.search (thrashed)", thrashed),
+                      ("compiled single pass", infer_tags), ("aho-corasick", infer_tags)):
+        tagging.use_backend("aho-corasick" if label == "aho-corasick" else "regex")
+        start = time.perf_counter()
+        results[label] = [fn(t) for t in texts]
+        per_q = (time.perf_counter() - start) / len(texts)
+        print(f"{label:>22} {per_q * 1e6:>9.1f} us/question")
+    tagging.use_backend("regex")
+    mismatches = {
+        label: sum(a != b for a, b in zip(results["re.search (cached)"], results[label]))
+        for label in ("compiled single pass", "aho-corasick")
+    }
+    print(f"{'mismatched tag sets':>22} " + ", ".join(f"{k}: {v}" for k, v in mismatches.items()))
+
+    # Scaling: pad the rules with synthetic two-word service keywords
+    rnd = random.Random(0)
+
+    def word() -> str:
+        return "".join(rnd.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rnd.randint(4, 10)))
+
+    print(f"{'extra keywords':>22} {'regex':>9} {'aho-corasick':>13}   (us/question)")
+    for extra in (0, 500, 2000):
+        rules = TAG_RULES + [
+            (f"synthetic_{i}", [rf"\b{word()} {word()}\b" for _ in range(10)]) for i in range(extra // 10)
+        ]
+        dispatch, fallback = tagging._compile(rules)
+        keyword_tagger = KeywordTagger(rules)
+
+        def regex(text: str) -> set[str]:
+            saved = tagging._DISPATCH, tagging._FALLBACK
+            tagging._DISPATCH, tagging._FALLBACK = dispatch, fallback
+            try:
+                return tagging._regex_tags(text)
+            finally:
+                tagging._DISPATCH, tagging._FALLBACK = saved
+
+        timings = [_timeit(lambda: [fn(t) for t in texts], 1) / len(texts) for fn in (regex, keyword_tagger.tags)]
+        print(f"{extra:>22} {timings[0] * 1e6:>9.1f} {timings[1] * 1e6:>13.1f}")
+
+
+TAG_LABELS = Path(__file__).resolve().parent / "tag_labels.json"
+
+
+def bench_tagscore(question_dir: Path, labels_path: Path = TAG_LABELS) -> None:
+    """TF-IDF tag scoring: fit/score time and accuracy against hand-labelled questions."""
+    print(f"== tagscore: TF-IDF tag profiles over {question_dir} ==")
+    bank = ExamBank(question_dir)
+    bank.load_all()
+    exams = bank.list_exams()
+    first, *rest = exams
+    start = time.perf_counter()
+    scores = {first: bank.score_tags(first, 0.0)}
+    fitted = time.perf_counter() - start
+    print(f"{'first call (fit)':>22} {fitted * 1e3:>9.1f} ms  ({sum(exams.values())} questions; target < 1000 ms"
+          f"{', missed' if fitted >= 1.0 else ''})")
+    start = time.perf_counter()
+    scores.update((eid, bank.score_tags(eid, 0.0)) for eid in rest)
+    print(f"{'rank other banks':>22} {(time.perf_counter() - start) * 1e3:>9.1f} ms")
+    cached = _timeit(lambda: [bank.score_tags(eid) for eid in exams], 5)
+    print(f"{'cached, all banks':>22} {cached * 1e3:>9.1f} ms")
+    exam_id = max(exams, key=exams.get)
+    texts = [_search_text(q) for q in bank.get_questions(bank.all_question_ids(exam_id))]
+    scorer = TagScorer()
+    per_bank = _timeit(lambda: scorer.score(scorer.fit(texts), 0.0), 1)
+    print(f"{'fit + score, ' + exam_id:>22} {per_bank * 1e3:>9.1f} ms  ({len(texts)} questions)")
+
+    if not labels_path.is_file():
+        return
+    labelled = json.loads(labels_path.read_text(encoding="utf-8"))
+    by_id = {qid: ranked for by_q in scores.values() for qid, ranked in by_q.items()}
+    labelled = [item for item in labelled if item["question_id"] in by_id]
+    truth = [item["tags"] for item in labelled]
+    print(f"{'threshold':>22} {'precision':>9} {'recall':>7} {'f1':>6}   ({len(labelled)} labelled questions)")
+    for row in evaluate([by_id[item["question_id"]] for item in labelled], truth):
+        print(f"{row['threshold']:>22} {row['precision']:>9.3f} {row['recall']:>7.3f} {row['f1']:>6.3f}")
+    questions = bank.get_questions(item["question_id"] for item in labelled)
+    rules = [[TagScore(t, 1.0) for t in q.tags] for q in questions]
+    (row,) = evaluate(rules, truth, thresholds=(1.0,))
+    print(f"{'infer_tags (rules)':>22} {row['precision']:>9.3f} {row['recall']:>7.3f} {row['f1']:>6.3f}")
+
+
+SEARCH_QUERIES = [
+    "S3 Glacier lowest cost archive",
+    "managed Kubernetes control plane",
+    "SageMaker hyperparameter tuning",
+    "cross-region replication disaster recovery",
+    "Azure cognitive services language understanding",
+]
+
+
+def bench_search(question_dir: Path, repeat: int = 200) -> None:
+    """kb_search: index build time and BM25 query latency, all banks vs one exam."""
+    print(f"== search: BM25 over {question_dir} ==")
+    bank = ExamBank(question_dir)
+    bank.load_all()
+    start = time.perf_counter()
+    bank.build_search_index()
+    print(f"{'index build':>22} {(time.perf_counter() - start) * 1e3:>9.1f} ms")
+    exam_id = max(bank.list_exams(), key=bank.list_exams().get)
+    for label, scope in (("all banks", None), (exam_id, exam_id)):
+        it = iter(SEARCH_QUERIES * repeat)
+        per_query = _timeit(lambda: bank.search(next(it), exam_id=scope), len(SEARCH_QUERIES) * repeat)
+        print(f"{label:>22} {per_query * 1e3:>9.3f} ms/query")
+
+
+BENCHMARKS = {
+    "lookup": lambda args: bench_lookup(args.sizes),
+    "startup": lambda args: bench_startup(args.question_dir),
+    "search": lambda args: bench_search(args.question_dir),
+    "memory": lambda args: bench_memory(args.question_dir),
+    "stream": lambda args: bench_stream(args.stream_mb),
+    "ingest": lambda args: bench_ingest(args.files, args.questions, args.workers),
+    "mmap": lambda args: bench_mmap(args.question_dir, args.mmap_workers),
+    "tagging": lambda args: bench_tagging(args.question_dir),
+    "tagscore": lambda args: bench_tagscore(args.question_dir),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--question-dir", type=Path, default=REPO_ROOT / "questions")
+    parser.add_argument("--stream-mb", type=int, default=300)
+    parser.add_argument("--files", type=int, default=32)
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--mmap-workers", type=int, default=4)
+    args = parser.parse_args()
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name](args)
+        print()
+
+
+if __name__ == "__main__":
+    main()
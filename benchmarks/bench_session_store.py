@@ -0,0 +1,390 @@
+"""Micro-benchmarks for the SQLite SessionStore.
+
+Drives the store the way the MCP tools do, from several threads at once,
+in a temp directory.
+
+Usage:
+    python benchmarks/bench_session_store.py              # run all benchmarks
+    python benchmarks/bench_session_store.py throughput   # run one benchmark
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "mcp_server" / "src"))
+
+from aws_exam_tools.session_store import AsyncSessionStore, SessionStore  # noqa: E402
+
+TAGS = ["iam", "s3_storage", "vpc_networking", "serverless", "databases"]
+
+
+class _LegacyStore(SessionStore):
+    """The original store: a new rollback-journal connection per call."""
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.sqlite_path), timeout=self.busy_timeout)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self) -> None:
+        super()._init_db()
+        with self._read() as c:
+            c.execute("PRAGMA journal_mode=DELETE")
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    _write = _snapshot = _read
+
+
+class _BlobStore:
+    """Schema version 1: record_answer rewrites the session's JSON columns."""
+
+    def __init__(self, path: Path):
+        self._conn = sqlite3.connect(str(path), isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE sessions (session_id TEXT PRIMARY KEY, asked_ids TEXT, answers TEXT,"
+            " correct_count INTEGER, incorrect_count INTEGER, tag_stats TEXT)"
+        )
+
+    def create(self) -> str:
+        self._conn.execute("INSERT INTO sessions VALUES ('s', '[]', '[]', 0, 0, '{}')")
+        return "s"
+
+    def record_answer(self, session_id: str, question_id: str, tags: list[str], correct: bool) -> None:
+        c = self._conn
+        c.execute("BEGIN IMMEDIATE")
+        asked, answers, right, wrong, tag_stats = c.execute(
+            "SELECT asked_ids, answers, correct_count, incorrect_count, tag_stats FROM sessions"
+            " WHERE session_id = ?", (session_id,),
+        ).fetchone()
+        asked, answers, tag_stats = json.loads(asked), json.loads(answers), json.loads(tag_stats)
+        if question_id not in asked:
+            asked.append(question_id)
+        answers.append({"question_id": question_id, "tags": tags, "correct": correct, "timestamp": time.time()})
+        for t in tags:
+            st = tag_stats.setdefault(t, {"asked": 0, "correct": 0})
+            st["asked"] += 1
+            st["correct"] += correct
+        c.execute(
+            "UPDATE sessions SET asked_ids = ?, answers = ?, correct_count = ?, incorrect_count = ?, tag_stats = ?"
+            " WHERE session_id = ?",
+            (json.dumps(asked), json.dumps(answers), right + correct, wrong + (not correct),
+             json.dumps(tag_stats), session_id),
+        )
+        c.execute("COMMIT")
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _tool_calls(store: SessionStore, answers: int, errors: list[Exception]) -> None:
+    """One learner: next question, submit answer, then session status."""
+    try:
+        sid = store.create(exam_id="bench", mode="learning", user_id=None).session_id
+        for i in range(answers):
+            store.load(sid)
+            store.record_answer(sid, f"q-{i}", [TAGS[i % len(TAGS)]], correct=bool(i % 3))
+            store.load(sid)
+            store.weak_tags(sid, min_asked=2, top_n=5)
+            store.strong_tags(sid, min_asked=3, top_n=5)
+            store.mastery_level(sid)
+    except sqlite3.OperationalError as e:  # "database is locked" past the busy timeout
+        errors.append(e)
+
+
+def bench_throughput(threads: list[int], answers: int) -> None:
+    """Concurrent learners: per-call rollback-journal connections vs the WAL pool."""
+    print(f"== throughput: {answers} answers per learner, 6 store calls per answer ==")
+    print(f"{'learners':>10} {'per-call conn':>16} {'pooled WAL':>16}   (store calls/s)")
+    for n in threads:
+        rates = []
+        for cls in (_LegacyStore, SessionStore):
+            with tempfile.TemporaryDirectory() as tmp:
+                store = cls(Path(tmp) / "bench.sqlite", session_cache_size=0)
+                errors: list[Exception] = []
+                workers = [threading.Thread(target=_tool_calls, args=(store, answers, errors)) for _ in range(n)]
+                start = time.perf_counter()
+                for w in workers:
+                    w.start()
+                for w in workers:
+                    w.join()
+                elapsed = time.perf_counter() - start
+                store.close()
+            calls = n * (1 + answers * 6)
+            rates.append(f"{calls / elapsed:>10.0f}" + (f" ({len(errors)} err)" if errors else " " * 6))
+        print(f"{n:>10} {rates[0]:>16} {rates[1]:>16}")
+
+
+def bench_session_length(lengths: list[int], sample: int = 50) -> None:
+    """Cost of one more answer as a session grows: JSON blob rewrite vs append-only tables."""
+    print("== session length: record_answer cost after N answers ==")
+    print(f"{'answers':>10} {'blob rewrite':>14} {'append + load':>14} {'write only':>12}   (ms/answer)")
+    for n in lengths:
+        timings = []
+        with tempfile.TemporaryDirectory() as tmp:
+            blob = _BlobStore(Path(tmp) / "blob.sqlite")
+            store = SessionStore(Path(tmp) / "tables.sqlite", session_cache_size=0)
+            blob_sid = blob.create()
+            sid = store.create(exam_id="bench", mode="learning", user_id=None).session_id
+            with store._write() as c:  # fill the tables directly, as record_answer would
+                c.executemany(
+                    "INSERT INTO answers(session_id, question_id, tags, correct, timestamp) VALUES(?,?,?,?,?)",
+                    [(sid, f"q-{i}", json.dumps([TAGS[i % len(TAGS)]]), i % 3 > 0, 0.0) for i in range(n)],
+                )
+                c.executemany(
+                    "INSERT INTO asked_questions(session_id, question_id) VALUES(?,?)",
+                    [(sid, f"q-{i}") for i in range(n)],
+                )
+            # The blob store has to be grown answer by answer
+            for i in range(n):
+                blob.record_answer(blob_sid, f"q-{i}", [TAGS[i % len(TAGS)]], i % 3 > 0)
+            for record, session_id in ((blob.record_answer, blob_sid), (store.record_answer, sid)):
+                start = time.perf_counter()
+                for i in range(n, n + sample):
+                    record(session_id, f"q-{i}", [TAGS[i % len(TAGS)]], i % 3 > 0)
+                timings.append((time.perf_counter() - start) / sample)
+            with patch.object(store, "load"):  # the write transaction alone
+                start = time.perf_counter()
+                for i in range(n + sample, n + 2 * sample):
+                    store.record_answer(sid, f"q-{i}", [TAGS[i % len(TAGS)]], i % 3 > 0)
+                timings.append((time.perf_counter() - start) / sample)
+            blob.close()
+            store.close()
+        print(f"{n:>10} {timings[0] * 1e3:>14.3f} {timings[1] * 1e3:>14.3f} {timings[2] * 1e3:>12.3f}")
+
+
+def _loaded_ranking(store: SessionStore, sid: str, min_asked: int, top_n: int, reverse: bool) -> list[str]:
+    """The original weak/strong tags: load the session, rank its tag stats in Python."""
+    scored = [
+        (tag, st["correct"] / st["asked"])
+        for tag, st in store.load(sid).tag_stats.items() if st["asked"] >= min_asked
+    ]
+    scored.sort(key=lambda x: x[1], reverse=reverse)
+    return [t for t, _ in scored[:top_n]]
+
+
+def bench_status(lengths: list[int], repeat: int = 50) -> None:
+    """Session status: ranking loaded sessions vs counter queries vs status() (one read, cached)."""
+    print("== status: counts, weak/strong tags and mastery after N answers ==")
+    print(f"{'answers':>10} {'load + rank':>12} {'counters':>10} {'status()':>10} {'cached':>10}   (ms/status)")
+    for n in lengths:
+        with tempfile.TemporaryDirectory() as tmp:
+            # No session cache: every path here reads SQLite, as before the cache
+            store = SessionStore(Path(tmp) / "bench.sqlite", session_cache_size=0)
+            sid = store.create(exam_id="bench", mode="learning", user_id=None).session_id
+            for i in range(n):
+                store.record_answer(sid, f"q-{i}", [TAGS[i % len(TAGS)]], correct=bool(i % 3))
+
+            def loaded() -> None:
+                _loaded_ranking(store, sid, 2, 5, False)
+                _loaded_ranking(store, sid, 3, 5, True)
+                store.load(sid)
+
+            def counters() -> None:
+                store.load(sid)
+                store.weak_tags(sid, min_asked=2, top_n=5)
+                store.strong_tags(sid, min_asked=3, top_n=5)
+                store.mastery_level(sid)
+
+            def uncached() -> None:
+                store._status_cache.invalidate(sid)
+                store.status(sid)
+
+            timings = [_timeit(fn, repeat) for fn in (loaded, counters, uncached, lambda: store.status(sid))]
+            store.close()
+        print(f"{n:>10} {timings[0] * 1e3:>12.3f} {timings[1] * 1e3:>10.3f} "
+              f"{timings[2] * 1e3:>10.3f} {timings[3] * 1e3:>10.3f}")
+
+
+def bench_cache(lengths: list[int], loops: int = 50) -> None:
+    """The tool loop (next question, submit, status) with and without the session cache."""
+    print("== cache: next -> submit -> status after N answers ==")
+    print(f"{'answers':>10} {'uncached':>10} {'cached':>10} {'hit rate':>9}   (ms/loop)")
+    for n in lengths:
+        timings = []
+        for size in (0, 256):
+            with tempfile.TemporaryDirectory() as tmp:
+                store = SessionStore(Path(tmp) / "bench.sqlite", session_cache_size=size)
+                sid = store.create(exam_id="bench", mode="learning", user_id=None).session_id
+                with store._write() as c:
+                    c.executemany(
+                        "INSERT INTO answers(session_id, question_id, tags, correct, timestamp) VALUES(?,?,?,?,?)",
+                        [(sid, f"q-{i}", json.dumps([TAGS[i % len(TAGS)]]), i % 3 > 0, 0.0) for i in range(n)],
+                    )
+                    c.executemany(
+                        "INSERT INTO asked_questions(session_id, question_id) VALUES(?,?)",
+                        [(sid, f"q-{i}") for i in range(n)],
+                    )
+                it = iter(range(n, n + loops))
+
+                def loop() -> None:
+                    i = next(it)
+                    store.load(sid)
+                    store.record_answer(sid, f"q-{i}", [TAGS[i % len(TAGS)]], correct=bool(i % 3))
+                    store.status(sid)
+
+                timings.append(_timeit(loop, loops))
+                hit_rate = store.cache_info()["sessions"]["hit_rate"]
+                store.close()
+        print(f"{n:>10} {timings[0] * 1e3:>10.3f} {timings[1] * 1e3:>10.3f} {hit_rate:>9.2f}")
+
+
+def bench_group_commit(threads: list[int], answers: int) -> None:
+    """Answers/s from concurrent learners: a transaction per answer vs group commit."""
+    print(f"== group commit: {answers} answers per learner ==")
+    modes = {
+        "per answer": {},
+        "grouped": {"write_behind": True},
+        "queued": {"write_behind": True, "durability": "queued"},
+        "fsync": {"durability": "fsync"},
+        "fsync grouped": {"write_behind": True, "durability": "fsync"},
+    }
+    print(f"{'learners':>10}" + "".join(f"{m:>15}" for m in modes) + "   (answers/s)")
+    for n in threads:
+        rates = []
+        for options in modes.values():
+            with tempfile.TemporaryDirectory() as tmp:
+                store = SessionStore(Path(tmp) / "bench.sqlite", session_cache_size=0, **options)
+                sids = [store.create(exam_id="bench", mode="learning", user_id=None).session_id for _ in range(n)]
+
+                def learner(sid: str) -> None:
+                    for i in range(answers):
+                        store.record_answer(sid, f"q-{i}", [TAGS[i % len(TAGS)]], correct=bool(i % 3))
+
+                workers = [threading.Thread(target=learner, args=(sid,)) for sid in sids]
+                start = time.perf_counter()
+                for w in workers:
+                    w.start()
+                for w in workers:
+                    w.join()
+                store.flush()  # queued answers count once committed
+                elapsed = time.perf_counter() - start
+                mean_batch = store.cache_info().get("group_commit", {}).get("mean_batch", 1.0)
+                store.close()
+            rates.append(f"{n * answers / elapsed:.0f} ({mean_batch:g})")
+        print(f"{n:>10}" + "".join(f"{r:>15}" for r in rates))
+    print("(mean answers per transaction in parentheses)")
+
+
+class _BlockingStore:
+    """The store called straight from the event loop, as the tools used to."""
+
+    def __init__(self, store: SessionStore):
+        self.store = store
+
+    async def create(self, **kwargs):
+        return self.store.create(**kwargs)
+
+    async def load(self, session_id: str):
+        return self.store.load(session_id)
+
+    async def record_answer(self, session_id: str, question_id: str, tags: list[str], correct: bool):
+        return self.store.record_answer(session_id, question_id, tags, correct)
+
+    async def status(self, session_id: str):
+        return self.store.status(session_id)
+
+    def close(self) -> None:
+        self.store.close()
+
+
+async def _async_learners(store, learners: int, answers: int) -> float:
+    """Run async learners next to a 1 ms heartbeat; returns its worst lag in seconds."""
+    worst = 0.0
+    done = False
+
+    async def heartbeat() -> None:
+        nonlocal worst
+        loop = asyncio.get_running_loop()
+        while not done:
+            start = loop.time()
+            await asyncio.sleep(0.001)
+            worst = max(worst, loop.time() - start - 0.001)
+
+    async def learner() -> None:
+        sid = (await store.create(exam_id="bench", mode="learning", user_id=None)).session_id
+        for i in range(answers):
+            await store.load(sid)
+            await store.record_answer(sid, f"q-{i}", [TAGS[i % len(TAGS)]], correct=bool(i % 3))
+            await store.status(sid)
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.gather(*(learner() for _ in range(learners)))
+    done = True
+    await beat
+    return worst
+
+
+def bench_async(threads: list[int], answers: int) -> None:
+    """Event-loop stalls of async tools: blocking store calls vs AsyncSessionStore."""
+    print(f"== async: {answers} answers per learner, next -> submit -> status ==")
+    print(f"{'learners':>10} {'blocking':>18} {'async store':>18}   (loops/s, worst event-loop stall ms)")
+    for n in threads:
+        cells = []
+        for wrap in (_BlockingStore, AsyncSessionStore):
+            with tempfile.TemporaryDirectory() as tmp:
+                # durability="fsync" stands in for a slow disk
+                store = wrap(SessionStore(Path(tmp) / "bench.sqlite", durability="fsync"))
+                start = time.perf_counter()
+                worst = asyncio.run(_async_learners(store, n, answers))
+                elapsed = time.perf_counter() - start
+                store.close()
+            cells.append(f"{n * answers / elapsed:.0f} / {worst * 1e3:.1f}")
+        print(f"{n:>10} {cells[0]:>18} {cells[1]:>18}")
+
+
+def _timeit(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+BENCHMARKS = {
+    "throughput": lambda args: bench_throughput(args.threads, args.answers),
+    "length": lambda args: bench_session_length(args.lengths),
+    "status": lambda args: bench_status(args.lengths),
+    "cache": lambda args: bench_cache(args.lengths),
+    "group": lambda args: bench_group_commit(args.threads, args.answers),
+    "async": lambda args: bench_async(args.threads, args.answers),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--answers", type=int, default=50)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    args = parser.parse_args()
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name](args)
+        print()
+
+
+if __name__ == "__main__":
+    main()
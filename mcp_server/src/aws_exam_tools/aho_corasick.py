@@ -0,0 +1,147 @@
+"""Aho-Corasick keyword automaton for domain tagging.
+
+Most tag rules are literal keywords between word boundaries ("\\bCloudFront\\b",
+"\\bDirect Connect\\b"). An Aho-Corasick automaton finds every occurrence of
+every keyword in one left-to-right pass over the text, so the cost of
+tagging grows with the text, not with the number of keywords.
+
+``KeywordTagger`` turns regex rules into keywords where it can: the pattern
+must be ``\\b`` followed by literal text (letters, digits, spaces, ``-``,
+``/``) with at most simple ``(a|b)`` groups, optionally ending in
+``\\b``. Groups are expanded ("rout(e|ing)" -> "route", "routing"). Any
+other pattern is kept as a regex and searched separately, so the tags
+always equal those of the regex rules.
+"""
+from __future__ import annotations
+
+import itertools
+import re
+from typing import Iterator
+
+_PART = re.compile(r"\(([A-Za-z0-9 /|-]+)\)|([A-Za-z0-9 /-]+)")
+_QUANTIFIERS = ("?", "*", "+", "{")
+
+
+def expand_pattern(pattern: str) -> tuple[list[str], bool] | None:
+    """(keywords, needs trailing word boundary) for a literal rule, else None."""
+    if not pattern.startswith(r"\b"):
+        return None
+    body = pattern[2:]
+    end_boundary = body.endswith(r"\b")
+    if end_boundary:
+        body = body[:-2]
+    choices: list[list[str]] = []
+    pos = 0
+    while pos < len(body):
+        m = _PART.match(body, pos)
+        if m is None or body[m.end():m.end() + 1] in _QUANTIFIERS:
+            return None
+        choices.append(m.group(1).split("|") if m.group(1) is not None else [m.group(2)])
+        pos = m.end()
+    keywords = ["".join(parts).lower() for parts in itertools.product(*choices)]
+    if not keywords or any(not k or not _is_word(k[0]) for k in keywords):
+        return None
+    return keywords, end_boundary
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class Automaton:
+    """Aho-Corasick automaton over lower-cased keywords.
+
+    ``add`` keywords with a payload, ``build`` once, then ``iter`` yields
+    (start, end, payload) for every occurrence, overlapping ones included.
+    """
+
+    def __init__(self) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[tuple[int, object]]] = [[]]  # (keyword length, payload)
+        self._built = False
+
+    def add(self, keyword: str, payload: object) -> None:
+        if self._built:
+            raise RuntimeError("automaton already built")
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(keyword), payload))
+
+    def build(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._built = True
+
+    def iter(self, text: str) -> Iterator[tuple[int, int, object]]:
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for length, payload in out[node]:
+                    yield i - length + 1, i + 1, payload
+
+
+class KeywordTagger:
+    """Tags text with an Aho-Corasick pass over the keyword rules."""
+
+    def __init__(self, rules: list[tuple[str, list[str]]]):
+        # Exact regex path, used when lower-casing changes the text's length
+        self.regex = [
+            (tag, re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE))
+            for tag, patterns in rules
+        ]
+        self.automaton = Automaton()
+        fallback: dict[str, list[str]] = {}
+        for tag, patterns in rules:
+            for pattern in patterns:
+                expanded = expand_pattern(pattern)
+                if expanded is None:
+                    fallback.setdefault(tag, []).append(pattern)
+                    continue
+                keywords, end_boundary = expanded
+                for keyword in keywords:
+                    self.automaton.add(keyword, (tag, end_boundary))
+        self.automaton.build()
+        self.fallback = [
+            (tag, re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE))
+            for tag, patterns in fallback.items()
+        ]
+
+    def tags(self, text: str) -> set[str]:
+        """The set of tags whose rules match ``text`` (without "general")."""
+        lowered = text.lower()
+        if len(lowered) != len(text):  # e.g. "\u0130": offsets would not line up
+            return {tag for tag, matcher in self.regex if matcher.search(text)}
+        found: set[str] = set()
+        n = len(lowered)
+        for start, end, (tag, end_boundary) in self.automaton.iter(lowered):
+            if tag in found or (start and _is_word(lowered[start - 1])):
+                continue
+            if end_boundary and _is_word(lowered[end - 1]) == (end < n and _is_word(lowered[end])):
+                continue
+            found.add(tag)
+        for tag, matcher in self.fallback:
+            if tag not in found and matcher.search(text):
+                found.add(tag)
+        return found
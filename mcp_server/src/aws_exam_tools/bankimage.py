@@ -0,0 +1,272 @@
+"""Read-only, memory-mapped question bank image.
+
+The pickle snapshot makes startup fast, but every process that loads it
+still owns a private copy of every question string. The bank image is a
+flat file of fixed-size question records plus one string table, opened
+with mmap. Question text stays in the page cache, shared by every
+process on the host (MCP server, direct-mode agent, tutor, workers); a
+process only builds Python objects for the questions it actually reads,
+and drops them again when done.
+
+File layout (all integers little-endian):
+  MAGIC (8 bytes) | header length (u64) | header (UTF-8 JSON) | records | refs | strings
+
+The JSON header records the format version, the tag rules hash (records
+store tags), a fingerprint of every source *.json file, and per exam the
+offset and count of its question records.
+
+Each record (``_RECORD``) holds the question index, flags, an 8-byte
+content digest (equal for identical questions), and (offset, length)
+pairs: scalar strings point into the string table; lists (options,
+references, tags, correct indices) point at runs of ``_REF`` entries in
+the refs area, which in turn point into the string table (or, for
+correct indices, hold the integer in the offset slot). Identical strings
+are stored once.
+
+Like the snapshot, the image is trusted local state written next to the
+database by this package.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Iterator
+
+from .snapshot import SourceFingerprint
+from .tagging import current_rules_hash
+
+MAGIC = b"AWSXIMG1"
+IMAGE_VERSION = 1
+IMAGE_FILENAME = "question_bank.image"
+
+_HEADER_LEN = struct.Struct("<Q")
+# index, flags, digest, then (offset, length) for: question_id, question,
+# correct, explanation, options, references, tags, correct_indices
+_RECORD = struct.Struct("<IB8s16I")
+_REF = struct.Struct("<II")
+_MULTI_SELECT = 1
+_HAS_EXPLANATION = 2
+_U32_MAX = 0xFFFFFFFF
+
+
+def content_digest(question: str, options: Sequence[str], correct: str,
+                   explanation: str | None, references: Sequence[str]) -> bytes:
+    """Stable 8-byte key of a question's content (its id and position excluded)."""
+    h = hashlib.blake2b(digest_size=8)
+    for part in (question, *options, "\x1e", correct, explanation or "", "\x1e", *references):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x1f")
+    return h.digest()
+
+
+class _Writer:
+    """Accumulates the refs area and the de-duplicated string table."""
+
+    def __init__(self) -> None:
+        self.strings = bytearray()
+        self.offsets: dict[str, tuple[int, int]] = {}
+        self.refs = bytearray()
+
+    def string(self, s: str) -> tuple[int, int]:
+        ref = self.offsets.get(s)
+        if ref is None:
+            data = s.encode("utf-8")
+            if len(self.strings) + len(data) > _U32_MAX:
+                raise ValueError("question bank image string table exceeds 4 GiB")
+            ref = self.offsets[s] = (len(self.strings), len(data))
+            self.strings += data
+        return ref
+
+    def string_list(self, items: Sequence[str]) -> tuple[int, int]:
+        start = len(self.refs) // _REF.size
+        for s in items:
+            self.refs += _REF.pack(*self.string(s))
+        return start, len(items)
+
+    def int_list(self, items: Sequence[int]) -> tuple[int, int]:
+        start = len(self.refs) // _REF.size
+        for n in items:
+            self.refs += _REF.pack(n, 0)
+        return start, len(items)
+
+
+def write_image(path: Path, exams: dict[str, tuple[SourceFingerprint, Sequence]]) -> None:
+    """Atomically write an image of ``exams`` (exam_id -> (fingerprint, questions)).
+
+    ``questions`` are Question objects (or anything with the same attributes).
+    """
+    w = _Writer()
+    records = bytearray()
+    header_exams: dict[str, dict] = {}
+    for exam_id, (fp, questions) in exams.items():
+        header_exams[exam_id] = {
+            "source": asdict(fp),
+            "first": len(records) // _RECORD.size,
+            "count": len(questions),
+        }
+        for q in questions:
+            flags = (_MULTI_SELECT if q.multi_select else 0) | (_HAS_EXPLANATION if q.explanation is not None else 0)
+            digest = content_digest(q.question, q.options, q.correct, q.explanation, q.references)
+            records += _RECORD.pack(
+                q.index, flags, digest,
+                *w.string(q.question_id),
+                *w.string(q.question),
+                *w.string(q.correct),
+                *w.string(q.explanation or ""),
+                *w.string_list(q.options),
+                *w.string_list(q.references),
+                *w.string_list(q.tags),
+                *w.int_list(q.correct_indices),
+            )
+
+    header = {
+        "version": IMAGE_VERSION,
+        "tag_rules": current_rules_hash(),
+        "exams": header_exams,
+        "records_length": len(records),
+        "refs_length": len(w.refs),
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("wb") as fh:
+            fh.write(MAGIC)
+            fh.write(_HEADER_LEN.pack(len(header_bytes)))
+            fh.write(header_bytes)
+            fh.write(records)
+            fh.write(w.refs)
+            fh.write(w.strings)
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class BankImage:
+    """An open, memory-mapped bank image."""
+
+    def __init__(self, path: Path, mm: mmap.mmap, header: dict, data_start: int):
+        self.path = path
+        self._mm = mm
+        self.tag_rules: str = header["tag_rules"]
+        self._exams: dict[str, dict] = header["exams"]
+        self._records = data_start
+        self._refs = self._records + header["records_length"]
+        self._strings = self._refs + header["refs_length"]
+        self.sources = {eid: SourceFingerprint(**e["source"]) for eid, e in self._exams.items()}
+
+    @classmethod
+    def open(cls, path: Path) -> BankImage | None:
+        """Map an image, or return None if it is missing or unreadable."""
+        try:
+            with path.open("rb") as fh:
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # ValueError: empty file
+            return None
+        try:
+            if mm[:len(MAGIC)] != MAGIC:
+                raise ValueError("bad magic")
+            (header_len,) = _HEADER_LEN.unpack_from(mm, len(MAGIC))
+            data_start = len(MAGIC) + _HEADER_LEN.size + header_len
+            header = json.loads(mm[len(MAGIC) + _HEADER_LEN.size:data_start].decode("utf-8"))
+            if header.get("version") != IMAGE_VERSION:
+                raise ValueError("unsupported version")
+            if header.get("tag_rules") != current_rules_hash():
+                raise ValueError("written under other tag rules")
+            return cls(path, mm, header, data_start)
+        except (ValueError, KeyError, TypeError, struct.error):
+            mm.close()
+            return None
+
+    def count(self, exam_id: str) -> int:
+        e = self._exams.get(exam_id)
+        return e["count"] if e else 0
+
+    def exam(self, exam_id: str, build: Callable[..., object]) -> MappedExam:
+        """A lazy sequence over one exam; ``build(**fields)`` makes each question."""
+        e = self._exams[exam_id]
+        return MappedExam(self, e["first"], e["count"], build)
+
+    def _str(self, off: int, length: int) -> str:
+        start = self._strings + off
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _str_list(self, first: int, count: int) -> tuple[str, ...]:
+        base = self._refs + first * _REF.size
+        return tuple(self._str(*_REF.unpack_from(self._mm, base + i * _REF.size)) for i in range(count))
+
+    def _int_list(self, first: int, count: int) -> tuple[int, ...]:
+        base = self._refs + first * _REF.size
+        return tuple(_REF.unpack_from(self._mm, base + i * _REF.size)[0] for i in range(count))
+
+    def _record(self, n: int) -> tuple:
+        return _RECORD.unpack_from(self._mm, self._records + n * _RECORD.size)
+
+
+class MappedExam(Sequence):
+    """Read-only sequence of one exam's questions, decoded on access."""
+
+    __slots__ = ("_image", "_first", "_count", "_build", "ids", "digests", "_pos")
+
+    def __init__(self, image: BankImage, first: int, count: int, build: Callable[..., object]):
+        self._image = image
+        self._first = first
+        self._count = count
+        self._build = build
+        self.ids: list[str] = []
+        self.digests: list[bytes] = []
+        for n in range(first, first + count):
+            rec = image._record(n)
+            self.ids.append(image._str(rec[3], rec[4]))
+            self.digests.append(rec[2])
+        self._pos = {qid: i for i, qid in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        img = self._image
+        (index, flags, _digest, _id_off, _id_len, q_off, q_len, c_off, c_len,
+         e_off, e_len, o_first, o_n, r_first, r_n, t_first, t_n, ci_first, ci_n) = img._record(self._first + i)
+        options = img._str_list(o_first, o_n)
+        correct = img._str(c_off, c_len)
+        return self._build(
+            index=index,
+            question_id=self.ids[i],
+            question=img._str(q_off, q_len),
+            options=options,
+            correct=correct,
+            correct_indices=img._int_list(ci_first, ci_n),
+            explanation=img._str(e_off, e_len) if flags & _HAS_EXPLANATION else None,
+            references=img._str_list(r_first, r_n),
+            multi_select=bool(flags & _MULTI_SELECT),
+            tags=img._str_list(t_first, t_n),
+        )
+
+    def __iter__(self) -> Iterator:
+        for i in range(self._count):
+            yield self[i]
+
+    def tags_at(self, i: int) -> tuple[str, ...]:
+        """Tags of the ``i``-th question, without decoding the rest of it."""
+        rec = self._image._record(self._first + i)
+        return self._image._str_list(rec[15], rec[16])
+
+    def get(self, question_id: str):
+        """The question with ``question_id``, or None."""
+        i = self._pos.get(question_id)
+        return None if i is None else self[i]
@@ -0,0 +1,124 @@
+"""Near-duplicate detection for questions (MinHash + LSH).
+
+Exact duplicates are handled by ExamBank sharing one Question body per
+distinct content. This module flags questions that are *almost* the same:
+re-worded by a character or two, re-ordered options, a trailing space in
+one bank and not the other.
+
+Each text is reduced to hashed word 3-gram shingles. Its signature is a
+one-permutation MinHash: every shingle is hashed once and the minimum
+hash is kept per bin, with empty bins filled from their
+neighbours. Signatures are split into bands; texts sharing any band
+bucket are candidates, and candidates whose signatures agree on at
+least ``threshold`` of their bins are reported as near-duplicates.
+"""
+from __future__ import annotations
+
+import re
+import zlib
+from collections import defaultdict
+from typing import Hashable, Iterable
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+NUM_BINS = 32
+BANDS = 8
+_ROWS = NUM_BINS // BANDS
+_MASK = (1 << 32) - 1
+_EMPTY = 1 << 32
+
+
+def tokens(text: str) -> list[str]:
+    """Lower-cased alphanumeric words; punctuation and spacing are ignored."""
+    return _WORD_RE.findall(text.lower())
+
+
+def shingles(text: str, size: int = 3) -> set[int]:
+    """Hashed word ``size``-grams of ``text``.
+
+    Words are hashed with CRC-32 and each n-gram is the hash of its tuple of
+    word hashes, which is stable across processes (unlike str hashes).
+    """
+    hashes = [zlib.crc32(w.encode("utf-8")) for w in tokens(text)]
+    if len(hashes) <= size:
+        return {hash(tuple(hashes)) & _MASK} if hashes else set()
+    return {hash(g) & _MASK for g in zip(*(hashes[i:] for i in range(size)))}
+
+
+def signature(text: str) -> tuple[int, ...]:
+    """One-permutation MinHash signature of ``text`` (NUM_BINS values)."""
+    bins = [_EMPTY] * NUM_BINS
+    for h in shingles(text):
+        b = h % NUM_BINS
+        if h < bins[b]:
+            bins[b] = h
+    if all(v == _EMPTY for v in bins):
+        return tuple(bins)
+    # Densify: an empty bin borrows the next non-empty one, offset by distance
+    out = list(bins)
+    for i, v in enumerate(bins):
+        if v != _EMPTY:
+            continue
+        step = 1
+        while bins[(i + step) % NUM_BINS] == _EMPTY:
+            step += 1
+        out[i] = bins[(i + step) % NUM_BINS] + step * _EMPTY
+    return tuple(out)
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_BINS
+
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures, keyed by caller-chosen keys."""
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self._signatures: dict[Hashable, tuple[int, ...]] = {}
+        self._buckets: dict[tuple[int, tuple[int, ...]], set[Hashable]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._signatures
+
+    @staticmethod
+    def _bands(sig: tuple[int, ...]) -> Iterable[tuple[int, tuple[int, ...]]]:
+        for band in range(BANDS):
+            yield band, sig[band * _ROWS:(band + 1) * _ROWS]
+
+    def add(self, key: Hashable, text: str) -> None:
+        if key not in self._signatures:
+            self.add_signature(key, signature(text))
+
+    def add_signature(self, key: Hashable, sig: tuple[int, ...]) -> None:
+        """Index a signature computed beforehand, e.g. outside a lock."""
+        if key in self._signatures:
+            return
+        self._signatures[key] = sig
+        for bucket in self._bands(sig):
+            self._buckets[bucket].add(key)
+
+    def remove(self, key: Hashable) -> None:
+        sig = self._signatures.pop(key, None)
+        if sig is None:
+            return
+        for bucket in self._bands(sig):
+            members = self._buckets[bucket]
+            members.discard(key)
+            if not members:
+                del self._buckets[bucket]
+
+    def similar(self, key: Hashable) -> list[Hashable]:
+        """Other indexed keys whose estimated similarity meets the threshold."""
+        sig = self._signatures.get(key)
+        if sig is None:
+            return []
+        candidates: set[Hashable] = set()
+        for bucket in self._bands(sig):
+            candidates |= self._buckets.get(bucket, set())
+        candidates.discard(key)
+        return [c for c in candidates if similarity(sig, self._signatures[c]) >= self.threshold]
@@ -18,10 +18,31 @@ Handles:
 from __future__ import annotations
 
 import hashlib
-import json
+import logging
+import os
 import re
-from dataclasses import dataclass, field
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import partial
 from pathlib import Path
+from typing import Callable, Hashable, Iterable, Mapping, Sequence, TypeVar
+
+from .bankimage import BankImage, MappedExam, write_image
+from .dedup import NearDuplicateIndex, signature, tokens
+from .jsonstream import iter_json_array
+from .search import ExamIndex, SearchHit, search as search_indexes
+from .snapshot import BankSnapshot, SnapshotEntry, SourceFingerprint
+from .tagging import current_rules_hash, infer_tags
+from .tagscoring import DEFAULT_THRESHOLD, TagScore, TagScorer
+from .tagsidecar import SIDECAR_FILENAME, SidecarTags, read_sidecar, write_sidecar
+
+logger = logging.getLogger("aws-exam-tools")
+
+T = TypeVar("T")
 
 
 # Friendly names for exam IDs
@@ -50,18 +71,86 @@ def _derive_title(exam_id: str) -> str:
     return exam_id
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Question:
+    """One parsed question. Slotted with tuple fields to keep 5k+ resident
+    questions small; repeated strings are shared through a StringPool."""
     exam_id: str
     index: int
     question_id: str
     question: str
-    options: list[str]
+    options: tuple[str, ...]
     correct: str
-    correct_indices: list[int]  # 0-based indices into options
+    correct_indices: tuple[int, ...]  # 0-based indices into options
     explanation: str | None
-    references: list[str]
+    references: tuple[str, ...]
     multi_select: bool
+    # Derived once at load so request handlers never recompute them
+    tags: tuple[str, ...]  # infer_tags(question)
+    correct_key: str  # correct, lower-cased (already stripped)
+    option_keys: tuple[str, ...]  # options, lower-cased (already stripped)
+
+
+# Fields a bulk fetch can project, as (response name, Question attribute)
+QUESTION_FIELDS: dict[str, str] = {
+    "exam_id": "exam_id",
+    "question": "question",
+    "options": "options",
+    "correct_answer": "correct",
+    "correct_indices": "correct_indices",
+    "explanation": "explanation",
+    "references": "references",
+    "tags": "tags",
+    "multi_select": "multi_select",
+}
+
+
+MAX_BULK_QUESTIONS = 100
+
+
+def bulk_request_error(question_ids: Sequence[str], fields: Iterable[str]) -> dict | None:
+    """The error payload for an invalid bulk fetch, or None if it is valid."""
+    if len(question_ids) > MAX_BULK_QUESTIONS:
+        return {
+            "error": "too_many_questions",
+            "message": f"Request at most {MAX_BULK_QUESTIONS} question_ids per call (got {len(question_ids)}).",
+        }
+    unknown = [f for f in fields if f not in QUESTION_FIELDS]
+    if unknown:
+        return {
+            "error": "invalid_fields",
+            "message": f"Unknown fields: {', '.join(unknown)}. Valid fields: {', '.join(QUESTION_FIELDS)}.",
+        }
+    return None
+
+
+def project_question(q: Question, fields: Iterable[str]) -> dict:
+    """JSON-ready dict of ``question_id`` plus the given QUESTION_FIELDS."""
+    out: dict = {"question_id": q.question_id}
+    for name in fields:
+        value = getattr(q, QUESTION_FIELDS[name])
+        out[name] = list(value) if isinstance(value, tuple) else value
+    return out
+
+
+class StringPool:
+    """Per-bank string table: equal strings are stored once.
+
+    Option labels ("A.", "B."), boilerplate such as "Explanation/Reference:",
+    reference URLs and correct answers (which repeat an option) recur across
+    a bank. Pickling preserves the sharing inside one exam's snapshot blob.
+    """
+
+    __slots__ = ("_table",)
+
+    def __init__(self) -> None:
+        self._table: dict[str, str] = {}
+
+    def __call__(self, s: str) -> str:
+        return self._table.setdefault(s, s)
+
+    def __len__(self) -> int:
+        return len(self._table)
 
 
 def _clean_question_text(text: str) -> str:
@@ -84,23 +173,27 @@ def _parse_references(raw: str | list | None) -> list[str]:
     return [r.strip() for r in refs if r.strip()]
 
 
-def _find_correct_indices(options: list[str], correct: str) -> list[int]:
-    """Find which option indices match the correct answer string."""
+def _find_correct_indices(options: list[str], correct: str, option_keys: list[str] | None = None) -> list[int]:
+    """Find which option indices match the correct answer string.
+
+    ``option_keys`` are the stripped, lower-cased options if already computed.
+    """
     if not correct:
         return []
 
     correct_normalized = correct.strip().lower()
+    keys = option_keys if option_keys is not None else [opt.strip().lower() for opt in options]
 
     # Exact match
-    for i, opt in enumerate(options):
-        if opt.strip().lower() == correct_normalized:
+    for i, key in enumerate(keys):
+        if key == correct_normalized:
             return [i]
 
     # Prefix match (handles truncated correct answers)
-    for i, opt in enumerate(options):
-        if opt.strip().lower().startswith(correct_normalized[:50]):
+    for i, key in enumerate(keys):
+        if key.startswith(correct_normalized[:50]):
             return [i]
-        if correct_normalized.startswith(opt.strip().lower()[:50]):
+        if correct_normalized.startswith(key[:50]):
             return [i]
 
     # Letter-prefix match (e.g., correct="A" matches "A. something")
@@ -113,118 +206,1003 @@ def _find_correct_indices(options: list[str], correct: str) -> list[int]:
     return []
 
 
+def _usable_fields(raw: object) -> tuple[str, list[str]] | None:
+    """Return (question text, options) for a usable raw entry, else None."""
+    if not isinstance(raw, dict):
+        return None
+
+    q_text = _clean_question_text(str(raw.get("question", "")))
+    if not q_text:
+        return None
+
+    options = [str(o).strip() for o in raw.get("options", []) if str(o).strip()]
+    if not options:
+        return None
+
+    return q_text, options
+
+
+def _question_id(exam_id: str, i: int, q_text: str) -> str:
+    """Stable question_id: exam_id + index + content hash."""
+    h = hashlib.sha256()
+    h.update(exam_id.encode("utf-8"))
+    h.update(str(i).encode("utf-8"))
+    h.update(q_text.encode("utf-8"))
+    return f"{exam_id}:{i}:{h.hexdigest()[:12]}"
+
+
+def _parse_question(
+    exam_id: str,
+    i: int,
+    raw: object,
+    pool: StringPool | None = None,
+    tags: Mapping[str, tuple[str, ...]] | None = None,
+) -> Question | None:
+    """Build a Question from one raw JSON entry, or None if it is unusable.
+
+    ``tags`` maps question ids to precomputed tags (the tag sidecar);
+    questions missing from it are tagged with infer_tags.
+    """
+    fields = _usable_fields(raw)
+    if fields is None:
+        return None
+    q_text, options = fields
+    intern = pool if pool is not None else StringPool()
+
+    correct = str(raw.get("correct", "")).strip()
+    explanation = raw.get("explanation")
+    if explanation:
+        explanation = str(explanation).strip()
+        # Clean "Explanation " prefix
+        if explanation.startswith("Explanation "):
+            explanation = explanation[len("Explanation "):]
+        elif explanation.startswith("Explanation\n"):
+            explanation = explanation[len("Explanation\n"):]
+
+    references = _parse_references(raw.get("references"))
+    option_keys = [intern(o.lower()) for o in options]
+    correct_key = intern(correct.lower())
+    correct_indices = _find_correct_indices(options, correct, option_keys)
+    multi_select = not correct  # empty correct = multi-select
+
+    question_id = _question_id(exam_id, i, q_text)
+    known = tags.get(question_id) if tags is not None else None
+
+    return Question(
+        exam_id=intern(exam_id),
+        index=i,
+        question_id=question_id,
+        question=q_text,
+        options=tuple(map(intern, options)),
+        correct=intern(correct),
+        correct_indices=tuple(correct_indices),
+        explanation=intern(explanation) if explanation else None,
+        references=tuple(map(intern, references)),
+        multi_select=multi_select,
+        tags=tuple(map(intern, known if known is not None else infer_tags(q_text))),
+        correct_key=correct_key,
+        option_keys=tuple(option_keys),
+    )
+
+
+def _body(q: Question) -> tuple:
+    """Content key: everything except the question's identity in its bank."""
+    return (q.question, q.options, q.correct, q.explanation, q.references)
+
+
+def _share_body(q: Question, canonical: Question) -> Question:
+    """Rebuild ``q`` on top of an identical question's field objects."""
+    return replace(
+        q,
+        question=canonical.question,
+        options=canonical.options,
+        correct=canonical.correct,
+        correct_indices=canonical.correct_indices,
+        explanation=canonical.explanation,
+        references=canonical.references,
+        tags=canonical.tags,
+        correct_key=canonical.correct_key,
+        option_keys=canonical.option_keys,
+    )
+
+
+def _mapped_question(exam_id: str, **fields) -> Question:
+    """Build a Question from the fields stored in a bank image record."""
+    return Question(
+        exam_id=exam_id,
+        correct_key=fields["correct"].lower(),
+        option_keys=tuple(o.lower() for o in fields["options"]),
+        **fields,
+    )
+
+
+def _near_text(q: Question) -> str:
+    return " ".join((q.question, *q.options))
+
+
+def _search_text(q: Question) -> str:
+    return " ".join((q.question, *q.options, q.explanation or ""))
+
+
+def _normalized(q: Question) -> tuple:
+    """Content key that ignores spacing, case and punctuation."""
+    return (tokens(q.question), [tokens(o) for o in q.options], tokens(q.correct))
+
+
+def _parse_exam_file(path: Path, tags: Mapping[str, tuple[str, ...]] | None = None) -> list[Question]:
+    """Parse one *.json question bank. Invalid files yield no questions.
+
+    Entries are decoded one at a time, so only the Question objects (not
+    the file text or the raw list) accumulate while a large bank loads.
+    ``tags`` holds the exam's precomputed tags from the sidecar, if any.
+    """
+    exam_id = path.stem
+    pool = StringPool()
+    questions: list[Question] = []
+    try:
+        for i, raw in enumerate(iter_json_array(path)):
+            q = _parse_question(exam_id, i, raw, pool, tags)
+            if q is not None:
+                questions.append(q)
+    except ValueError:  # JSONDecodeError / UnicodeDecodeError
+        return []  # skip invalid files
+    return questions
+
+
+def _tag_exam_file(path: Path) -> list[tuple[str, list[str]]]:
+    """(question_id, tags) for every usable question, for the tag sidecar."""
+    exam_id = path.stem
+    tagged: list[tuple[str, list[str]]] = []
+    try:
+        for i, raw in enumerate(iter_json_array(path)):
+            fields = _usable_fields(raw)
+            if fields is not None:
+                tagged.append((_question_id(exam_id, i, fields[0]), infer_tags(fields[0])))
+    except ValueError:
+        return []
+    return tagged
+
+
+def _count_exam_file(path: Path) -> int:
+    """Count usable questions without building Question objects."""
+    try:
+        return sum(1 for raw in iter_json_array(path) if _usable_fields(raw) is not None)
+    except ValueError:
+        return 0
+
+
+@dataclass(frozen=True)
+class ExamManifest:
+    """Lightweight per-exam metadata, available without the question bodies."""
+    exam_id: str
+    title: str
+    question_count: int
+    path: Path
+    size: int  # source JSON bytes, used as the resident-cost estimate
+    fingerprint: SourceFingerprint
+
+
+@dataclass
+class ReloadMetrics:
+    """Counters describing hot reloads of the question directory."""
+    reloads: int = 0
+    failed_reloads: int = 0
+    files_reparsed: int = 0
+    last_reload_at: float | None = None
+    last_duration_ms: float | None = None
+    last_latency_ms: float | None = None  # newest source change -> swap
+    last_changed: list[str] = field(default_factory=list)
+
+
+class _BankState:
+    """One consistent view of the question directory.
+
+    load_all/reload build a new state off to the side and publish it with a
+    single reference assignment, so readers see either the old bank or the
+    new one, never a half-loaded mix. After publication only the lazy-mode
+    resident set changes, under ``lock``.
+    """
+
+    def __init__(self, snapshot: BankSnapshot | None, image: BankImage | None = None):
+        self.snapshot = snapshot
+        self.image = image
+        self.tag_rules = current_rules_hash()  # rules the questions were tagged with
+        self.sources: dict[Path, SourceFingerprint] = {}
+        self.counts: dict[Path, int] = {}
+        self.manifest: dict[str, ExamManifest] = {}
+        self.lock = threading.RLock()
+        # Resident exams in least-recently-used order; MappedExam sequences
+        # in image mode, where questions are decoded on access
+        self.exams: OrderedDict[str, Sequence[Question]] = OrderedDict()
+        self.resident_bytes = 0
+        # Hash indexes over resident exams for O(1) lookups; by_id only
+        # holds parsed (list-mode) questions
+        self.by_id: dict[str, Question] = {}
+        self.ids: dict[str, list[str]] = {}
+        # Content-addressed dedup: content key (the body tuple, or the image
+        # record digest) -> resident question ids sharing it
+        self.keys: dict[str, Hashable] = {}
+        self.bodies: dict[Hashable, list[str]] = {}
+        # Near-duplicate index over bodies, filled per exam by
+        # ExamBank.build_duplicate_index (or on first use)
+        self.near = NearDuplicateIndex()
+        self.near_exams: set[str] = set()
+        # Per-exam tag -> positions of the questions carrying it, in bank order
+        self.tags: dict[str, dict[str, array]] = {}
+        # BM25 indexes per exam, built on first search; they hold ids only,
+        # so they outlive eviction of the exam's questions
+        self.search: dict[str, ExamIndex] = {}
+        # Tag scorer fitted across all exams on first use of
+        # ExamBank.score_tags: the scorer and, per exam, its question ids
+        # with their raw similarities; ranked into tag_scores per exam on
+        # first request. tag_fit_lock makes concurrent first calls share
+        # one fit without holding ``lock``.
+        self.tag_fit: tuple[TagScorer, dict[str, tuple[list[str], list[dict[int, float]]]]] | None = None
+        self.tag_fit_lock = threading.Lock()
+        self.tag_scores: dict[str, dict[str, list[TagScore]]] = {}
+
+    def add_source(self, path: Path, fingerprint: SourceFingerprint, count: int) -> None:
+        self.sources[path] = fingerprint
+        self.counts[path] = count
+        if count == 0:
+            return
+        exam_id = path.stem
+        self.manifest[exam_id] = ExamManifest(
+            exam_id=exam_id,
+            title=_derive_title(exam_id),
+            question_count=count,
+            path=path,
+            size=fingerprint.size,
+            fingerprint=fingerprint,
+        )
+
+    def register(self, exam_id: str, questions: Sequence[Question]) -> None:
+        """Install a parsed or mapped exam and its lookup indexes."""
+        if not questions:
+            return
+        self.exams[exam_id] = questions
+        self.resident_bytes += self.manifest[exam_id].size
+        tag_index: dict[str, array] = {}
+        mapped = isinstance(questions, MappedExam)
+        for n in range(len(questions)):
+            for tag in questions.tags_at(n) if mapped else questions[n].tags:
+                positions = tag_index.get(tag)
+                if positions is None:
+                    positions = tag_index[tag] = array("I")
+                positions.append(n)
+        self.tags[exam_id] = tag_index
+        if mapped:
+            # The image already stores each distinct string once
+            self.ids[exam_id] = questions.ids
+            for qid, digest in zip(questions.ids, questions.digests):
+                self.keys[qid] = digest
+                self.bodies.setdefault(digest, []).append(qid)
+            return
+        self.ids[exam_id] = [q.question_id for q in questions]
+        for i, q in enumerate(questions):
+            body = _body(q)
+            group = self.bodies.get(body)
+            if group is None:
+                self.bodies[body] = [q.question_id]
+            else:
+                first = self.by_id[group[0]]
+                if first.question is not q.question:
+                    q = questions[i] = _share_body(q, first)
+                group.append(q.question_id)
+            self.keys[q.question_id] = body
+            self.by_id[q.question_id] = q
+
+    def evict(self, exam_id: str) -> None:
+        """Drop a resident exam and its lookup indexes."""
+        self.exams.pop(exam_id)
+        self.tags.pop(exam_id)
+        self.near_exams.discard(exam_id)
+        self.resident_bytes -= self.manifest[exam_id].size
+        for qid in self.ids.pop(exam_id):
+            self.by_id.pop(qid, None)
+            key = self.keys.pop(qid, None)
+            group = self.bodies.get(key) if key is not None else None
+            if group is not None:
+                group.remove(qid)
+                if not group:
+                    del self.bodies[key]
+                    self.near.remove(key)
+
+    def question(self, question_id: str) -> Question | None:
+        """A resident question by id, or None."""
+        q = self.by_id.get(question_id)
+        if q is None:
+            exam = self.exams.get(question_id.split(":")[0])
+            if isinstance(exam, MappedExam):
+                q = exam.get(question_id)
+        return q
+
+    def duplicates(self, q: Question, exam_ids: Iterable[str] | None = None) -> tuple[list[str], list[str]]:
+        """(exact, near) duplicate ids of ``q`` among resident questions.
+
+        Near-duplicates are searched in ``exam_ids`` (default: every resident
+        exam); those exams are added to the MinHash index on first use.
+        """
+        for exam_id in list(self.exams) if exam_ids is None else exam_ids:
+            if exam_id in self.near_exams or exam_id not in self.exams:
+                continue
+            for other in self.exams[exam_id]:
+                self.near.add(self.keys[other.question_id], _near_text(other))
+            self.near_exams.add(exam_id)
+        key = self.keys.get(q.question_id)
+        if key is None:
+            return [], []
+        exact = [qid for qid in self.bodies.get(key, ()) if qid != q.question_id]
+        near = [qid for other in self.near.similar(key) for qid in self.bodies[other]]
+        return exact, near
+
+
 class ExamBank:
-    """Loads and provides access to exam question banks."""
+    """Loads and provides access to exam question banks.
+
+    If ``cache_path`` is given, parsed banks are persisted to a compiled
+    snapshot there and reused on later startups for every source file whose
+    size, mtime and content hash are unchanged.
+
+    With ``lazy=True`` load_all only builds the exam manifest (ids, titles,
+    question counts); an exam's questions are parsed the first time they are
+    needed. ``memory_budget_bytes`` caps the resident exams (estimated by
+    source JSON size) and evicts the least recently used ones; the exam
+    being accessed always stays resident.
+
+    ``workers`` spreads JSON parsing across a process pool (0 = one per CPU,
+    1 = serial, the default). Parsing is CPU-bound and files are independent.
+
+    ``reload`` (or the polling watcher from ``start_watching``) re-parses
+    only the files that changed and atomically swaps in the new bank.
 
-    def __init__(self, question_dir: Path):
+    Questions with identical content (the same question in several bank
+    versions, or repeated within one bank) share a single set of field
+    objects; ``duplicates_of`` also reports near-identical questions.
+
+    With ``image_path`` every bank is served from a read-only memory-mapped
+    image (see bankimage) instead of parsed objects: processes on one host
+    that open the same image share the question text through the page
+    cache. The image is rebuilt when source files change and replaces the
+    snapshot as the startup cache; ``cache_path`` and ``lazy`` only apply
+    if it cannot be written.
+
+    Tags come from the tag sidecar in the question directory when one was
+    written under the current rules (see tagsidecar and
+    ``write_tag_sidecar``); otherwise questions are tagged as they are
+    parsed.
+    """
+
+    def __init__(
+        self,
+        question_dir: Path,
+        cache_path: Path | None = None,
+        lazy: bool = False,
+        memory_budget_bytes: int | None = None,
+        workers: int = 1,
+        image_path: Path | None = None,
+    ):
         self.question_dir = question_dir
-        self._exams: dict[str, list[Question]] = {}
-        self._titles: dict[str, str] = {}
+        self.cache_path = cache_path
+        self.image_path = image_path
+        self.lazy = lazy
+        self.memory_budget_bytes = memory_budget_bytes
+        self.workers = workers
+        self._state = _BankState(None)
+        self._reload_lock = threading.Lock()
+        self._metrics = ReloadMetrics()
+        self._watch_stop: threading.Event | None = None
+        self._watch_thread: threading.Thread | None = None
+        self._sidecar: tuple[Hashable, SidecarTags] | None = None
+
+    # --- Loading ---
 
     def load_all(self) -> None:
-        """Load all *.json question files from the question directory."""
+        """Scan the question directory and load (or, if lazy, index) every bank."""
         if not self.question_dir.exists():
             raise FileNotFoundError(f"Question directory not found: {self.question_dir}")
 
-        self._exams.clear()
-        self._titles.clear()
+        with self._reload_lock:
+            self._state = self._build_state(None)
+
+    def reload(self) -> list[str]:
+        """Re-scan the question directory and swap in the updated bank.
 
-        for f in sorted(self.question_dir.glob("*.json")):
-            exam_id = f.stem
+        Unchanged files are carried over from the current bank; only new or
+        modified files are parsed. Returns the exam ids that were added,
+        changed or removed (empty if nothing changed).
+        """
+        if not self.question_dir.exists():
+            raise FileNotFoundError(f"Question directory not found: {self.question_dir}")
+
+        with self._reload_lock:
+            started = time.perf_counter()
+            previous = self._state
             try:
-                data = json.loads(f.read_text(encoding="utf-8"))
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                continue  # skip invalid files
+                state = self._build_state(previous)
+            except Exception:
+                self._metrics.failed_reloads += 1
+                raise
+
+            modified = [f for f, fp in state.sources.items() if previous.sources.get(f) != fp]
+            removed = [f for f in previous.sources if f not in state.sources]
+            retagged = state.tag_rules != previous.tag_rules
+            if not modified and not removed and not retagged:
+                return []
+
+            # Swap even for touch-only edits so the recorded mtimes catch up
+            self._state = state
+            if retagged:
+                modified = list(state.sources)
+            changed = sorted(
+                {f.stem for f in modified
+                 if retagged or f not in previous.sources or previous.sources[f].sha256 != state.sources[f].sha256}
+                | {f.stem for f in removed}
+            )
+            if not changed:
+                return []
+
+            now = time.time()
+            newest = max(
+                (state.sources[f].mtime_ns for f in modified if f.stem in changed), default=None
+            )
+            m = self._metrics
+            m.reloads += 1
+            m.files_reparsed += sum(1 for f in modified if f.stem in changed)
+            m.last_reload_at = now
+            m.last_duration_ms = round((time.perf_counter() - started) * 1000, 3)
+            m.last_latency_ms = round(max(0.0, now - newest / 1e9) * 1000, 3) if newest else None
+            m.last_changed = changed
+            return changed
+
+    def has_changes(self) -> bool:
+        """Cheap stat-only check for added, removed or modified source files."""
+        if self._state.tag_rules != current_rules_hash():
+            return True
+        sources = self._state.sources
+        files = set(self.question_dir.glob("*.json"))
+        if files != set(sources):
+            return True
+        for f in files:
+            st = f.stat()
+            fp = sources[f]
+            if st.st_size != fp.size or st.st_mtime_ns != fp.mtime_ns:
+                return True
+        return False
+
+    def start_watching(self, interval: float = 2.0) -> None:
+        """Poll the question directory in a daemon thread and reload on change."""
+        if self._watch_thread is not None:
+            return
+        stop = threading.Event()
+
+        def watch() -> None:
+            while not stop.wait(interval):
+                try:
+                    if self.has_changes():
+                        changed = self.reload()
+                        if changed:
+                            logger.info(
+                                "Reloaded question banks (%s) in %.1f ms",
+                                ", ".join(changed), self._metrics.last_duration_ms,
+                            )
+                except Exception:
+                    logger.exception("Question bank reload failed; keeping previous bank")
+
+        self._watch_stop = stop
+        self._watch_thread = threading.Thread(target=watch, name="exam-bank-watcher", daemon=True)
+        self._watch_thread.start()
+
+    def stop_watching(self) -> None:
+        if self._watch_thread is None:
+            return
+        self._watch_stop.set()
+        self._watch_thread.join()
+        self._watch_thread = None
+        self._watch_stop = None
+
+    def reload_metrics(self) -> dict:
+        """Reload counters plus resident-set size, for monitoring."""
+        state = self._state
+        m = self._metrics
+        return {
+            "exams": len(state.manifest),
+            "resident_exams": len(state.exams),
+            "resident_bytes": state.resident_bytes,
+            "resident_questions": sum(len(ids) for ids in state.ids.values()),
+            "unique_questions": len(state.bodies),
+            "reloads": m.reloads,
+            "failed_reloads": m.failed_reloads,
+            "files_reparsed": m.files_reparsed,
+            "last_reload_at": m.last_reload_at,
+            "last_reload_duration_ms": m.last_duration_ms,
+            "last_reload_latency_ms": m.last_latency_ms,
+            "last_changed": list(m.last_changed),
+        }
+
+    def _map(self, fn: Callable[..., T], files: list[Path], *args: Iterable) -> list[T]:
+        """Apply fn to every file, across worker processes if enabled.
+
+        ``args`` are extra per-file argument iterables, as for ``map``.
+        Results come back in input order, so parallel and serial loads
+        produce identical banks.
+        """
+        workers = self.workers or os.cpu_count() or 1
+        if workers <= 1 or len(files) < 2:
+            return list(map(fn, files, *args))
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+            return list(pool.map(fn, files, *args))
 
-            if not isinstance(data, list):
+    def _sidecar_tags(self) -> SidecarTags:
+        """Precomputed tags from the question directory's tag sidecar.
+
+        Empty if there is no sidecar or it was written under other rules.
+        Re-read only when the file or the rules change.
+        """
+        path = self.question_dir / SIDECAR_FILENAME
+        try:
+            st = path.stat()
+            key = (st.st_size, st.st_mtime_ns, current_rules_hash())
+        except OSError:
+            key = None
+        cached = self._sidecar
+        if cached is None or cached[0] != key:
+            tags = read_sidecar(path) if key is not None else None
+            if key is not None and tags is None:
+                logger.info("Tag sidecar %s is stale or unreadable; tagging questions live", path)
+            cached = self._sidecar = (key, tags or {})
+        return cached[1]
+
+    def _parse_files(self, files: list[Path]) -> list[list[Question]]:
+        """Parse files (in parallel if enabled), taking tags from the sidecar."""
+        if not files:
+            return []
+        sidecar = self._sidecar_tags()
+        return self._map(_parse_exam_file, files, [sidecar.get(f.stem) for f in files])
+
+    def write_tag_sidecar(self, path: Path | None = None) -> int:
+        """Tag every question in every bank and write the tag sidecar.
+
+        Files are tagged across the worker pool. Writes to the question
+        directory unless ``path`` is given; returns the number of questions.
+        """
+        files = sorted(self.question_dir.glob("*.json"))
+        tagged = self._map(_tag_exam_file, files)
+        return write_sidecar(
+            path or self.question_dir / SIDECAR_FILENAME,
+            {f.stem: pairs for f, pairs in zip(files, tagged) if pairs},
+        )
+
+    @staticmethod
+    def _fingerprint(path: Path, previous: _BankState | None) -> SourceFingerprint:
+        """Fingerprint a file, skipping the content hash if its stat is unchanged."""
+        prev = previous.sources.get(path) if previous else None
+        if prev is not None:
+            st = path.stat()
+            if st.st_size == prev.size and st.st_mtime_ns == prev.mtime_ns:
+                return prev
+        return SourceFingerprint.of(path)
+
+    def _build_state(self, previous: _BankState | None) -> _BankState:
+        """Build a complete bank state, reusing unchanged exams from ``previous``."""
+        if previous is not None and previous.tag_rules != current_rules_hash():
+            previous = None  # its questions carry tags from the old rules
+        if self.image_path is not None:
+            state = self._build_image_state(previous)
+            if state is not None:
+                return state
+        files = sorted(self.question_dir.glob("*.json"))
+        snapshot = BankSnapshot.open(self.cache_path) if self.cache_path is not None else None
+        state = _BankState(snapshot)
+        fps = {f: self._fingerprint(f, previous) for f in files}
+
+        counts: dict[Path, int] = {}
+        loaded: dict[Path, list[Question]] = {}
+        reused: set[Path] = set()
+        for f in files:
+            prev = previous.sources.get(f) if previous else None
+            if prev is not None and prev.sha256 == fps[f].sha256:
+                reused.add(f)
+                counts[f] = previous.counts[f]
+                if f.stem in previous.exams:
+                    loaded[f] = previous.exams[f.stem]
+                continue
+            entry = snapshot.entries.get(f.stem) if snapshot else None
+            if entry is None or entry.fingerprint != fps[f]:
                 continue
+            if self.lazy:
+                counts[f] = entry.count
+                continue
+            questions = snapshot.load_exam(f.stem)
+            if questions is not None:
+                counts[f] = entry.count
+                loaded[f] = questions
 
-            questions: list[Question] = []
-            for i, raw in enumerate(data):
-                if not isinstance(raw, dict):
-                    continue
+        stale = [f for f in files if f not in counts]
+        if self.lazy and self.cache_path is None:
+            counts.update(zip(stale, self._map(_count_exam_file, stale)))
+        else:
+            for f, questions in zip(stale, self._parse_files(stale)):
+                counts[f] = len(questions)
+                loaded[f] = questions
 
-                q_text = _clean_question_text(str(raw.get("question", "")))
-                if not q_text:
-                    continue
+        for f in files:
+            state.add_source(f, fps[f], counts[f])
 
-                options = [str(o).strip() for o in raw.get("options", []) if str(o).strip()]
-                if not options:
-                    continue
+        if previous is not None:
+            state.search.update(
+                (f.stem, previous.search[f.stem]) for f in reused if f.stem in previous.search
+            )
 
-                correct = str(raw.get("correct", "")).strip()
-                explanation = raw.get("explanation")
-                if explanation:
-                    explanation = str(explanation).strip()
-                    # Clean "Explanation " prefix
-                    if explanation.startswith("Explanation "):
-                        explanation = explanation[len("Explanation "):]
-                    elif explanation.startswith("Explanation\n"):
-                        explanation = explanation[len("Explanation\n"):]
-
-                references = _parse_references(raw.get("references"))
-                correct_indices = _find_correct_indices(options, correct)
-                multi_select = not correct  # empty correct = multi-select
-
-                # Stable question_id: exam_id + index + content hash
-                h = hashlib.sha256()
-                h.update(exam_id.encode("utf-8"))
-                h.update(str(i).encode("utf-8"))
-                h.update(q_text.encode("utf-8"))
-                question_id = f"{exam_id}:{i}:{h.hexdigest()[:12]}"
-
-                questions.append(
-                    Question(
-                        exam_id=exam_id,
-                        index=i,
-                        question_id=question_id,
-                        question=q_text,
-                        options=options,
-                        correct=correct,
-                        correct_indices=correct_indices,
-                        explanation=explanation if explanation else None,
-                        references=references,
-                        multi_select=multi_select,
-                    )
-                )
+        if not self.lazy:
+            for f in files:
+                state.register(f.stem, loaded.get(f, []))
+        elif previous is not None:
+            # Keep the previous working set warm, in its LRU order
+            for exam_id in list(previous.exams):
+                f = previous.manifest[exam_id].path
+                if f in reused and exam_id in state.manifest:
+                    state.register(exam_id, previous.exams[exam_id])
+
+        if self.cache_path is not None:
+            self._write_snapshot(state, files, loaded)
+        return state
+
+    def _build_image_state(self, previous: _BankState | None) -> _BankState | None:
+        """Build a state served from the bank image, rewriting it if stale.
+
+        Returns None if the image cannot be written.
+        """
+        files = sorted(self.question_dir.glob("*.json"))
+        fps = {f: self._fingerprint(f, previous) for f in files}
+
+        def current(image: BankImage | None) -> bool:
+            return (
+                image is not None
+                and image.tag_rules == current_rules_hash()
+                and set(image.sources) == {f.stem for f in files}
+                and all(image.sources[f.stem] == fps[f] for f in files)
+            )
+
+        image = previous.image if previous is not None else None
+        if not current(image):
+            image = BankImage.open(self.image_path)
+        if not current(image):
+            old = image
+            payloads: dict[str, tuple[SourceFingerprint, Sequence[Question]]] = {}
+            stale = []
+            for f in files:
+                if old is not None and f.stem in old.sources and old.sources[f.stem].sha256 == fps[f].sha256:
+                    payloads[f.stem] = (fps[f], old.exam(f.stem, partial(_mapped_question, f.stem)))
+                else:
+                    stale.append(f)
+            for f, questions in zip(stale, self._parse_files(stale)):
+                payloads[f.stem] = (fps[f], questions)
+            try:
+                write_image(self.image_path, {f.stem: payloads[f.stem] for f in files})
+            except (OSError, ValueError) as e:
+                logger.warning("Could not write bank image %s: %s", self.image_path, e)
+                return None
+            image = BankImage.open(self.image_path)
+            if image is None:
+                return None
 
-            if questions:
-                self._exams[exam_id] = questions
-                self._titles[exam_id] = _derive_title(exam_id)
+        state = _BankState(None, image)
+        for f in files:
+            state.add_source(f, fps[f], image.count(f.stem))
+        if previous is not None:
+            state.search.update(
+                (f.stem, previous.search[f.stem]) for f in files
+                if f.stem in previous.search and f in previous.sources
+                and previous.sources[f].sha256 == fps[f].sha256
+            )
+        for f in files:
+            if f.stem in state.manifest:
+                state.register(f.stem, image.exam(f.stem, partial(_mapped_question, f.stem)))
+        return state
+
+    def _write_snapshot(self, state: _BankState, files: list[Path], loaded: dict[Path, list[Question]]) -> None:
+        """Rewrite the snapshot if it does not match the state's sources."""
+        snapshot = state.snapshot
+        if snapshot is not None and set(snapshot.entries) == {f.stem for f in files} and all(
+            snapshot.entries[f.stem].fingerprint == state.sources[f] for f in files
+        ):
+            return
+
+        entries: dict[str, SnapshotEntry] = {}
+        payloads: dict[str, list[Question] | bytes] = {}
+        for f in files:
+            fp = state.sources[f]
+            entries[f.stem] = SnapshotEntry(fingerprint=fp, count=state.counts[f])
+            if f in loaded:
+                payloads[f.stem] = loaded[f]
+                continue
+            # Lazy mode: copy the unchanged blob rather than unpickling it
+            entry = snapshot.entries.get(f.stem) if snapshot else None
+            blob = None
+            if entry is not None and entry.fingerprint.sha256 == fp.sha256:
+                try:
+                    blob = snapshot.read_blob(f.stem)
+                except OSError:
+                    blob = None
+            payloads[f.stem] = blob if blob is not None else _parse_exam_file(f, self._sidecar_tags().get(f.stem))
+
+        try:
+            BankSnapshot.write(self.cache_path, entries, payloads)
+        except OSError as e:
+            logger.warning("Could not write bank snapshot %s: %s", self.cache_path, e)
+            return
+        state.snapshot = BankSnapshot.open(self.cache_path)
+
+    # --- Access ---
+
+    def _load_exam(self, state: _BankState, exam_id: str) -> list[Question]:
+        """Parse one exam from the snapshot (if still valid) or its source file."""
+        m = state.manifest[exam_id]
+        snapshot = state.snapshot
+        if snapshot is not None:
+            cached = snapshot.entries.get(exam_id)
+            if cached is not None and cached.fingerprint.sha256 == m.fingerprint.sha256:
+                questions = snapshot.load_exam(exam_id)
+                if questions is not None:
+                    return questions
+        return _parse_exam_file(m.path, self._sidecar_tags().get(exam_id))
+
+    def _exam(self, state: _BankState, exam_id: str) -> list[Question]:
+        """Return an exam's questions, loading it on demand in lazy mode."""
+        questions = state.exams.get(exam_id)
+        if questions is not None:
+            if self.lazy:
+                with state.lock:
+                    if exam_id in state.exams:
+                        state.exams.move_to_end(exam_id)
+            return questions
+
+        if exam_id not in state.manifest:
+            raise KeyError(f"Unknown exam_id: {exam_id}")
+
+        with state.lock:
+            questions = state.exams.get(exam_id)
+            if questions is None:
+                questions = self._load_exam(state, exam_id)
+                state.register(exam_id, questions)
+                budget = self.memory_budget_bytes
+                while budget is not None and state.resident_bytes > budget and len(state.exams) > 1:
+                    state.evict(next(iter(state.exams)))
+            return questions
+
+    def resident_exams(self) -> list[str]:
+        """Exam ids currently held in memory, least recently used first."""
+        return list(self._state.exams)
 
     def list_exams(self) -> dict[str, int]:
         """Return {exam_id: question_count}."""
-        return {eid: len(qs) for eid, qs in self._exams.items()}
+        return {eid: m.question_count for eid, m in self._state.manifest.items()}
 
     def get_title(self, exam_id: str) -> str:
-        return self._titles.get(exam_id, exam_id)
+        m = self._state.manifest.get(exam_id)
+        return m.title if m else exam_id
 
     def get_question_by_id(self, question_id: str) -> Question:
         """Look up a question by its stable question_id."""
+        state = self._state
+        q = state.question(question_id)
+        if q is not None:
+            return q
         exam_id = question_id.split(":")[0]
-        if exam_id not in self._exams:
-            raise KeyError(f"Unknown exam_id: {exam_id}")
-        for q in self._exams[exam_id]:
+        questions = self._exam(state, exam_id)  # raises KeyError for unknown exams
+        q = state.question(question_id)
+        if q is not None:
+            return q
+        # Only reached if the exam was evicted again by a concurrent load
+        for q in questions:
             if q.question_id == question_id:
                 return q
         raise KeyError(f"Unknown question_id: {question_id}")
 
+    def get_questions(self, question_ids: Iterable[str], skip_missing: bool = False) -> list[Question]:
+        """Look up many questions at once, in the order given.
+
+        Each exam involved is loaded at most once, even in lazy mode with a
+        memory budget small enough to evict it mid-batch. Unknown ids raise
+        KeyError unless ``skip_missing`` is set, in which case they are
+        left out of the result.
+        """
+        state = self._state
+        fallback: dict[str, dict[str, Question]] = {}
+        out: list[Question] = []
+        for qid in question_ids:
+            q = state.question(qid)
+            if q is None:
+                exam_id = qid.split(":")[0]
+                if exam_id not in fallback:
+                    try:
+                        questions = self._exam(state, exam_id)
+                    except KeyError:
+                        questions = []
+                    fallback[exam_id] = {x.question_id: x for x in questions}
+                q = fallback[exam_id].get(qid)
+            if q is None:
+                if skip_missing:
+                    continue
+                raise KeyError(f"Unknown question_id: {qid}")
+            out.append(q)
+        return out
+
     def get_question_by_index(self, exam_id: str, index: int) -> Question:
         """Get question by exam_id and sequential index."""
-        if exam_id not in self._exams:
-            raise KeyError(f"Unknown exam_id: {exam_id}")
-        qs = self._exams[exam_id]
+        qs = self._exam(self._state, exam_id)
         if index < 0 or index >= len(qs):
             raise IndexError(f"Index {index} out of range for {exam_id} (0..{len(qs)-1})")
         return qs[index]
 
     def question_count(self, exam_id: str) -> int:
-        if exam_id not in self._exams:
+        m = self._state.manifest.get(exam_id)
+        if m is None:
             raise KeyError(f"Unknown exam_id: {exam_id}")
-        return len(self._exams[exam_id])
+        return m.question_count
 
     def all_question_ids(self, exam_id: str) -> list[str]:
         """Get all question IDs for an exam."""
-        if exam_id not in self._exams:
+        state = self._state
+        questions = self._exam(state, exam_id)
+        ids = state.ids.get(exam_id)
+        return list(ids) if ids is not None else [q.question_id for q in questions]
+
+    def question_ids_with_tags(self, exam_id: str, tags: Iterable[str]) -> list[str]:
+        """Ids of an exam's questions carrying any of ``tags``, in bank order.
+
+        Served from a tag -> question index built when the exam is loaded,
+        so the cost follows the number of matching questions, not the bank.
+        """
+        state = self._state
+        with state.lock:
+            # Loads (lazy mode) or re-loads (evicted meanwhile) the exam;
+            # raises KeyError for unknown exams
+            self._exam(state, exam_id)
+            tag_index = state.tags[exam_id]
+            ids = state.ids[exam_id]
+        positions = sorted(set().union(*(tag_index.get(t, ()) for t in set(tags))))
+        return [ids[n] for n in positions]
+
+    def duplicates_of(self, question_id: str) -> list[str]:
+        """Ids of resident questions with identical or near-identical content.
+
+        Covers every resident exam, so the same question re-published in
+        another bank version is found too. In lazy mode exams that are not
+        resident are not searched.
+        """
+        state = self._state
+        q = self.get_question_by_id(question_id)
+        with state.lock:
+            resident = list(state.exams)
+        self.build_duplicate_index(resident)  # signs outside the lock
+        with state.lock:
+            exact, near = state.duplicates(q)
+        return exact + near
+
+    def build_search_index(self, exam_ids: Iterable[str] | None = None) -> None:
+        """Build the full-text index for ``exam_ids`` (default: every exam).
+
+        Indexes are otherwise built on first search; the server calls this
+        in the background after startup so the first query is fast too.
+        """
+        state = self._state
+        for exam_id in list(state.manifest) if exam_ids is None else exam_ids:
+            if exam_id in state.search:
+                continue
+            questions = self._exam(state, exam_id)
+            with state.lock:
+                if exam_id not in state.search:
+                    state.search[exam_id] = ExamIndex(
+                        exam_id, ((q.question_id, _search_text(q)) for q in questions)
+                    )
+
+    def build_duplicate_index(self, exam_ids: Iterable[str] | None = None) -> None:
+        """Add ``exam_ids`` (default: every exam) to the near-duplicate index.
+
+        MinHash signatures are computed outside the bank lock, which is
+        only held to insert them. Exams are otherwise indexed on first use;
+        the server calls this in the background after startup.
+        """
+        state = self._state
+        for exam_id in list(state.manifest) if exam_ids is None else exam_ids:
+            if exam_id in state.near_exams:
+                continue
+            questions = self._exam(state, exam_id)
+            with state.lock:
+                keys = [state.keys.get(q.question_id) for q in questions]
+            signatures = {
+                key: signature(_near_text(q))
+                for q, key in zip(questions, keys) if key is not None and key not in state.near
+            }
+            with state.lock:
+                if state.exams.get(exam_id) is not questions or exam_id in state.near_exams:
+                    continue  # evicted or indexed meanwhile
+                for key, sig in signatures.items():
+                    state.near.add_signature(key, sig)
+                state.near_exams.add(exam_id)
+
+    def search(self, query: str, exam_id: str | None = None, limit: int = 10) -> list[SearchHit]:
+        """BM25-ranked questions matching ``query`` across all exams or one.
+
+        Searches question text, options and explanations.
+        """
+        state = self._state
+        if exam_id is not None and exam_id not in state.manifest:
             raise KeyError(f"Unknown exam_id: {exam_id}")
-        return [q.question_id for q in self._exams[exam_id]]
+        scope = list(state.manifest) if exam_id is None else [exam_id]
+        self.build_search_index(scope)
+        return search_indexes([state.search[eid] for eid in scope], query, limit)
+
+    def score_tags(self, exam_id: str, threshold: float = DEFAULT_THRESHOLD) -> dict[str, list[TagScore]]:
+        """Confidence-ranked tags for every question of an exam (see tagscoring).
+
+        Tags below ``threshold`` are left out. The first call fits the
+        scorer on every exam's question text, options and explanations and
+        scores all questions in one pass; the scores are kept until the
+        next reload.
+
+        The fit does not hold the bank lock, and reads exams that are not
+        resident (lazy mode) without making them resident, so it neither
+        blocks other requests nor evicts exams.
+        """
+        state = self._state
+        if exam_id not in state.manifest:
+            raise KeyError(f"Unknown exam_id: {exam_id}")
+        ranked = state.tag_scores.get(exam_id)
+        if ranked is None:
+            scorer, rows = self._tag_fit(state)
+            ids, similarities = rows[exam_id]
+            ranked = {qid: scorer.rank(row, 0.0) for qid, row in zip(ids, similarities)}
+            with state.lock:
+                ranked = state.tag_scores.setdefault(exam_id, ranked)
+        return {qid: [s for s in scores if s.confidence >= threshold] for qid, scores in ranked.items()}
+
+    def _tag_fit(self, state: _BankState) -> tuple[TagScorer, dict[str, tuple[list[str], list[dict[int, float]]]]]:
+        with state.tag_fit_lock:
+            if state.tag_fit is None:
+                ids: dict[str, list[str]] = {}
+                texts: list[str] = []
+                for eid in state.manifest:
+                    questions = state.exams.get(eid)
+                    if questions is None:
+                        questions = self._load_exam(state, eid)  # a private copy, not registered
+                    ids[eid] = [q.question_id for q in questions]
+                    texts.extend(_search_text(q) for q in questions)
+                scorer = TagScorer()
+                similarities = iter(scorer.similarities(scorer.fit(texts)))
+                rows = {eid: (qids, [next(similarities) for _ in qids]) for eid, qids in ids.items()}
+                state.tag_fit = (scorer, rows)
+            return state.tag_fit
+
+    def unseen_question_ids(self, exam_id: str, seen_ids: Iterable[str], skip_duplicates: bool = True) -> list[str]:
+        """An exam's question ids minus ``seen_ids`` and their duplicates.
+
+        Used by question selection so a question already served is not
+        served again under another id. Near-duplicates only count when they
+        differ from the seen question in spacing, case or punctuation: banks
+        contain question series that share a scenario and differ in a single
+        sentence, and those must still be served. Unknown seen ids are ignored.
+
+        With ``skip_duplicates=False`` this is a plain set difference, so
+        the ids left match ``question_count - len(seen_ids)`` (exam mode,
+        where every question is scored).
+        """
+        state = self._state
+        ids = self.all_question_ids(exam_id)
+        covered = set(seen_ids)
+        if not skip_duplicates:
+            return [qid for qid in ids if qid not in covered]
+        self.build_duplicate_index([exam_id])
+        with state.lock:
+            for qid in list(covered):
+                q = state.question(qid)
+                if q is None:
+                    continue
+                exact, near = state.duplicates(q, [exam_id])
+                covered.update(exact)
+                if near:
+                    key = _normalized(q)
+                    covered.update(n for n in near if _normalized(state.question(n)) == key)
+        return [qid for qid in ids if qid not in covered]
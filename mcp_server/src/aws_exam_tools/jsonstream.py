@@ -0,0 +1,94 @@
+"""Incremental reader for top-level JSON arrays.
+
+``json.loads(path.read_text())`` keeps the whole file text, the full list
+of raw dicts and whatever is built from them alive at once. Question banks
+are a single JSON array, so they can instead be decoded one element at a
+time from a fixed-size read buffer: peak memory is the buffer plus the
+largest single element, whatever the file size.
+"""
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterator
+
+CHUNK_SIZE = 1 << 16
+
+_WS = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+_AFTER_VALUE = frozenset(",] \t\n\r")
+
+
+def iter_json_array(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the elements of the JSON array stored in ``path``, in order.
+
+    A file whose top-level value is not an array yields nothing. Malformed
+    JSON (including trailing garbage after the array) raises ValueError once
+    the reader reaches it, so callers that need all-or-nothing semantics
+    should collect the elements inside a ``try``.
+    """
+    with path.open(encoding="utf-8") as fh:
+        buf = fh.read(chunk_size)
+        pos = 0
+        eof = not buf
+
+        def refill() -> None:
+            # Grow the read with the pending data so one huge element costs
+            # O(n log n) re-decodes rather than O(n^2 / chunk_size).
+            nonlocal buf, pos, eof
+            chunk = fh.read(max(chunk_size, len(buf) - pos))
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip_ws() -> bool:
+            """Advance past whitespace; False if the input ended."""
+            nonlocal pos
+            while True:
+                pos = _WS.match(buf, pos).end()
+                if pos < len(buf):
+                    return True
+                if eof:
+                    return False
+                refill()
+
+        if not skip_ws() or buf[pos] != "[":
+            return
+        pos += 1
+        if not skip_ws():
+            raise json.JSONDecodeError("Unterminated array", buf, pos)
+        if buf[pos] == "]":
+            pos += 1
+        else:
+            while True:
+                while True:
+                    try:
+                        value, end = _DECODER.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        refill()
+                        continue
+                    if not eof and (end == len(buf) or buf[end] not in _AFTER_VALUE):
+                        # A number cut by the chunk boundary ("2." of "2.5")
+                        # decodes as its prefix; re-read with more input
+                        refill()
+                        continue
+                    break
+                pos = end
+                yield value
+
+                if not skip_ws():
+                    raise json.JSONDecodeError("Unterminated array", buf, pos)
+                sep = buf[pos]
+                pos += 1
+                if sep == "]":
+                    break
+                if sep != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos - 1)
+                if not skip_ws():
+                    raise json.JSONDecodeError("Unterminated array", buf, pos)
+
+        if skip_ws():
+            raise json.JSONDecodeError("Extra data", buf, pos)
@@ -78,3 +78,31 @@ class SessionStatusResponse(BaseModel):
     strong_tags: list[str] = Field(default_factory=list)
     remaining_questions: int
     mastery_level: str  # "beginner" | "intermediate" | "advanced" | "expert"
+
+
+class QuestionsResponse(BaseModel):
+    questions: list[dict[str, Any]] = Field(
+        default_factory=list, description="question_id plus the requested fields, in request order"
+    )
+    missing: list[str] = Field(default_factory=list, description="Requested ids that do not exist")
+
+
+class KbSearchHit(BaseModel):
+    question_id: str
+    exam_id: str
+    score: float
+    question: str
+    correct_answer: str
+    explanation: Optional[str] = None
+
+
+class KbSearchResponse(BaseModel):
+    query: str
+    exam_id: Optional[str] = None
+    results: list[KbSearchHit] = Field(default_factory=list)
+
+
+class MetricsResponse(BaseModel):
+    bank: dict[str, Any] = Field(default_factory=dict)
+    tagging: dict[str, Any] = Field(default_factory=dict)
+    sessions: dict[str, Any] = Field(default_factory=dict)
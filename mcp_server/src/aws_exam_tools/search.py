@@ -0,0 +1,104 @@
+"""BM25 full-text search over question banks.
+
+Each exam gets its own inverted index (term -> postings of question
+number and term frequency) over the question text, options and
+explanation. Keeping one index per exam lets a hot reload rebuild only
+the banks that changed, and makes exam_id filtering free: a filtered
+query only touches that exam's postings. Corpus statistics (document
+count, average length, document frequency) are summed over the exams
+being searched at query time, so scores are comparable across banks.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from .dedup import tokens
+
+K1 = 1.2
+B = 0.75
+
+# Very common English words carry no ranking signal and make up most postings
+STOPWORDS = frozenset("""
+a an and are as at be by can for from has have how in is it its of on or
+should that the this to was what when which who will with you your
+""".split())
+
+
+def _terms(text: str) -> list[str]:
+    return [t for t in tokens(text) if t not in STOPWORDS]
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    question_id: str
+    exam_id: str
+    score: float
+
+
+class ExamIndex:
+    """Inverted index over one exam's questions."""
+
+    __slots__ = ("exam_id", "question_ids", "lengths", "total_length", "postings")
+
+    def __init__(self, exam_id: str, docs: Iterable[tuple[str, str]]):
+        """Index ``docs``, an iterable of (question_id, searchable text)."""
+        self.exam_id = exam_id
+        self.question_ids: list[str] = []
+        self.lengths = array("I")
+        # term -> (question numbers, term frequencies), both compact arrays
+        self.postings: dict[str, tuple[array, array]] = {}
+        for n, (qid, text) in enumerate(docs):
+            terms = _terms(text)
+            self.question_ids.append(qid)
+            self.lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                plist = self.postings.get(term)
+                if plist is None:
+                    plist = self.postings[term] = (array("I"), array("H"))
+                plist[0].append(n)
+                plist[1].append(min(tf, 0xFFFF))
+        self.total_length = sum(self.lengths)
+
+    def __len__(self) -> int:
+        return len(self.question_ids)
+
+    def df(self, term: str) -> int:
+        plist = self.postings.get(term)
+        return len(plist[0]) if plist else 0
+
+
+def search(indexes: Sequence[ExamIndex], query: str, limit: int = 10) -> list[SearchHit]:
+    """Rank questions in ``indexes`` against ``query`` with Okapi BM25."""
+    terms = set(_terms(query))
+    n_docs = sum(len(ix) for ix in indexes)
+    if not terms or not n_docs:
+        return []
+    avgdl = (sum(ix.total_length for ix in indexes) / n_docs) or 1.0
+
+    idf: dict[str, float] = {}
+    for term in terms:
+        df = sum(ix.df(term) for ix in indexes)
+        if df:
+            idf[term] = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    scored: list[tuple[float, str, str]] = []
+    for ix in indexes:
+        scores: dict[int, float] = {}
+        lengths = ix.lengths
+        for term, w in idf.items():
+            plist = ix.postings.get(term)
+            if plist is None:
+                continue
+            for n, tf in zip(*plist):
+                norm = K1 * (1 - B + B * lengths[n] / avgdl)
+                scores[n] = scores.get(n, 0.0) + w * tf * (K1 + 1) / (tf + norm)
+        ids = ix.question_ids
+        scored.extend((score, ids[n], ix.exam_id) for n, score in scores.items())
+
+    top = heapq.nlargest(limit, scored, key=lambda t: t[0])
+    return [SearchHit(question_id=qid, exam_id=eid, score=round(score, 4)) for score, qid, eid in top]
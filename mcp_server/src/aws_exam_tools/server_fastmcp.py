@@ -6,36 +6,62 @@ Enterprise MCP server exposing exam simulator tools:
   - exam_next_question: Get next question (adaptive in learning mode)
   - exam_submit_answer: Submit an answer, get feedback + remediation
   - exam_get_explanation: Get explanation for any question
+  - exam_get_questions: Fetch many questions (with answers/explanations) in one call
   - session_get_status: Check session accuracy, weak areas, mastery
+  - kb_search: Full-text (BM25) search over questions, options and explanations
+  - server_get_metrics: Operational metrics (question bank reloads, residency, tag memo, session cache)
 
 Environment variables:
   AWS_EXAM_QUESTION_DIR: Path to directory containing *.json question banks
   AWS_EXAM_DB_PATH: Path to SQLite database file (default: ./state/aws_exam.sqlite)
+  AWS_EXAM_DB_POOL_SIZE: Pooled SQLite connections shared by the tools (default 4)
+  AWS_EXAM_SESSION_CACHE_SIZE: Hot sessions kept in memory, written through to SQLite (default 256; 0 disables)
+  AWS_EXAM_WRITE_BEHIND: "true" to commit answers in groups from a background thread
+  AWS_EXAM_WRITE_BATCH: Most answers per group commit (default 50)
+  AWS_EXAM_WRITE_DELAY_MS: Longest an answer waits for its group commit (default 20)
+  AWS_EXAM_DB_DURABILITY: "fsync", "commit" (default) or, with write-behind, "queued"
+    (answers return before they are committed; a crash loses the last batch)
+  AWS_EXAM_BANK_SNAPSHOT: Path to the parsed-bank snapshot cache
+    (default: question_bank.snapshot next to the database; empty disables it)
+  AWS_EXAM_LAZY_LOAD: "true" to index exams at startup and parse each on first use
+  AWS_EXAM_MEMORY_BUDGET_MB: Resident exam budget for lazy mode (LRU eviction; 0 = unlimited)
+  AWS_EXAM_LOAD_WORKERS: Processes used to parse question files (1 = serial, 0 = one per CPU)
+  AWS_EXAM_WATCH_INTERVAL: Seconds between checks for edited question files (0 disables hot reload)
+  AWS_EXAM_BANK_IMAGE: Path to a shared memory-mapped bank image (unset or empty disables)
+  AWS_EXAM_TAG_BACKEND: Domain tag matcher, "regex" (default) or "aho-corasick"
+  AWS_EXAM_TAG_CACHE_SIZE: Entries in the tag inference memo (default 8192; 0 disables)
 
 IMPORTANT: All logging goes to stderr to avoid corrupting MCP stdio protocol.
 """
 from __future__ import annotations
 
+import atexit
 import logging
 import os
 import random
 import sys
+import threading
 from pathlib import Path
 
 from fastmcp import FastMCP
 
-from .exam_bank import ExamBank
+from .exam_bank import MAX_BULK_QUESTIONS, QUESTION_FIELDS, ExamBank, Question, bulk_request_error, project_question
 from .models import (
     ExamInfo,
     ExamListResponse,
     ExplanationResponse,
+    KbSearchHit,
+    KbSearchResponse,
+    MetricsResponse,
     NextQuestionResponse,
+    QuestionsResponse,
     SessionStatusResponse,
     StartSessionResponse,
     SubmitAnswerResponse,
 )
-from .session_store import SessionStore
-from .tagging import infer_tags
+from .session_store import AsyncSessionStore, SessionStore
+from .snapshot import SNAPSHOT_FILENAME
+from .tagging import tag_cache_info
 
 # Log to stderr only - never stdout (stdio MCP protocol)
 logging.basicConfig(
@@ -54,7 +80,7 @@ mcp = FastMCP(
 )
 
 
-def _settings() -> tuple[Path, Path]:
+def _settings() -> tuple[Path, Path, Path | None]:
     """Read configuration from environment."""
     question_dir = os.getenv("AWS_EXAM_QUESTION_DIR", "")
     if not question_dir:
@@ -67,19 +93,64 @@ def _settings() -> tuple[Path, Path]:
         os.getenv("AWS_EXAM_DB_PATH", "./state/aws_exam.sqlite")
     ).expanduser().resolve()
 
-    return qpath, db_path
+    snapshot = os.getenv("AWS_EXAM_BANK_SNAPSHOT")
+    if snapshot is None:
+        snapshot_path: Path | None = db_path.parent / SNAPSHOT_FILENAME
+    elif snapshot:
+        snapshot_path = Path(snapshot).expanduser().resolve()
+    else:
+        snapshot_path = None
+
+    return qpath, db_path, snapshot_path
+
+
+def _bank_options() -> dict:
+    """Read ExamBank loading options from environment."""
+    budget_mb = int(os.getenv("AWS_EXAM_MEMORY_BUDGET_MB", "0"))
+    image = os.getenv("AWS_EXAM_BANK_IMAGE")
+    return {
+        "lazy": os.getenv("AWS_EXAM_LAZY_LOAD", "false").lower() == "true",
+        "memory_budget_bytes": budget_mb * 1024 * 1024 if budget_mb > 0 else None,
+        "workers": int(os.getenv("AWS_EXAM_LOAD_WORKERS", "1")),
+        "image_path": Path(image).expanduser().resolve() if image else None,
+    }
 
 
-QUESTION_DIR, DB_PATH = _settings()
-BANK = ExamBank(QUESTION_DIR)
+QUESTION_DIR, DB_PATH, SNAPSHOT_PATH = _settings()
+BANK = ExamBank(QUESTION_DIR, cache_path=SNAPSHOT_PATH, **_bank_options())
 BANK.load_all()
-STORE = SessionStore(DB_PATH)
+# The tools run on the event loop: SQLite work goes to the store's threads
+STORE = AsyncSessionStore(SessionStore(
+    DB_PATH,
+    pool_size=int(os.getenv("AWS_EXAM_DB_POOL_SIZE", "4")),
+    session_cache_size=int(os.getenv("AWS_EXAM_SESSION_CACHE_SIZE", "256")),
+    write_behind=os.getenv("AWS_EXAM_WRITE_BEHIND", "false").lower() == "true",
+    durability=os.getenv("AWS_EXAM_DB_DURABILITY", "commit"),
+    batch_size=int(os.getenv("AWS_EXAM_WRITE_BATCH", "50")),
+    batch_delay=float(os.getenv("AWS_EXAM_WRITE_DELAY_MS", "20")) / 1000,
+))
+atexit.register(STORE.close)  # commits answers still queued for write-behind
 
 logger.info("Loaded %d exams from %s", len(BANK.list_exams()), QUESTION_DIR)
 for eid, count in BANK.list_exams().items():
     logger.info("  %s: %d questions (%s)", eid, count, BANK.get_title(eid))
 
 
+def _build_indexes() -> None:
+    BANK.build_search_index()
+    BANK.build_duplicate_index()
+
+
+# Build the kb_search and duplicate indexes off the startup path (lazy mode
+# builds them per exam on demand)
+if not BANK.lazy:
+    threading.Thread(target=_build_indexes, name="bank-indexes", daemon=True).start()
+
+WATCH_INTERVAL = float(os.getenv("AWS_EXAM_WATCH_INTERVAL", "2"))
+if WATCH_INTERVAL > 0:
+    BANK.start_watching(WATCH_INTERVAL)
+
+
 # --- MCP Tools ---
 
 
@@ -116,7 +187,7 @@ async def exam_start_session(
 ) -> dict:
     """Start a new exam session."""
     total = BANK.question_count(exam_id)  # validates exam exists
-    s = STORE.create(exam_id=exam_id, mode=mode, user_id=user_id)
+    s = await STORE.create(exam_id=exam_id, mode=mode, user_id=user_id)
     return StartSessionResponse(
         session_id=s.session_id,
         exam_id=exam_id,
@@ -125,7 +196,7 @@ async def exam_start_session(
     ).model_dump()
 
 
-def _pick_next_question_id(session_id: str) -> tuple[str, int]:
+async def _pick_next_question_id(session_id: str) -> tuple[str, int]:
     """Adaptive question selection algorithm.
 
     In learning mode:
@@ -135,36 +206,28 @@ def _pick_next_question_id(session_id: str) -> tuple[str, int]:
 
     Returns (question_id, question_number_1_indexed).
     """
-    s = STORE.load(session_id)
+    s = await STORE.load(session_id)
     total = BANK.question_count(s.exam_id)
 
-    # Build unseen set
-    all_ids = set(BANK.all_question_ids(s.exam_id))
-    seen_ids = set(s.asked_ids)
-    unseen_ids = all_ids - seen_ids
+    # Unseen questions, skipping duplicates of ones already asked; exam mode
+    # serves every question, matching remaining_questions in session_get_status
+    unseen_list = BANK.unseen_question_ids(s.exam_id, s.asked_ids, skip_duplicates=s.mode != "exam")
 
-    if not unseen_ids:
+    if not unseen_list:
         # All questions seen - recycle in learning/practice, end in exam
         if s.mode == "exam":
             raise StopIteration("All questions answered in exam mode")
-        unseen_ids = all_ids  # recycle
-
-    unseen_list = list(unseen_ids)
+        unseen_list = BANK.all_question_ids(s.exam_id)  # recycle
 
     # In learning mode, bias toward weak areas
     if s.mode in ("learning", "practice"):
-        weak = STORE.weak_tags(session_id, min_asked=2, top_n=3)
+        weak = await STORE.weak_tags(session_id, min_asked=2, top_n=3)
         if weak:
-            # Find unseen questions matching weak tags
-            candidates = []
-            for qid in unseen_list:
-                q = BANK.get_question_by_id(qid)
-                tags = infer_tags(q.question)
-                if any(t in tags for t in weak):
-                    candidates.append(qid)
+            # Unseen questions matching weak tags, via the bank's tag index
+            unseen = set(unseen_list)
+            candidates = [qid for qid in BANK.question_ids_with_tags(s.exam_id, weak) if qid in unseen]
             if candidates:
                 chosen = random.choice(candidates)
-                q = BANK.get_question_by_id(chosen)
                 return chosen, len(s.asked_ids) + 1
 
     # Default: random unseen
@@ -181,11 +244,11 @@ def _pick_next_question_id(session_id: str) -> tuple[str, int]:
 )
 async def exam_next_question(session_id: str) -> dict:
     """Get the next question for this session."""
-    s = STORE.load(session_id)
+    s = await STORE.load(session_id)
     total = BANK.question_count(s.exam_id)
 
     try:
-        qid, qnum = _pick_next_question_id(session_id)
+        qid, qnum = await _pick_next_question_id(session_id)
     except StopIteration:
         return {
             "error": "exam_complete",
@@ -193,7 +256,7 @@ async def exam_next_question(session_id: str) -> dict:
         }
 
     q = BANK.get_question_by_id(qid)
-    tags = infer_tags(q.question)
+    tags = list(q.tags)
 
     return NextQuestionResponse(
         session_id=session_id,
@@ -219,7 +282,7 @@ def _normalize_answer(options: list[str], answer_text: str | None, answer_index:
     raise ValueError("Provide either answer_text or answer_index")
 
 
-def _check_answer(question_correct: str, submitted: str, options: list[str]) -> bool:
+def _check_answer(q: Question, submitted: str) -> bool:
     """Check if submitted answer matches the correct answer.
 
     Handles various matching strategies:
@@ -227,21 +290,24 @@ def _check_answer(question_correct: str, submitted: str, options: list[str]) ->
     2. Normalized match (case-insensitive, stripped)
     3. Prefix letter match (e.g., "A" matches "A. something")
     4. Option-index match
+
+    The question side uses ``q.correct_key``, normalized once at load.
     """
-    if not question_correct:
+    if not q.correct:
         return False  # multi-select: can't auto-grade
 
+    sub = submitted.strip()
     # Exact
-    if submitted.strip() == question_correct.strip():
+    if sub == q.correct:
         return True
 
     # Case-insensitive
-    if submitted.strip().lower() == question_correct.strip().lower():
+    sub_lower = sub.lower()
+    cor_lower = q.correct_key
+    if sub_lower == cor_lower:
         return True
 
     # Prefix match (common with truncated options)
-    sub_lower = submitted.strip().lower()
-    cor_lower = question_correct.strip().lower()
     if len(sub_lower) > 10 and cor_lower.startswith(sub_lower[:50]):
         return True
     if len(cor_lower) > 10 and sub_lower.startswith(cor_lower[:50]):
@@ -264,14 +330,14 @@ async def exam_submit_answer(
     answer_index: int | None = None,
 ) -> dict:
     """Submit an answer and get feedback."""
-    s = STORE.load(session_id)
+    s = await STORE.load(session_id)
     q = BANK.get_question_by_id(question_id)
 
     submitted = _normalize_answer(q.options, answer_text, answer_index)
-    correct = _check_answer(q.correct, submitted, q.options)
-    tags = infer_tags(q.question)
+    correct = _check_answer(q, submitted)
+    tags = list(q.tags)
 
-    STORE.record_answer(
+    await STORE.record_answer(
         session_id=session_id,
         question_id=question_id,
         tags=tags,
@@ -329,6 +395,30 @@ async def exam_get_explanation(question_id: str) -> dict:
     ).model_dump()
 
 
+@mcp.tool(
+    description=(
+        f"Fetch up to {MAX_BULK_QUESTIONS} questions by question_id in a single call, e.g. to "
+        "pre-render a practice set. Returns each question with its options, "
+        "correct answer, explanation, references and tags. Pass 'fields' to "
+        "return only some of: " + ", ".join(QUESTION_FIELDS) + ". Unknown ids "
+        "are listed under 'missing'."
+    ),
+)
+async def exam_get_questions(question_ids: list[str], fields: list[str] | None = None) -> dict:
+    """Bulk fetch of questions with optional field projection."""
+    fields = list(QUESTION_FIELDS) if fields is None else fields
+    error = bulk_request_error(question_ids, fields)
+    if error is not None:
+        return error
+
+    found = BANK.get_questions(question_ids, skip_missing=True)
+    found_ids = {q.question_id for q in found}
+    return QuestionsResponse(
+        questions=[project_question(q, fields) for q in found],
+        missing=[qid for qid in question_ids if qid not in found_ids],
+    ).model_dump()
+
+
 @mcp.tool(
     description=(
         "Get session status: accuracy, weak/strong tags, mastery level, "
@@ -338,23 +428,61 @@ async def exam_get_explanation(question_id: str) -> dict:
 )
 async def session_get_status(session_id: str) -> dict:
     """Return session status with analytics."""
-    s = STORE.load(session_id)
-    total = BANK.question_count(s.exam_id)
-    asked = len(s.asked_ids)
-    accuracy = (s.correct_count / asked) if asked else 0.0
+    st = await STORE.status(session_id)
+    total = BANK.question_count(st.exam_id)
 
     return SessionStatusResponse(
         session_id=session_id,
-        exam_id=s.exam_id,
-        mode=s.mode,
-        asked_count=asked,
-        correct_count=s.correct_count,
-        incorrect_count=s.incorrect_count,
-        accuracy=round(accuracy, 4),
-        weak_tags=STORE.weak_tags(session_id, min_asked=2, top_n=5),
-        strong_tags=STORE.strong_tags(session_id, min_asked=3, top_n=5),
-        remaining_questions=max(0, total - asked),
-        mastery_level=STORE.mastery_level(session_id),
+        exam_id=st.exam_id,
+        mode=st.mode,
+        asked_count=st.asked_count,
+        correct_count=st.correct_count,
+        incorrect_count=st.incorrect_count,
+        accuracy=round(st.accuracy, 4),
+        weak_tags=list(st.weak_tags),
+        strong_tags=list(st.strong_tags),
+        remaining_questions=max(0, total - st.asked_count),
+        mastery_level=st.mastery_level,
+    ).model_dump()
+
+
+@mcp.tool(
+    description=(
+        "Search the question banks (question text, options and explanations) "
+        "for a topic or keywords. Returns the best-matching questions with their "
+        "correct answers and explanations, ranked by relevance. Optionally "
+        "restrict to one exam_id. Useful for finding related material to teach "
+        "a concept."
+    ),
+)
+async def kb_search(query: str, exam_id: str | None = None, limit: int = 5) -> dict:
+    """Full-text search across the loaded question banks."""
+    limit = max(1, min(limit, 50))
+    results = []
+    for hit in BANK.search(query, exam_id=exam_id, limit=limit):
+        q = BANK.get_question_by_id(hit.question_id)
+        results.append(KbSearchHit(
+            question_id=hit.question_id,
+            exam_id=hit.exam_id,
+            score=hit.score,
+            question=q.question,
+            correct_answer=q.correct,
+            explanation=q.explanation,
+        ))
+    return KbSearchResponse(query=query, exam_id=exam_id, results=results).model_dump()
+
+
+@mcp.tool(
+    description=(
+        "Get operational metrics for the exam server: question bank hot-reload "
+        "count, latency and duration, how many exams are resident in memory, "
+        "tag inference memo hits and misses, and session cache hit rates."
+    ),
+)
+async def server_get_metrics() -> dict:
+    """Return operational metrics."""
+    return MetricsResponse(
+        bank=BANK.reload_metrics(), tagging=tag_cache_info(), sessions=STORE.cache_info(),
     ).model_dump()
 
 
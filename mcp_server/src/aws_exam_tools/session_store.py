@@ -2,15 +2,64 @@
 
 Tracks exam sessions, answers, per-tag accuracy, and weak-area detection.
 Designed to swap cleanly to Postgres by replacing this class.
+
+Schema (version 3, in ``PRAGMA user_version``): ``sessions`` holds one
+row per session with its counters, updated in place; ``answers`` is
+append-only, ``asked_questions`` has one row per question asked and
+``tag_counters`` one row of asked/correct counts per (session, tag).
+Recording an answer therefore writes the same few rows however long the
+session is, and weak/strong tags are a LIMIT query over one session's
+counters. Older databases, which kept these as JSON in ``sessions``,
+are migrated on open.
+
+Connections are reused from a small bounded pool rather than opened per
+call. The database runs in WAL mode, so readers never block the writer
+(and vice versa); writes take the write lock up front (BEGIN IMMEDIATE)
+and wait up to ``busy_timeout`` seconds for it.
+
+``AsyncSessionStore`` wraps a store for async callers, running its
+SQLite calls off the event loop.
 """
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
+import queue
 import sqlite3
+import threading
 import time
 import uuid
-from dataclasses import dataclass, field
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import Any, Callable, Iterator
+
+logger = logging.getLogger("aws-exam-tools")
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_BUSY_TIMEOUT = 5.0  # seconds
+DEFAULT_STATUS_CACHE_SIZE = 1024
+DEFAULT_SESSION_CACHE_SIZE = 256
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_BATCH_DELAY = 0.02  # seconds
+MAX_ASYNC_WRITERS = 4  # writer threads an AsyncSessionStore gives concurrent waiting answers
+# How far record_answer goes before returning:
+#   "fsync"  - its transaction is committed and synced (synchronous=FULL)
+#   "commit" - its transaction is committed (synchronous=NORMAL: a power
+#              loss may undo the last commits, never corrupt the database)
+#   "queued" - the answer is queued (write-behind only: a crash loses the
+#              answers of the current batch)
+DURABILITY_LEVELS = ("fsync", "commit", "queued")
+_MMAP_SIZE = 64 * 1024 * 1024
+_CACHE_KIB = 8 * 1024
+# 1: answers, asked ids and tag stats as JSON columns of ``sessions``
+# 2: answers and asked ids in their own tables
+# 3: per-tag counters in their own table
+SCHEMA_VERSION = 3
 
 
 @dataclass
@@ -35,21 +84,466 @@ class Session:
     tag_stats: dict[str, dict[str, int]]  # {tag: {"asked": n, "correct": n}}
 
 
+@dataclass(frozen=True)
+class SessionStatus:
+    """Session analytics derived from one consistent read."""
+
+    session_id: str
+    exam_id: str
+    mode: str
+    asked_count: int
+    correct_count: int
+    incorrect_count: int
+    accuracy: float  # correct answers per distinct question asked
+    weak_tags: tuple[str, ...]
+    strong_tags: tuple[str, ...]
+    mastery_level: str
+
+
+class _VersionedCache:
+    """Bounded LRU of per-session values, invalidated by writes, with hit/miss counters.
+
+    Every ``invalidate`` or ``write`` gives the session a new version. A
+    reader takes ``version(key)`` before reading the database and passes
+    it to ``put``, which drops the value if the session was written in
+    between, so a value read before a write is never cached after it.
+    Versions of uncached sessions are forgotten in bulk by raising the
+    default version (``_floor``) past all of them.
+
+    ``copy``, if given, is applied to values handed out by ``get`` (under
+    the lock), so callers never share a cached value that ``write``
+    mutates in place.
+    """
+
+    def __init__(self, maxsize: int, copy: Callable[[Any], Any] | None = None):
+        self.maxsize = maxsize
+        self._copy = copy
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._seq = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, record_miss: bool = True):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                if record_miss:
+                    self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._copy(value) if self._copy else value
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def version(self, key: str) -> int:
+        with self._lock:
+            return self._versions.get(key, self._floor)
+
+    def put(self, key: str, version: int, value: object) -> None:
+        with self._lock:
+            if self.maxsize <= 0 or self._versions.get(key, self._floor) != version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._bump(key)
+
+    def write(self, key: str, apply: Callable[[Any], None]) -> Any:
+        """Write-through: ``apply`` the change to the cached value, if any, and return that value."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                apply(value)
+            self._bump(key)
+            return value
+
+    def committed(self, key: str, written: Any) -> None:
+        """After the commit of a ``write``: drop what readers cached in between.
+
+        A reader that missed the cache between the write and its commit
+        read the state before the commit. Only ``written``, the value the
+        write was applied to (as returned by ``write``), is kept.
+        """
+        with self._lock:
+            if self._entries.get(key) is not written:
+                self._entries.pop(key, None)
+            self._bump(key)
+
+    def _bump(self, key: str) -> None:
+        self._seq += 1
+        self._versions[key] = self._seq
+        if len(self._versions) > 2 * self.maxsize + 64:
+            self._floor = self._seq
+            self._versions = {k: v for k, v in self._versions.items() if k in self._entries}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._seq += 1
+            self._floor = self._seq
+            self._versions = {}
+
+    def info(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+def _apply_answer(answer: AnswerRecord, first_ask: bool | None, s: Session) -> None:
+    """Apply one recorded answer to a cached session, as record_answer does to the database.
+
+    ``first_ask`` None: not known from the database yet; look it up.
+    """
+    if first_ask is None:
+        first_ask = answer.question_id not in s.asked_ids
+    if first_ask:
+        s.asked_ids.append(answer.question_id)
+    s.answers.append(answer)
+    if answer.correct:
+        s.correct_count += 1
+    else:
+        s.incorrect_count += 1
+    for t in answer.tags:
+        st = s.tag_stats.setdefault(t, {"asked": 0, "correct": 0})
+        st["asked"] += 1
+        if answer.correct:
+            st["correct"] += 1
+
+
+def _copy_session(s: Session) -> Session:
+    return replace(
+        s,
+        asked_ids=list(s.asked_ids),
+        answers=list(s.answers),
+        tag_stats={tag: dict(st) for tag, st in s.tag_stats.items()},
+    )
+
+
+def _rank_tags(counters: list[tuple[str, int, int]], min_asked: int, top_n: int, reverse: bool) -> tuple[str, ...]:
+    """``SessionStore._ranked_tags`` over (tag, asked, correct) rows in first-seen order."""
+    scored = [(tag, right / asked) for tag, asked, right in counters if asked >= min_asked]
+    scored.sort(key=lambda x: x[1], reverse=reverse)  # stable: ties keep first-seen order
+    return tuple(t for t, _ in scored[:max(top_n, 0)])
+
+
+class _ConnectionPool:
+    """At most ``size`` connections, each used by one thread at a time."""
+
+    def __init__(self, connect, size: int):
+        if size < 1:
+            raise ValueError(f"pool size must be at least 1, got {size}")
+        self.size = size
+        self._connect = connect
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open: list[sqlite3.Connection] = []
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+                with self._lock:
+                    self._open.append(conn)
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._open = self._open, []
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for conn in conns:
+            conn.close()
+
+
+@dataclass
+class _QueuedAnswer:
+    session_id: str
+    answer: AnswerRecord
+    done: Future | None  # None: nobody waits ("queued" durability)
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class _GroupCommit:
+    """Write-behind queue of answers, committed in batches by a background thread.
+
+    A batch is committed once it holds ``batch_size`` answers or its
+    oldest answer has waited ``batch_delay`` seconds, whichever comes
+    first; ``flush`` and ``close`` commit at once. It is also committed
+    as soon as every writer inside ``writer()`` has queued its answer,
+    since nobody else is about to join the batch: callers that wait for
+    their commit are then never held back by the delay.
+    """
+
+    def __init__(self, commit: Callable[[list[_QueuedAnswer]], None], batch_size: int, batch_delay: float):
+        if batch_size < 1:
+            raise ValueError(f"batch size must be at least 1, got {batch_size}")
+        self._commit = commit
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._cond = threading.Condition()
+        self._queue: list[_QueuedAnswer] = []
+        self._pending: Counter[str] = Counter()  # queued or being committed, per session
+        self._unflushed = 0
+        self._urgent = 0  # threads waiting in flush or settle
+        self._writers = 0  # threads inside writer()
+        self._waiters = 0  # queued answers whose writer waits for the commit
+        self._closing = False
+        self.batches = 0
+        self.answers = 0
+        self._thread = threading.Thread(target=self._run, name="session-store-flusher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: _QueuedAnswer) -> None:
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("session store is closed")
+            self._queue.append(item)
+            self._pending[item.session_id] += 1
+            self._unflushed += 1
+            if item.done is not None:
+                self._waiters += 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def writer(self) -> Iterator[None]:
+        """Mark a caller that is about to submit an answer and wait for it."""
+        with self._cond:
+            self._writers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writers -= 1
+                self._cond.notify_all()
+
+    def settle(self, session_id: str) -> None:
+        """Wait until every queued answer of ``session_id`` is committed."""
+        with self._cond:
+            self._wait(lambda: not self._pending[session_id])
+
+    def flush(self) -> None:
+        """Commit everything queued so far, and wait for it."""
+        with self._cond:
+            self._wait(lambda: not self._unflushed)
+
+    def _wait(self, done: Callable[[], bool]) -> None:
+        if done():
+            return
+        self._urgent += 1
+        self._cond.notify_all()
+        try:
+            self._cond.wait_for(done)
+        finally:
+            self._urgent -= 1
+
+    def close(self) -> None:
+        """Commit what is queued and stop the flusher thread."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def info(self) -> dict:
+        with self._cond:
+            return {
+                "queued": self._unflushed,
+                "batches": self.batches,
+                "answers": self.answers,
+                "mean_batch": round(self.answers / self.batches, 2) if self.batches else 0.0,
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closing)
+                if not self._queue:
+                    return  # closing, nothing left
+                deadline = self._queue[0].queued_at + self.batch_delay
+                while not (
+                    len(self._queue) >= self.batch_size or self._closing or self._urgent
+                    or 0 < self._writers <= self._waiters
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._queue[:self.batch_size]
+                del self._queue[:self.batch_size]
+                self._waiters -= sum(item.done is not None for item in batch)
+            try:
+                self._commit(batch)
+            except BaseException:
+                logger.exception("Group commit of %d answers failed", len(batch))
+            with self._cond:
+                for item in batch:
+                    self._pending[item.session_id] -= 1
+                    if self._pending[item.session_id] <= 0:
+                        del self._pending[item.session_id]
+                self._unflushed -= len(batch)
+                self.batches += 1
+                self.answers += len(batch)
+                self._cond.notify_all()
+
+
 class SessionStore:
-    """SQLite-backed session and progress tracking."""
+    """SQLite-backed session and progress tracking.
+
+    Safe to share between threads: each call checks a connection out of
+    the pool (waiting if all ``pool_size`` are busy).
 
-    def __init__(self, sqlite_path: Path):
+    The ``session_cache_size`` most recently used sessions are kept in
+    memory. Writes go to SQLite and, in the same step, to the cached
+    session, so ``load`` of a hot session does no I/O; ``load`` returns a
+    copy either way. The cache only sees this store's writes: call
+    ``invalidate`` if another process may have written a session.
+
+    With ``write_behind``, answers are committed by a background thread
+    in batches of up to ``batch_size`` answers or ``batch_delay`` seconds
+    (group commit): one transaction and one sync per batch instead of per
+    answer. ``durability`` (see DURABILITY_LEVELS) decides whether
+    record_answer waits for its batch's commit. Call ``close`` (or at
+    least ``flush``) on shutdown so queued answers are not lost.
+    """
+
+    def __init__(
+        self,
+        sqlite_path: Path,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        busy_timeout: float = DEFAULT_BUSY_TIMEOUT,
+        status_cache_size: int = DEFAULT_STATUS_CACHE_SIZE,
+        session_cache_size: int = DEFAULT_SESSION_CACHE_SIZE,
+        write_behind: bool = False,
+        durability: str = "commit",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_delay: float = DEFAULT_BATCH_DELAY,
+    ):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"durability must be one of {', '.join(DURABILITY_LEVELS)}, got {durability!r}")
+        if durability == "queued" and not write_behind:
+            raise ValueError('durability "queued" needs write_behind')
         self.sqlite_path = sqlite_path
+        self.busy_timeout = busy_timeout
+        self.durability = durability
+        self.pool_size = pool_size
+        self._pool = _ConnectionPool(self._connect, pool_size)
+        self._status_cache = _VersionedCache(status_cache_size)
+        self._sessions = _VersionedCache(session_cache_size, copy=_copy_session)
+        # Serializes queuing with the write-through of "queued" answers
+        self._enqueue_lock = threading.Lock()
         self._init_db()
+        self._group = _GroupCommit(self._commit_batch, batch_size, batch_delay) if write_behind else None
+
+    @property
+    def write_behind(self) -> bool:
+        return self._group is not None
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(str(self.sqlite_path))
+        conn = sqlite3.connect(str(self.sqlite_path), timeout=self.busy_timeout, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        # NORMAL: durable at checkpoints; WAL keeps the database consistent either way
+        conn.execute(f"PRAGMA synchronous={'FULL' if self.durability == 'fsync' else 'NORMAL'}")
+        conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size=-{_CACHE_KIB}")
         return conn
 
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        with self._pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def _snapshot(self) -> Iterator[sqlite3.Connection]:
+        """A connection inside a read transaction: every SELECT sees one snapshot.
+
+        For reads spread over several statements, which could otherwise
+        straddle a commit from another thread.
+        """
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN")
+            yield conn
+            conn.commit()
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """A connection inside a write transaction, committed on success.
+
+        On error the pool rolls the transaction back when it takes the
+        connection back.
+        """
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.commit()
+
+    def flush(self) -> None:
+        """Commit every queued answer (write-behind mode), and wait for it."""
+        if self._group is not None:
+            self._group.flush()
+
+    def close(self) -> None:
+        """Commit queued answers, then close every pooled connection."""
+        if self._group is not None:
+            self._group.close()
+        self._pool.close()
+
+    def _settle(self, session_id: str) -> None:
+        """Before reading a session from SQLite: wait out its queued answers."""
+        if self._group is not None and self.durability == "queued":
+            self._group.settle(session_id)
+
+    def invalidate(self, session_id: str | None = None) -> None:
+        """Drop the cached state of one session, or of every session."""
+        for cache in (self._sessions, self._status_cache):
+            if session_id is None:
+                cache.clear()
+            else:
+                cache.invalidate(session_id)
+
+    def cache_info(self) -> dict:
+        """Size, hit and miss counts of the session and status caches (and group commit counters)."""
+        info = {"sessions": self._sessions.info(), "status": self._status_cache.info()}
+        if self._group is not None:
+            info["group_commit"] = self._group.info()
+        return info
+
     def _init_db(self) -> None:
         self.sqlite_path.parent.mkdir(parents=True, exist_ok=True)
-        with self._connect() as c:
+        with self._read() as c:
+            c.execute("PRAGMA journal_mode=WAL")  # persistent: stored in the database file
+        with self._write() as c:
+            version = c.execute("PRAGMA user_version").fetchone()[0]
             c.execute("""
                 CREATE TABLE IF NOT EXISTS sessions (
                     session_id TEXT PRIMARY KEY,
@@ -57,13 +551,84 @@ class SessionStore:
                     mode TEXT NOT NULL DEFAULT 'learning',
                     user_id TEXT,
                     created_at REAL NOT NULL,
-                    asked_ids TEXT NOT NULL DEFAULT '[]',
-                    answers TEXT NOT NULL DEFAULT '[]',
                     correct_count INTEGER NOT NULL DEFAULT 0,
-                    incorrect_count INTEGER NOT NULL DEFAULT 0,
-                    tag_stats TEXT NOT NULL DEFAULT '{}'
+                    incorrect_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # Append-only; id order is answer order
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS answers (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT NOT NULL REFERENCES sessions(session_id),
+                    question_id TEXT NOT NULL,
+                    tags TEXT NOT NULL DEFAULT '[]',
+                    correct INTEGER NOT NULL,
+                    timestamp REAL NOT NULL
+                )
+            """)
+            c.execute("CREATE INDEX IF NOT EXISTS answers_by_session ON answers(session_id, id)")
+            # One row per question asked; rowid order is first-asked order
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS asked_questions (
+                    session_id TEXT NOT NULL REFERENCES sessions(session_id),
+                    question_id TEXT NOT NULL,
+                    PRIMARY KEY (session_id, question_id)
+                )
+            """)
+            # Per-tag counters; rowid order is first-seen order, the tie-break
+            # when ranking tags by accuracy
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS tag_counters (
+                    session_id TEXT NOT NULL REFERENCES sessions(session_id),
+                    tag TEXT NOT NULL,
+                    asked INTEGER NOT NULL DEFAULT 0,
+                    correct INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (session_id, tag)
                 )
             """)
+            if version < SCHEMA_VERSION:
+                self._migrate(c)
+                c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _migrate(c: sqlite3.Connection) -> None:
+        """Move JSON columns of older ``sessions`` rows into their tables.
+
+        Version 1 kept answers, asked ids and tag stats as JSON; version 2
+        still kept tag stats. The emptied columns are left in place (DROP
+        COLUMN needs SQLite 3.35).
+        """
+        columns = {row["name"] for row in c.execute("PRAGMA table_info(sessions)")}
+        if "answers" in columns:
+            rows = c.execute(
+                "SELECT session_id, asked_ids, answers FROM sessions WHERE asked_ids != '[]' OR answers != '[]'"
+            ).fetchall()
+            for row in rows:
+                sid = row["session_id"]
+                c.executemany(
+                    "INSERT INTO answers(session_id, question_id, tags, correct, timestamp) VALUES(?,?,?,?,?)",
+                    [
+                        (sid, a["question_id"], json.dumps(a.get("tags", [])), bool(a["correct"]),
+                         a.get("timestamp", 0))
+                        for a in json.loads(row["answers"])
+                    ],
+                )
+                c.executemany(
+                    "INSERT OR IGNORE INTO asked_questions(session_id, question_id) VALUES(?,?)",
+                    [(sid, qid) for qid in json.loads(row["asked_ids"])],
+                )
+            c.execute("UPDATE sessions SET asked_ids = '[]', answers = '[]'")
+        if "tag_stats" in columns:
+            rows = c.execute("SELECT session_id, tag_stats FROM sessions WHERE tag_stats != '{}'").fetchall()
+            for row in rows:
+                c.executemany(
+                    "INSERT OR IGNORE INTO tag_counters(session_id, tag, asked, correct) VALUES(?,?,?,?)",
+                    [
+                        (row["session_id"], tag, int(st.get("asked", 0)), int(st.get("correct", 0)))
+                        for tag, st in json.loads(row["tag_stats"]).items()
+                    ],
+                )
+            c.execute("UPDATE sessions SET tag_stats = '{}'")
 
     def create(self, exam_id: str, mode: str, user_id: str | None) -> Session:
         """Create a new session."""
@@ -79,30 +644,65 @@ class SessionStore:
             incorrect_count=0,
             tag_stats={},
         )
-        self._save(s)
+        version = self._sessions.version(s.session_id)
+        with self._write() as c:
+            c.execute(
+                "INSERT INTO sessions(session_id, exam_id, mode, user_id, created_at) VALUES(?,?,?,?,?)",
+                (s.session_id, s.exam_id, s.mode, s.user_id, s.created_at),
+            )
+        self._sessions.put(s.session_id, version, _copy_session(s))
         return s
 
     def load(self, session_id: str) -> Session:
         """Load a session by ID."""
-        with self._connect() as c:
-            row = c.execute(
-                "SELECT * FROM sessions WHERE session_id = ?",
-                (session_id,),
-            ).fetchone()
+        s = self._sessions.get(session_id)
+        return s if s is not None else self._load_uncached(session_id)
+
+    def cached_session(self, session_id: str) -> Session | None:
+        """A copy of the session if it is cached, else None (without I/O or counting a miss)."""
+        return self._sessions.get(session_id, record_miss=False)
+
+    def _load_uncached(self, session_id: str) -> Session:
+        version = self._sessions.version(session_id)
+        self._settle(session_id)
+        with self._snapshot() as c:
+            s = self._load(c, session_id)
+        self._sessions.put(session_id, version, _copy_session(s))
+        return s
+
+    def _load(self, c: sqlite3.Connection, session_id: str) -> Session:
+        row = c.execute(
+            "SELECT * FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
 
         if not row:
             raise KeyError(f"Unknown session_id: {session_id}")
 
-        answers_raw = json.loads(row["answers"])
-        answers = [
-            AnswerRecord(
-                question_id=a["question_id"],
-                tags=a.get("tags", []),
-                correct=a["correct"],
-                timestamp=a.get("timestamp", 0),
+        # Sessions repeat a handful of tag lists; decode each once
+        decoded: dict[str, list[str]] = {}
+        answers = []
+        for question_id, tags, correct, timestamp in c.execute(
+            "SELECT question_id, tags, correct, timestamp FROM answers WHERE session_id = ? ORDER BY id",
+            (session_id,),
+        ):
+            tag_list = decoded.get(tags)
+            if tag_list is None:
+                tag_list = decoded[tags] = json.loads(tags)
+            answers.append(AnswerRecord(question_id, list(tag_list), bool(correct), timestamp))
+        asked_ids = [
+            r[0] for r in c.execute(
+                "SELECT question_id FROM asked_questions WHERE session_id = ? ORDER BY rowid",
+                (session_id,),
             )
-            for a in answers_raw
         ]
+        tag_stats = {
+            tag: {"asked": asked, "correct": right}
+            for tag, asked, right in c.execute(
+                "SELECT tag, asked, correct FROM tag_counters WHERE session_id = ? ORDER BY rowid",
+                (session_id,),
+            )
+        }
 
         return Session(
             session_id=row["session_id"],
@@ -110,56 +710,13 @@ class SessionStore:
             mode=row["mode"],
             user_id=row["user_id"],
             created_at=row["created_at"],
-            asked_ids=json.loads(row["asked_ids"]),
+            asked_ids=asked_ids,
             answers=answers,
             correct_count=int(row["correct_count"]),
             incorrect_count=int(row["incorrect_count"]),
-            tag_stats=json.loads(row["tag_stats"]),
+            tag_stats=tag_stats,
         )
 
-    def _save(self, s: Session) -> None:
-        answers_data = [
-            {
-                "question_id": a.question_id,
-                "tags": a.tags,
-                "correct": a.correct,
-                "timestamp": a.timestamp,
-            }
-            for a in s.answers
-        ]
-
-        with self._connect() as c:
-            c.execute("""
-                INSERT INTO sessions(
-                    session_id, exam_id, mode, user_id, created_at,
-                    asked_ids, answers, correct_count, incorrect_count, tag_stats
-                )
-                VALUES(?,?,?,?,?,?,?,?,?,?)
-                ON CONFLICT(session_id) DO UPDATE SET
-                    exam_id=excluded.exam_id,
-                    mode=excluded.mode,
-                    user_id=excluded.user_id,
-                    created_at=excluded.created_at,
-                    asked_ids=excluded.asked_ids,
-                    answers=excluded.answers,
-                    correct_count=excluded.correct_count,
-                    incorrect_count=excluded.incorrect_count,
-                    tag_stats=excluded.tag_stats
-                """,
-                (
-                    s.session_id,
-                    s.exam_id,
-                    s.mode,
-                    s.user_id,
-                    s.created_at,
-                    json.dumps(s.asked_ids),
-                    json.dumps(answers_data),
-                    s.correct_count,
-                    s.incorrect_count,
-                    json.dumps(s.tag_stats),
-                ),
-            )
-
     def record_answer(
         self,
         session_id: str,
@@ -167,72 +724,241 @@ class SessionStore:
         tags: list[str],
         correct: bool,
     ) -> Session:
-        """Record an answer and update stats."""
-        s = self.load(session_id)
+        """Record an answer and update stats; returns the updated session.
 
-        if question_id not in s.asked_ids:
-            s.asked_ids.append(question_id)
+        The write appends one answer row, marks the question asked and
+        bumps the session and per-tag counters in place, so it costs the
+        same however long the session has run. It is one transaction, so
+        concurrent answers to the same session are not lost.
 
-        s.answers.append(AnswerRecord(
-            question_id=question_id,
-            tags=tags,
-            correct=correct,
-            timestamp=time.time(),
-        ))
+        With "queued" durability the answer is only queued; the session
+        returned is built in memory and does not wait for the commit.
+        """
+        answer = AnswerRecord(question_id, list(tags), correct, time.time())
+        if self._group is not None and self.durability == "queued":
+            return self._enqueue_answer(session_id, answer)
+        if self._group is not None:
+            self._commit_grouped(session_id, answer)
+            return self.load(session_id)
+        try:
+            with self._write() as c:
+                written = self._insert_answer(c, session_id, answer)
+        except BaseException:
+            self._sessions.invalidate(session_id)
+            raise
+        self._sessions.committed(session_id, written)
+        self._status_cache.invalidate(session_id)
+        return self.load(session_id)
 
-        if correct:
-            s.correct_count += 1
-        else:
-            s.incorrect_count += 1
+    def _commit_grouped(self, session_id: str, answer: AnswerRecord) -> None:
+        """Queue an answer for the next group commit and wait for that commit."""
+        with self._group.writer():
+            if session_id not in self._sessions:
+                with self._read() as c:
+                    self._counts(c, session_id)  # KeyError for an unknown session
+            done: Future = Future()
+            self._group.submit(_QueuedAnswer(session_id, answer, done))
+            done.result()  # re-raises the answer's error, if any
 
-        for t in tags:
-            st = s.tag_stats.setdefault(t, {"asked": 0, "correct": 0})
-            st["asked"] += 1
-            if correct:
-                st["correct"] += 1
+    def _enqueue_answer(self, session_id: str, answer: AnswerRecord) -> Session:
+        """Queue an answer and return the session with it applied, before the commit.
 
-        self._save(s)
+        The cache sees the answer at once, in queue order; reads that miss
+        the cache wait for the session's queued commits. An uncached
+        session is read before taking the queue lock, so only answers
+        queued earlier for it are waited for, never this one, and the
+        wait holds up no other session's answers. The read is redone if
+        the session was written in the meantime.
+        """
+        while True:
+            version = self._sessions.version(session_id)
+            loaded = None if session_id in self._sessions else self._load_uncached(session_id)  # KeyError if unknown
+            with self._enqueue_lock:
+                s = self._sessions.get(session_id)
+                if s is None:
+                    if loaded is None or self._sessions.version(session_id) != version:
+                        continue  # evicted before it was read, or written since: read again
+                    s = loaded
+                self._group.submit(_QueuedAnswer(session_id, answer, None))
+                self._sessions.write(session_id, partial(_apply_answer, answer, None))
+                self._status_cache.invalidate(session_id)
+                break
+        _apply_answer(answer, None, s)
         return s
 
-    def weak_tags(self, session_id: str, min_asked: int = 2, top_n: int = 5) -> list[str]:
-        """Return tags where accuracy is lowest (user's weak areas)."""
-        s = self.load(session_id)
-        scored: list[tuple[str, float]] = []
+    def _commit_batch(self, batch: list[_QueuedAnswer]) -> None:
+        """Commit a batch in one transaction; a failing answer only rolls back itself."""
+        errors: dict[int, BaseException] = {}
+        written: dict[int, Session | None] = {}
+        try:
+            with self._write() as c:
+                for i, item in enumerate(batch):
+                    c.execute("SAVEPOINT answer")
+                    try:
+                        if item.done is not None:
+                            written[i] = self._insert_answer(c, item.session_id, item.answer)
+                        else:
+                            self._insert_answer(c, item.session_id, item.answer, write_through=False)
+                    except Exception as e:
+                        c.execute("ROLLBACK TO answer")
+                        errors[i] = e
+                    c.execute("RELEASE answer")
+        except BaseException as e:
+            errors = dict.fromkeys(range(len(batch)), e)
+        for i, item in enumerate(batch):
+            self._status_cache.invalidate(item.session_id)
+            error = errors.get(i)
+            if error is not None:
+                self._sessions.invalidate(item.session_id)
+            elif i in written:
+                self._sessions.committed(item.session_id, written[i])
+            if item.done is not None:
+                if error is None:
+                    item.done.set_result(None)
+                else:
+                    item.done.set_exception(error)
+            elif error is not None:
+                logger.error("Dropped queued answer for session %s: %s", item.session_id, error)
 
-        for tag, st in s.tag_stats.items():
-            asked = int(st.get("asked", 0))
-            correct_count = int(st.get("correct", 0))
-            if asked < min_asked:
-                continue
-            acc = correct_count / asked if asked else 0.0
-            scored.append((tag, acc))
+    def _insert_answer(
+        self, c: sqlite3.Connection, session_id: str, answer: AnswerRecord, write_through: bool = True,
+    ) -> Session | None:
+        """Insert one answer; with ``write_through``, return the cached session it was applied to (if any)."""
+        correct = answer.correct
+        updated = c.execute(
+            """
+            UPDATE sessions SET
+                correct_count = correct_count + ?,
+                incorrect_count = incorrect_count + ?
+            WHERE session_id = ?
+            """,
+            (int(correct), int(not correct), session_id),
+        ).rowcount
+        if not updated:
+            raise KeyError(f"Unknown session_id: {session_id}")
+        c.executemany(
+            """
+            INSERT INTO tag_counters(session_id, tag, asked, correct) VALUES(?,?,1,?)
+            ON CONFLICT(session_id, tag) DO UPDATE SET
+                asked = asked + 1,
+                correct = correct + excluded.correct
+            """,
+            [(session_id, t, int(correct)) for t in answer.tags],
+        )
+        c.execute(
+            "INSERT INTO answers(session_id, question_id, tags, correct, timestamp) VALUES(?,?,?,?,?)",
+            (session_id, answer.question_id, json.dumps(answer.tags), correct, answer.timestamp),
+        )
+        first_ask = c.execute(
+            "INSERT OR IGNORE INTO asked_questions(session_id, question_id) VALUES(?,?)",
+            (session_id, answer.question_id),
+        ).rowcount == 1
+        # Write-through while still holding the write lock, so answers reach
+        # the cache in commit order. Once the commit is done the caller
+        # calls ``committed`` (or, should it fail, invalidates the session).
+        if write_through:
+            return self._sessions.write(session_id, partial(_apply_answer, answer, first_ask))
+        return None
 
-        scored.sort(key=lambda x: x[1])  # lowest accuracy first
-        return [t for t, _ in scored[:top_n]]
+    def weak_tags(self, session_id: str, min_asked: int = 2, top_n: int = 5) -> list[str]:
+        """Return tags where accuracy is lowest (user's weak areas)."""
+        return self._ranked_tags(session_id, min_asked, top_n, "ASC")
 
     def strong_tags(self, session_id: str, min_asked: int = 3, top_n: int = 5) -> list[str]:
         """Return tags where accuracy is highest (user's strong areas)."""
-        s = self.load(session_id)
-        scored: list[tuple[str, float]] = []
+        return self._ranked_tags(session_id, min_asked, top_n, "DESC")
 
-        for tag, st in s.tag_stats.items():
-            asked = int(st.get("asked", 0))
-            correct_count = int(st.get("correct", 0))
-            if asked < min_asked:
-                continue
-            acc = correct_count / asked if asked else 0.0
-            scored.append((tag, acc))
+    def _ranked_tags(self, session_id: str, min_asked: int, top_n: int, order: str) -> list[str]:
+        """Tags asked at least ``min_asked`` times, by accuracy; ties keep first-seen order."""
+        self._settle(session_id)
+        with self._read() as c:
+            tags = [
+                r[0] for r in c.execute(
+                    f"""
+                    SELECT tag FROM tag_counters
+                    WHERE session_id = ? AND asked >= ?
+                    ORDER BY CAST(correct AS REAL) / asked {order}, rowid
+                    LIMIT ?
+                    """,
+                    (session_id, min_asked, max(top_n, 0)),
+                )
+            ]
+            if not tags:
+                self._counts(c, session_id)  # KeyError for an unknown session
+        return tags
 
-        scored.sort(key=lambda x: x[1], reverse=True)  # highest accuracy first
-        return [t for t, _ in scored[:top_n]]
+    @staticmethod
+    def _counts(c: sqlite3.Connection, session_id: str) -> tuple[int, int]:
+        row = c.execute(
+            "SELECT correct_count, incorrect_count FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        if not row:
+            raise KeyError(f"Unknown session_id: {session_id}")
+        return int(row[0]), int(row[1])
 
     def mastery_level(self, session_id: str) -> str:
         """Derive a mastery level label from overall accuracy."""
-        s = self.load(session_id)
-        total = s.correct_count + s.incorrect_count
+        self._settle(session_id)
+        with self._read() as c:
+            return self._mastery(*self._counts(c, session_id))
+
+    def status(self, session_id: str) -> SessionStatus:
+        """Counts, accuracy, weak/strong tags and mastery level in one read.
+
+        Tags are ranked as by ``weak_tags()`` and ``strong_tags()`` with
+        their default thresholds. The result is cached until this store
+        next records an answer for the session, so repeated status calls
+        between answers do no I/O. Writes by other processes are not seen
+        until then.
+        """
+        cached = self._status_cache.get(session_id)
+        return cached if cached is not None else self._status_uncached(session_id)
+
+    def cached_status(self, session_id: str) -> SessionStatus | None:
+        """The cached ``status()`` result, else None (without I/O or counting a miss)."""
+        return self._status_cache.get(session_id, record_miss=False)
+
+    def _status_uncached(self, session_id: str) -> SessionStatus:
+        version = self._status_cache.version(session_id)
+        self._settle(session_id)
+        with self._read() as c:
+            rows = c.execute(
+                """
+                SELECT s.exam_id, s.mode, s.correct_count, s.incorrect_count, a.n, t.tag, t.asked, t.correct
+                FROM sessions s
+                CROSS JOIN (SELECT COUNT(*) AS n FROM asked_questions WHERE session_id = ?) a
+                LEFT JOIN tag_counters t ON t.session_id = s.session_id
+                WHERE s.session_id = ?
+                ORDER BY t.rowid
+                """,
+                (session_id, session_id),
+            ).fetchall()
+        if not rows:
+            raise KeyError(f"Unknown session_id: {session_id}")
+        exam_id, mode, correct_count, incorrect_count, asked_count = tuple(rows[0])[:5]
+        counters = [(r[5], r[6], r[7]) for r in rows if r[5] is not None]
+        status = SessionStatus(
+            session_id=session_id,
+            exam_id=exam_id,
+            mode=mode,
+            asked_count=asked_count,
+            correct_count=correct_count,
+            incorrect_count=incorrect_count,
+            accuracy=correct_count / asked_count if asked_count else 0.0,
+            weak_tags=_rank_tags(counters, 2, 5, reverse=False),
+            strong_tags=_rank_tags(counters, 3, 5, reverse=True),
+            mastery_level=self._mastery(correct_count, incorrect_count),
+        )
+        self._status_cache.put(session_id, version, status)
+        return status
+
+    @staticmethod
+    def _mastery(correct_count: int, incorrect_count: int) -> str:
+        total = correct_count + incorrect_count
         if total < 5:
             return "beginner"
-        accuracy = s.correct_count / total
+        accuracy = correct_count / total
         if accuracy >= 0.90:
             return "expert"
         elif accuracy >= 0.75:
@@ -241,3 +967,67 @@ class SessionStore:
             return "intermediate"
         else:
             return "beginner"
+
+
+class AsyncSessionStore:
+    """Awaitable facade over a SessionStore, for the async MCP tools.
+
+    SQLite calls block, so making them on the event loop would stall
+    every other client. Writes (``create``, ``record_answer``) run on a
+    single writer thread, in submission order and without contending
+    for SQLite's write lock; reads run on a pool with one thread per
+    pooled connection. Cache hits of ``load`` and ``status`` are
+    answered on the loop itself, with no thread hop.
+
+    With write-behind in a waiting durability mode, the writer gets up to
+    MAX_ASYNC_WRITERS threads instead, so concurrent answers can share a
+    group commit.
+    """
+
+    def __init__(self, store: SessionStore):
+        self.store = store
+        writers = MAX_ASYNC_WRITERS if store.write_behind and store.durability != "queued" else 1
+        self._writer = ThreadPoolExecutor(writers, thread_name_prefix="session-store-writer")
+        self._readers = ThreadPoolExecutor(store.pool_size, thread_name_prefix="session-store-reader")
+
+    def _run(self, executor: ThreadPoolExecutor, fn: Callable[..., Any], *args: Any, **kwargs: Any):
+        return asyncio.get_running_loop().run_in_executor(executor, partial(fn, *args, **kwargs))
+
+    async def create(self, exam_id: str, mode: str, user_id: str | None) -> Session:
+        return await self._run(self._writer, self.store.create, exam_id=exam_id, mode=mode, user_id=user_id)
+
+    async def load(self, session_id: str) -> Session:
+        s = self.store.cached_session(session_id)
+        return s if s is not None else await self._run(self._readers, self.store.load, session_id)
+
+    async def record_answer(self, session_id: str, question_id: str, tags: list[str], correct: bool) -> Session:
+        return await self._run(
+            self._writer, self.store.record_answer,
+            session_id=session_id, question_id=question_id, tags=tags, correct=correct,
+        )
+
+    async def status(self, session_id: str) -> SessionStatus:
+        st = self.store.cached_status(session_id)
+        return st if st is not None else await self._run(self._readers, self.store.status, session_id)
+
+    async def weak_tags(self, session_id: str, min_asked: int = 2, top_n: int = 5) -> list[str]:
+        return await self._run(self._readers, self.store.weak_tags, session_id, min_asked=min_asked, top_n=top_n)
+
+    async def strong_tags(self, session_id: str, min_asked: int = 3, top_n: int = 5) -> list[str]:
+        return await self._run(self._readers, self.store.strong_tags, session_id, min_asked=min_asked, top_n=top_n)
+
+    async def mastery_level(self, session_id: str) -> str:
+        return await self._run(self._readers, self.store.mastery_level, session_id)
+
+    async def flush(self) -> None:
+        """Commit every queued answer, once the writes already submitted have run."""
+        await self._run(self._writer, self.store.flush)
+
+    def cache_info(self) -> dict:
+        return self.store.cache_info()
+
+    def close(self) -> None:
+        """Finish submitted calls, then close the store (committing queued answers)."""
+        self._writer.shutdown()
+        self._readers.shutdown()
+        self.store.close()
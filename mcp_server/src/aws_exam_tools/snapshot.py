@@ -0,0 +1,153 @@
+"""Compiled snapshot cache for parsed question banks.
+
+Parsing the JSON banks (reference splitting, SHA-256 question ids, correct
+index resolution) dominates startup. The snapshot stores the already-parsed
+Question objects so later processes can skip that work.
+
+File layout:
+  MAGIC (8 bytes) | header length (8 bytes, little-endian) | header | blobs
+
+The header is a pickled dict mapping exam_id -> SnapshotEntry (source
+fingerprint, question count, blob offset/length). Each exam is pickled into
+its own blob so a single exam can be read without touching the others.
+Questions carry their tags, so the header also records the tag rules hash;
+a snapshot written under other rules is stale.
+
+The snapshot is trusted local state written by this process next to the
+SQLite database; it is never loaded from user-supplied paths.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import struct
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any
+
+from .tagging import current_rules_hash
+
+MAGIC = b"AWSXBNK1"
+SNAPSHOT_VERSION = 3
+SNAPSHOT_FILENAME = "question_bank.snapshot"
+
+_HEADER_LEN = struct.Struct("<Q")
+
+
+@dataclass(frozen=True)
+class SourceFingerprint:
+    """Identity of a source *.json file: size, mtime and content hash."""
+
+    name: str
+    size: int
+    mtime_ns: int
+    sha256: str
+
+    @classmethod
+    def of(cls, path: Path) -> SourceFingerprint:
+        st = path.stat()
+        with path.open("rb") as f:  # hashed in chunks: a large bank is never read whole
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        return cls(name=path.name, size=st.st_size, mtime_ns=st.st_mtime_ns, sha256=digest)
+
+
+@dataclass(frozen=True)
+class SnapshotEntry:
+    fingerprint: SourceFingerprint
+    count: int
+    offset: int = 0
+    length: int = 0
+
+
+class BankSnapshot:
+    """Read access to a snapshot file written by ``BankSnapshot.write``."""
+
+    def __init__(self, path: Path, entries: dict[str, SnapshotEntry], data_start: int):
+        self.path = path
+        self.entries = entries
+        self._data_start = data_start
+
+    @classmethod
+    def open(cls, path: Path) -> BankSnapshot | None:
+        """Open a snapshot, or return None if it is missing, stale or corrupt."""
+        try:
+            with path.open("rb") as fh:
+                if fh.read(len(MAGIC)) != MAGIC:
+                    return None
+                (header_len,) = _HEADER_LEN.unpack(fh.read(_HEADER_LEN.size))
+                header = pickle.loads(fh.read(header_len))
+        except (OSError, struct.error, pickle.UnpicklingError, EOFError,
+                AttributeError, ImportError, TypeError, ValueError):
+            return None
+
+        if not isinstance(header, dict) or header.get("version") != SNAPSHOT_VERSION:
+            return None
+        if header.get("tag_rules") != current_rules_hash():
+            return None
+        data_start = len(MAGIC) + _HEADER_LEN.size + header_len
+        return cls(path, header["entries"], data_start)
+
+    def load_exam(self, exam_id: str) -> list[Any] | None:
+        """Read one exam's questions from its blob, or None if unreadable."""
+        entry = self.entries[exam_id]
+        if entry.length == 0:
+            return []
+        try:
+            with self.path.open("rb") as fh:
+                fh.seek(self._data_start + entry.offset)
+                return pickle.loads(fh.read(entry.length))
+        except (OSError, pickle.UnpicklingError, EOFError,
+                AttributeError, ImportError, TypeError, ValueError):
+            return None
+
+    def read_blob(self, exam_id: str) -> bytes:
+        """Return one exam's pickled blob without unpickling it."""
+        entry = self.entries[exam_id]
+        if entry.length == 0:
+            return b""
+        with self.path.open("rb") as fh:
+            fh.seek(self._data_start + entry.offset)
+            return fh.read(entry.length)
+
+    @staticmethod
+    def write(
+        path: Path,
+        entries: dict[str, SnapshotEntry],
+        exams: dict[str, list[Any] | bytes],
+    ) -> None:
+        """Atomically write a snapshot holding ``exams`` described by ``entries``.
+
+        Each exam is given either as its question list or as a raw blob
+        previously returned by ``read_blob``.
+        """
+        blobs: list[bytes] = []
+        placed: dict[str, SnapshotEntry] = {}
+        offset = 0
+        for exam_id, entry in entries.items():
+            questions = exams.get(exam_id) or []
+            if isinstance(questions, bytes):
+                blob = questions
+            else:
+                blob = pickle.dumps(questions, protocol=pickle.HIGHEST_PROTOCOL) if questions else b""
+            placed[exam_id] = replace(entry, offset=offset, length=len(blob))
+            blobs.append(blob)
+            offset += len(blob)
+
+        header = pickle.dumps(
+            {"version": SNAPSHOT_VERSION, "entries": placed, "tag_rules": current_rules_hash()},
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with tmp.open("wb") as fh:
+                fh.write(MAGIC)
+                fh.write(_HEADER_LEN.pack(len(header)))
+                fh.write(header)
+                for blob in blobs:
+                    fh.write(blob)
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            raise
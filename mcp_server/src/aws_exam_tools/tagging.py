@@ -4,10 +4,28 @@ Tags questions based on keyword patterns. This enables:
 - Adaptive question selection (focus on weak areas)
 - Spaced repetition (revisit missed domains)
 - Progress analytics per AWS domain
+
+Two interchangeable matching backends produce identical tags: "regex"
+(compiled rules, the default) and "aho-corasick" (one automaton pass over
+all keywords, which stays flat as rules grow). AWS_EXAM_TAG_BACKEND picks
+one at import; ``use_backend`` switches at runtime.
+
+Results are memoized in a bounded LRU keyed by a hash of the text, so a
+question seen before (a re-parsed file on hot reload, a re-loaded lazy
+exam, the same question in another bank version) is not matched again.
+Content keys cannot go stale when a bank changes; the memo is cleared when
+the rules do (``refresh_rules``).
 """
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import re
+import threading
+from collections import OrderedDict
+
+from .aho_corasick import KeywordTagger
 
 # (tag, patterns) - first match wins for each tag
 TAG_RULES: list[tuple[str, list[str]]] = [
@@ -95,17 +113,189 @@ TAG_RULES: list[tuple[str, list[str]]] = [
 ]
 
 
-def infer_tags(text: str) -> list[str]:
-    """Infer domain tags from question text using keyword patterns."""
-    tags: list[str] = []
+_WORD_START = re.compile(r"\b\w")
+# A pattern is dispatched by its first two characters when it starts with
+# \b and two literal characters that no quantifier applies to
+_DISPATCHABLE = re.compile(r"\\b([A-Za-z0-9][A-Za-z0-9-])(?![?*{])")
+
+
+def _top_level_alternation(pattern: str) -> bool:
+    depth = 0
+    escaped = False
+    for ch in pattern:
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            return True
+    return False
+
+
+_Matchers = list[tuple[str, re.Pattern]]
+
+
+def _compile(rules: list[tuple[str, list[str]]]) -> tuple[dict[str, _Matchers], _Matchers]:
+    """Compile rules into (dispatch table, fallback matchers).
 
-    for tag, patterns in TAG_RULES:
+    The dispatch table maps the lower-cased first two characters of a
+    pattern to (tag, matcher) pairs; each matcher is one case-insensitive
+    alternation of that tag's patterns sharing the prefix, anchored with
+    ``match`` at a word start. Patterns without such a literal prefix are
+    combined per tag into fallback matchers searched over the whole text.
+    """
+    dispatch: dict[str, _Matchers] = {}
+    fallback: _Matchers = []
+    for tag, patterns in rules:
+        by_prefix: dict[str, list[str]] = {}
+        other: list[str] = []
         for pattern in patterns:
-            if re.search(pattern, text, flags=re.IGNORECASE):
-                tags.append(tag)
-                break  # one match per tag is enough
+            m = _DISPATCHABLE.match(pattern)
+            if m and not _top_level_alternation(pattern):
+                by_prefix.setdefault(m.group(1).lower(), []).append(pattern[2:])
+            else:
+                other.append(pattern)
+        for prefix, bodies in by_prefix.items():
+            matcher = re.compile("|".join(f"(?:{b})" for b in bodies), re.IGNORECASE)
+            dispatch.setdefault(prefix, []).append((tag, matcher))
+        if other:
+            fallback.append((tag, re.compile("|".join(f"(?:{p})" for p in other), re.IGNORECASE)))
+    return dispatch, fallback
+
+
+_DISPATCH, _FALLBACK = _compile(TAG_RULES)
+
+TAG_BACKENDS = ("regex", "aho-corasick")
+_keyword_tagger: KeywordTagger | None = None
+
+
+def use_backend(name: str) -> None:
+    """Select the matching backend for infer_tags (see TAG_BACKENDS)."""
+    global _keyword_tagger
+    if name not in TAG_BACKENDS:
+        raise ValueError(f"Unknown tag backend {name!r}; expected one of {', '.join(TAG_BACKENDS)}")
+    _keyword_tagger = KeywordTagger(TAG_RULES) if name == "aho-corasick" else None
+    _memo.clear()  # so results come from the selected backend
+
+
+def _regex_tags(text: str) -> set[str]:
+    """Tags matched by the compiled rules.
+
+    Instead of one regex search per pattern, the text is scanned once: at
+    each word start, only the matchers whose patterns begin with the same
+    two characters are tried.
+    """
+    found: set[str] = set()
+    get = _DISPATCH.get
+    for m in _WORD_START.finditer(text):
+        pos = m.start()
+        candidates = get(text[pos:pos + 2].lower())
+        if candidates:
+            for tag, matcher in candidates:
+                if tag not in found and matcher.match(text, pos):
+                    found.add(tag)
+    for tag, matcher in _FALLBACK:
+        if tag not in found and matcher.search(text):
+            found.add(tag)
+    return found
+
+
+class TagMemo:
+    """Bounded LRU of text hash -> tags, with hit/miss counters."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[str, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: bytes) -> tuple[str, ...] | None:
+        with self._lock:
+            tags = self._entries.get(key)
+            if tags is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return tags
+
+    def put(self, key: bytes, tags: tuple[str, ...]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = tags
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def rules_hash(rules: list[tuple[str, list[str]]] | None = None) -> str:
+    """Short, stable hash of a rule set (default: TAG_RULES)."""
+    data = json.dumps(TAG_RULES if rules is None else rules, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+_memo = TagMemo(int(os.getenv("AWS_EXAM_TAG_CACHE_SIZE", "8192")))
+_rules_hash = rules_hash()
+
+
+def current_rules_hash() -> str:
+    """Hash of the rules infer_tags is currently compiled from."""
+    return _rules_hash
+
+
+def refresh_rules() -> bool:
+    """Recompile after TAG_RULES was edited in place.
+
+    Clears the memo and returns True if the rules changed.
+    """
+    global _DISPATCH, _FALLBACK, _keyword_tagger, _rules_hash
+    new_hash = rules_hash()
+    if new_hash == _rules_hash:
+        return False
+    _DISPATCH, _FALLBACK = _compile(TAG_RULES)
+    if _keyword_tagger is not None:
+        _keyword_tagger = KeywordTagger(TAG_RULES)
+    _rules_hash = new_hash
+    _memo.clear()
+    return True
+
+
+def tag_cache_info() -> dict:
+    """Memo size and hit/miss/eviction counters, plus the rules hash."""
+    return {**_memo.info(), "rules_hash": _rules_hash}
+
+
+def infer_tags(text: str) -> list[str]:
+    """Infer domain tags from question text using keyword patterns."""
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    tags = _memo.get(key)
+    if tags is None:
+        found = _keyword_tagger.tags(text) if _keyword_tagger is not None else _regex_tags(text)
+        tags = tuple(sorted(found)) if found else ("general",)
+        _memo.put(key, tags)
+    return list(tags)
 
-    if not tags:
-        tags.append("general")
 
-    return sorted(set(tags))
+use_backend(os.getenv("AWS_EXAM_TAG_BACKEND", "regex"))
@@ -0,0 +1,285 @@
+"""Confidence-scored domain tags from TF-IDF vectors.
+
+``infer_tags`` answers yes or no per tag from keyword hits in the
+question text, so "role" or "instance" in passing is enough for IAM or
+EC2. The scorer weighs all of a question's text (question, options and
+explanation) against one profile vector per tag and ranks tags by cosine
+similarity, a confidence in [0, 1].
+
+Everything is sparse and pure Python. A document is a dict term ->
+weight (sublinear tf x idf, L2-normalized); the tag profiles are stored
+transposed, term -> [(tag number, weight)]. Scoring a whole bank is the
+sparse matrix product X·Pᵀ, which only visits the (document term,
+profile term) pairs that actually co-occur.
+
+Profiles are fitted on the questions being scored, without labels:
+
+1. Seed each tag with its TAG_RULES keywords: multi-word keywords count
+   their words, stems such as "migrat" count every vocabulary word they
+   start. Words are weighted by idf.
+2. Score the bank against the seeds and give each question to its best
+   tag. A tag's profile is its seed plus how much more often a term
+   occurs in its questions than in all questions, times idf (Rocchio
+   over term presence), keeping the ``PROFILE_TERMS`` strongest terms.
+
+``evaluate`` measures precision and recall against hand-labelled
+questions at several confidence thresholds.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from array import array
+from collections import Counter
+from itertools import repeat
+from operator import mul
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from .aho_corasick import expand_pattern
+from .search import STOPWORDS
+from .tagging import TAG_RULES
+
+DEFAULT_THRESHOLD = 0.1
+PROFILE_TERMS = 100
+SEED_WEIGHT = 0.3  # share of the seed keywords in a fitted profile
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class _SublinearTF(dict):
+    """count -> 1 + ln(count), computed once per distinct count."""
+
+    def __missing__(self, n: int) -> float:
+        value = self[n] = 1.0 + math.log(n)
+        return value
+
+
+_TF = _SublinearTF()
+
+Vector = dict[str, float]
+
+
+def _normalize(vec: Vector) -> Vector:
+    norm = math.hypot(*vec.values())
+    return {t: w / norm for t, w in vec.items()} if norm else {}
+
+
+def term_counts(text: str) -> Counter:
+    return Counter(_WORD_RE.findall(text.lower()))
+
+
+def _seed_terms(rules: Sequence[tuple[str, Sequence[str]]], vocabulary: Iterable[str]) -> list[list[str]]:
+    """Vocabulary words per tag that its rules' keywords consist of or start."""
+    known = set(vocabulary)
+    vocab = sorted(known)
+    seeds: list[list[str]] = []
+    for _tag, patterns in rules:
+        words: set[str] = set()
+        for pattern in patterns:
+            expanded = expand_pattern(pattern)
+            if expanded is None:
+                continue  # not a plain keyword rule
+            keywords, end_boundary = expanded
+            for keyword in keywords:
+                parts = _WORD_RE.findall(keyword)
+                if not parts:
+                    continue
+                words.update(parts[:-1])
+                if end_boundary:
+                    words.add(parts[-1])
+                else:
+                    # A stem: every vocabulary word it begins
+                    stem = parts[-1]
+                    i = _bisect(vocab, stem)
+                    while i < len(vocab) and vocab[i].startswith(stem):
+                        words.add(vocab[i])
+                        i += 1
+        seeds.append(sorted((words & known) - STOPWORDS))
+    return seeds
+
+
+def _bisect(items: list[str], key: str) -> int:
+    lo, hi = 0, len(items)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if items[mid] < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+@dataclass(frozen=True)
+class TagScore:
+    tag: str
+    confidence: float
+
+
+@dataclass
+class DocumentMatrix:
+    """Sparse document-term matrix.
+
+    Rows hold raw term counts; the tf-idf weight of an entry, sublinear tf
+    x idf / row norm, is only computed for terms some profile uses.
+    ``scale`` holds each row's inverse L2 norm.
+    """
+
+    rows: list[Counter]
+    scale: array
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class TagScorer:
+    """TF-IDF tag scorer fitted on one set of questions (see module docstring)."""
+
+    def __init__(self, rules: Sequence[tuple[str, Sequence[str]]] = TAG_RULES,
+                 profile_terms: int = PROFILE_TERMS, seed_weight: float = SEED_WEIGHT):
+        self.tags = [tag for tag, _ in rules]
+        self._rules = rules
+        self.profile_terms = profile_terms
+        self.seed_weight = seed_weight
+        self.idf: dict[str, float] = {}
+        # Transposed profile matrix, idf folded in: term -> [(tag number, idf x weight)]
+        self._columns: dict[str, list[tuple[int, float]]] = {}
+
+    # --- Vectorization ---
+
+    def _matrix(self, counts: Iterable[Counter]) -> DocumentMatrix:
+        idf_get = self.idf.get
+        rows: list[Counter] = []
+        scale = array("d")
+        for c in counts:
+            norm = math.hypot(*map(mul, map(_TF.__getitem__, c.values()), map(idf_get, c.keys(), repeat(0.0))))
+            rows.append(c)
+            scale.append(1.0 / norm if norm else 0.0)
+        return DocumentMatrix(rows, scale)
+
+    def vectorize(self, texts: Iterable[str]) -> DocumentMatrix:
+        """The document-term matrix of ``texts`` under the fitted idf."""
+        return self._matrix(term_counts(text) for text in texts)
+
+    # --- Fitting ---
+
+    def fit(self, texts: Sequence[str]) -> DocumentMatrix:
+        """Fit idf and tag profiles on ``texts``; returns their matrix."""
+        counts = [term_counts(text) for text in texts]
+        df: Counter = Counter()
+        for c in counts:
+            df.update(c.keys())
+        n = len(counts)
+        idf = self.idf = {
+            t: math.log((1 + n) / (1 + d)) + 1.0
+            for t, d in df.items() if t not in STOPWORDS and not t.isdigit()
+        }
+        docs = self._matrix(counts)
+
+        seeds = [_normalize({w: idf[w] for w in words}) for words in _seed_terms(self._rules, idf)]
+        self._columns = self._transpose(seeds)
+
+        # Rocchio: each question joins the group of its best seed. A group's
+        # centroid is taken over term presence (the share of its questions
+        # containing the term, times idf), minus the same over all questions.
+        group_df = [Counter() for _ in self.tags]
+        sizes = [0] * len(self.tags)
+        for c, scores in zip(docs.rows, self._product(docs)):
+            if scores:
+                best = max(scores, key=scores.__getitem__)
+                group_df[best].update(c.keys())
+                sizes[best] += 1
+
+        profiles = []
+        for seed, gdf, size in zip(seeds, group_df, sizes):
+            profile = {t: self.seed_weight * w for t, w in seed.items()}
+            if size:
+                centroid = _normalize({
+                    t: idf[t] * (d / size - df[t] / n)
+                    for t, d in gdf.items() if t in idf and d / size > df[t] / n
+                })
+                for t, w in centroid.items():
+                    profile[t] = profile.get(t, 0.0) + (1 - self.seed_weight) * w
+            top = heapq.nlargest(self.profile_terms, profile.items(), key=lambda item: item[1])
+            profiles.append(_normalize(dict(top)))
+        self._columns = self._transpose(profiles)
+        return docs
+
+    def _transpose(self, profiles: Sequence[Vector]) -> dict[str, list[tuple[int, float]]]:
+        columns: dict[str, list[tuple[int, float]]] = {}
+        for k, profile in enumerate(profiles):
+            for t, w in profile.items():
+                columns.setdefault(t, []).append((k, self.idf[t] * w))
+        return columns
+
+    # --- Scoring ---
+
+    def _product(self, docs: DocumentMatrix) -> list[dict[int, float]]:
+        """X·Pᵀ: per document, tag number -> cosine similarity.
+
+        Only the terms a row shares with some profile are visited.
+        """
+        columns = self._columns
+        vocabulary = columns.keys()
+        tf = _TF
+        width = range(len(self.tags))
+        result: list[dict[int, float]] = []
+        for row, inv in zip(docs.rows, docs.scale):
+            acc = [0.0] * len(width)
+            for t in vocabulary & row.keys():
+                w = tf[row[t]]
+                for k, p in columns[t]:
+                    acc[k] += w * p
+            result.append({k: acc[k] * inv for k in width if acc[k]})
+        return result
+
+    def similarities(self, docs: DocumentMatrix) -> list[dict[int, float]]:
+        """Raw scores per document, tag number -> similarity; see ``rank``."""
+        return self._product(docs)
+
+    def rank(self, similarities: dict[int, float], threshold: float = DEFAULT_THRESHOLD) -> list[TagScore]:
+        """One document's tags at or above ``threshold``, most confident first."""
+        tags = self.tags
+        return sorted(
+            (TagScore(tags[k], round(c, 4)) for k, c in similarities.items() if c >= threshold),
+            key=lambda s: (-s.confidence, s.tag),
+        )
+
+    def score(self, docs: DocumentMatrix, threshold: float = DEFAULT_THRESHOLD) -> list[list[TagScore]]:
+        """Tags at or above ``threshold`` per document, most confident first."""
+        return [self.rank(row, threshold) for row in self._product(docs)]
+
+    def score_texts(self, texts: Iterable[str], threshold: float = DEFAULT_THRESHOLD) -> list[list[TagScore]]:
+        return self.score(self.vectorize(texts), threshold)
+
+
+def evaluate(
+    predicted: Sequence[Sequence[TagScore]],
+    labels: Sequence[Iterable[str]],
+    thresholds: Iterable[float] = (0.1, 0.15, 0.2, 0.25, 0.3, 0.4),
+) -> list[dict]:
+    """Micro-averaged precision, recall and F1 per threshold.
+
+    ``predicted`` holds every tag's score (e.g. from ``score(..., 0.0)``);
+    ``labels`` the true tags of the same questions ("general" = none).
+    """
+    truth = [set(ls) - {"general"} for ls in labels]
+    report = []
+    for threshold in thresholds:
+        tp = fp = fn = 0
+        for scores, gold in zip(predicted, truth):
+            tags = {s.tag for s in scores if s.confidence >= threshold}
+            tp += len(tags & gold)
+            fp += len(tags - gold)
+            fn += len(gold - tags)
+        precision = tp / (tp + fp) if tp + fp else 1.0
+        recall = tp / (tp + fn) if tp + fn else 1.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        report.append({
+            "threshold": threshold,
+            "precision": round(precision, 3),
+            "recall": round(recall, 3),
+            "f1": round(f1, 3),
+        })
+    return report
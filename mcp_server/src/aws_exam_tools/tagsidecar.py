@@ -0,0 +1,99 @@
+"""Persisted tag sidecar: precomputed tags for every question in a bank.
+
+Tags only change when question text or TAG_RULES change, so tagging the
+whole bank is done once, in a batch across a process pool, and saved
+next to the question files:
+
+    python -m aws_exam_tools.tagsidecar [QUESTION_DIR] [--workers N]
+
+ExamBank and the tutor then look tags up instead of matching rules at
+startup. The file is JSON (it must not end in .json, or it would be
+loaded as a bank):
+
+    {"version": 1, "tag_rules": "<rules hash>",
+     "exams": {exam_id: {question_id: [tag, ...]}}}
+
+A sidecar written under other rules is ignored as a whole. Question ids
+embed a hash of the question text, which is all tags depend on, so an
+edited question simply has no entry and is tagged live.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from .tagging import current_rules_hash
+
+SIDECAR_VERSION = 1
+SIDECAR_FILENAME = "question_tags.sidecar"
+
+SidecarTags = dict[str, dict[str, tuple[str, ...]]]
+
+
+def write_sidecar(path: Path, exams: dict[str, Iterable[tuple[str, Sequence[str]]]]) -> int:
+    """Atomically write (question_id, tags) pairs per exam; returns the question count."""
+    body = {eid: {qid: list(tags) for qid, tags in pairs} for eid, pairs in exams.items()}
+    data = {"version": SIDECAR_VERSION, "tag_rules": current_rules_hash(), "exams": body}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump(data, fh, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+    return sum(len(by_id) for by_id in body.values())
+
+
+def read_sidecar(path: Path) -> SidecarTags | None:
+    """Load a sidecar, or return None if it is missing, corrupt or written under other rules."""
+    try:
+        with path.open("rb") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != SIDECAR_VERSION:
+        return None
+    if data.get("tag_rules") != current_rules_hash():
+        return None
+    exams = data.get("exams")
+    if not isinstance(exams, dict):
+        return None
+    # Most questions share one of a few tag combinations; keep one tuple each
+    shared: dict[tuple[str, ...], tuple[str, ...]] = {}
+    try:
+        return {
+            eid: {qid: shared.setdefault(tuple(tags), tuple(tags)) for qid, tags in by_id.items()}
+            for eid, by_id in exams.items()
+        }
+    except (AttributeError, TypeError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> None:
+    from .exam_bank import ExamBank
+
+    parser = argparse.ArgumentParser(description="Tag every question bank and write the tag sidecar.")
+    parser.add_argument(
+        "question_dir", nargs="?", type=Path,
+        default=Path(os.getenv("AWS_EXAM_QUESTION_DIR", "./questions")),
+    )
+    parser.add_argument("--workers", type=int, default=0, help="tagging processes (0 = one per CPU)")
+    parser.add_argument("--output", type=Path, default=None, help=f"default: QUESTION_DIR/{SIDECAR_FILENAME}")
+    args = parser.parse_args(argv)
+
+    if not args.question_dir.is_dir():
+        parser.error(f"question directory not found: {args.question_dir}")
+    bank = ExamBank(args.question_dir, workers=args.workers)
+    path = args.output or args.question_dir / SIDECAR_FILENAME
+    count = bank.write_tag_sidecar(path)
+    print(f"Tagged {count} questions -> {path} (rules {current_rules_hash()})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -162,10 +162,11 @@ const QuestionCard = () => {
                 <div className="ml-3">
                   <h4 className="font-bold text-gray-900 mb-2">Explanation</h4>
                   <p className="text-gray-700 text-sm leading-relaxed">{question.explanation}</p>
-                  {question.references && (
+                  {question.references?.length > 0 && (
                     <div className="mt-3 pt-3 border-t border-blue-200">
                       <p className="text-xs text-gray-600">
-                        <strong>References:</strong> {question.references}
+                        <strong>References:</strong>{' '}
+                        {Array.isArray(question.references) ? question.references.join(' ') : question.references}
                       </p>
                     </div>
                   )}
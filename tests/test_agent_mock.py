@@ -36,6 +36,7 @@ def agent_env(question_dir: Path, db_path: Path):
         config.db_path = str(db_path)
         agent = ExamTutorAgent(config)
         yield agent
+        agent.close()
 
 
 class TestAgentToolCalls:
@@ -168,6 +169,51 @@ class TestAgentToolCalls:
 
         asyncio.get_event_loop().run_until_complete(run())
 
+    def test_get_questions_bulk(self, agent_env) -> None:
+        agent = agent_env
+
+        async def run():
+            await agent._setup_direct_tools()
+            from aws_exam_tools.exam_bank import ExamBank
+
+            bank = ExamBank(Path(os.environ["AWS_EXAM_QUESTION_DIR"]))
+            bank.load_all()
+            ids = bank.all_question_ids("SAA-C03-test")
+            result = await agent.call_tool("exam_get_questions", {
+                "question_ids": ids + ["SAA-C03-test:99:000000000000"],
+                "fields": ["correct_answer", "explanation"],
+            })
+            assert [q["question_id"] for q in result["questions"]] == ids
+            assert set(result["questions"][0]) == {"question_id", "correct_answer", "explanation"}
+            assert result["missing"] == ["SAA-C03-test:99:000000000000"]
+
+            bad = await agent.call_tool("exam_get_questions", {"question_ids": ids, "fields": ["answer"]})
+            assert bad["error"] == "invalid_fields"
+            too_many = await agent.call_tool("exam_get_questions", {"question_ids": ids * 30})
+            assert too_many["error"] == "too_many_questions"
+            from aws_exam_tools.exam_bank import bulk_request_error
+
+            assert too_many == bulk_request_error(ids * 30, [])
+            return result
+
+        asyncio.get_event_loop().run_until_complete(run())
+
+    def test_kb_search(self, agent_env) -> None:
+        agent = agent_env
+
+        async def run():
+            await agent._setup_direct_tools()
+            result = await agent.call_tool("kb_search", {
+                "query": "managed Kubernetes control plane", "exam_id": "SAA-C03-test",
+            })
+            assert result["results"]
+            top = result["results"][0]
+            assert "EKS" in top["correct_answer"]
+            assert top["exam_id"] == "SAA-C03-test"
+            return result
+
+        asyncio.get_event_loop().run_until_complete(run())
+
     def test_session_status(self, agent_env) -> None:
         agent = agent_env
 
@@ -2,11 +2,21 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
+from mcp_server.src.aws_exam_tools import exam_bank as exam_bank_module
+from mcp_server.src.aws_exam_tools import tagging
 from mcp_server.src.aws_exam_tools.exam_bank import ExamBank
+from mcp_server.src.aws_exam_tools.jsonstream import iter_json_array
+from mcp_server.src.aws_exam_tools.snapshot import BankSnapshot
+from mcp_server.src.aws_exam_tools.tagging import infer_tags
+from mcp_server.src.aws_exam_tools.tagsidecar import SIDECAR_FILENAME, read_sidecar
 
 
 class TestExamBankLoading:
@@ -65,6 +75,58 @@ class TestExamBankQuestions:
         assert parts[0] == "SAA-C03-test"
         assert parts[1] == "0"
 
+    def test_get_by_id_every_question(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        for exam_id in bank.list_exams():
+            for i, qid in enumerate(bank.all_question_ids(exam_id)):
+                assert bank.get_question_by_id(qid) is bank.get_question_by_index(exam_id, i)
+
+    def test_get_questions_bulk(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        ids = bank.all_question_ids("CLF-C02-test")[::-1] + bank.all_question_ids("SAA-C03-test")[:2]
+        assert [q.question_id for q in bank.get_questions(ids)] == ids
+        with pytest.raises(KeyError):
+            bank.get_questions(ids + ["NONEXISTENT:0:000000000000"])
+        assert len(bank.get_questions(ids + ["NONEXISTENT:0:000000000000"], skip_missing=True)) == 5
+
+    def test_get_questions_bulk_lazy_budget(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir, lazy=True, memory_budget_bytes=1)
+        bank.load_all()
+        clf = bank.all_question_ids("CLF-C02-test")
+        saa = bank.all_question_ids("SAA-C03-test")
+        ids = [clf[0], saa[0], clf[1], saa[1]]  # alternates exams under a one-exam budget
+        with patch(
+            "mcp_server.src.aws_exam_tools.exam_bank._parse_exam_file",
+            wraps=exam_bank_module._parse_exam_file,
+        ) as parse:
+            assert [q.question_id for q in bank.get_questions(ids)] == ids
+        assert parse.call_count == 2  # each exam parsed once, not once per alternation
+
+    @pytest.mark.parametrize("options", [{}, {"lazy": True, "memory_budget_bytes": 1}, {"image_path": "bank.image"}])
+    def test_question_ids_with_tags(self, question_dir: Path, tmp_path: Path, options: dict) -> None:
+        if "image_path" in options:
+            options = {"image_path": tmp_path / options["image_path"]}
+        bank = ExamBank(question_dir, **options)
+        bank.load_all()
+        for exam_id in ("SAA-C03-test", "CLF-C02-test"):
+            questions = bank.get_questions(bank.all_question_ids(exam_id))
+            tags = sorted({t for q in questions for t in q.tags})
+            for wanted in ([tags[0]], tags[:2], ["no_such_tag"]):
+                expected = [q.question_id for q in questions if set(wanted) & set(q.tags)]
+                assert bank.question_ids_with_tags(exam_id, wanted) == expected
+        with pytest.raises(KeyError):
+            bank.question_ids_with_tags("NONEXISTENT", ["iam"])
+
+    def test_get_by_id_unknown_raises(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        with pytest.raises(KeyError):
+            bank.get_question_by_id("SAA-C03-test:0:000000000000")
+        with pytest.raises(KeyError):
+            bank.get_question_by_id("NONEXISTENT:0:000000000000")
+
     def test_out_of_range_raises(self, question_dir: Path) -> None:
         bank = ExamBank(question_dir)
         bank.load_all()
@@ -78,6 +140,12 @@ class TestExamBankQuestions:
         assert len(ids) == 5
         assert len(set(ids)) == 5  # all unique
 
+    def test_all_question_ids_returns_copy(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        bank.all_question_ids("SAA-C03-test").clear()
+        assert len(bank.all_question_ids("SAA-C03-test")) == 5
+
     def test_correct_indices_populated(self, question_dir: Path) -> None:
         bank = ExamBank(question_dir)
         bank.load_all()
@@ -97,6 +165,27 @@ class TestExamBankQuestions:
         # CLF questions don't have explanation field
         assert q.explanation is None
 
+    def test_compact_representation(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        q0 = bank.get_question_by_index("SAA-C03-test", 0)
+        q1 = bank.get_question_by_index("SAA-C03-test", 1)
+        assert not hasattr(q0, "__dict__")
+        assert isinstance(q0.options, tuple)
+        assert isinstance(q0.correct_indices, tuple)
+        assert q0.exam_id is q1.exam_id
+        assert q0.correct is q0.options[q0.correct_indices[0]]
+
+    def test_derived_fields_precomputed(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        q = bank.get_question_by_index("SAA-C03-test", 0)
+        assert q.tags == tuple(infer_tags(q.question))
+        assert "s3_storage" in q.tags
+        assert q.correct_key == "a. s3 standard"
+        assert q.option_keys == tuple(o.lower() for o in q.options)
+        assert q.option_keys[q.correct_indices[0]] == q.correct_key
+
     def test_title_derivation(self, question_dir: Path) -> None:
         bank = ExamBank(question_dir)
         bank.load_all()
@@ -144,3 +233,654 @@ class TestExamBankEdgeCases:
         q = bank.get_question_by_index("test", 0)
         assert not q.question.startswith(":")
         assert q.question == "A question with colon prefix"
+
+
+class TestStreamingLoader:
+    """Test the incremental JSON array reader used to ingest banks."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+    def test_matches_json_loads(self, question_dir: Path, chunk_size: int) -> None:
+        path = question_dir / "SAA-C03-test.json"
+        expected = json.loads(path.read_text(encoding="utf-8"))
+        assert list(iter_json_array(path, chunk_size)) == expected
+
+    @pytest.mark.parametrize("text", ['[1, 2.5e3, "a,]", {"b": [null]}, true]', " [ ] ", '{"a": 1}', ""])
+    def test_values_split_across_chunks(self, tmp_path: Path, text: str) -> None:
+        path = tmp_path / "f.json"
+        path.write_text(text, encoding="utf-8")
+        expected = json.loads(text) if text.strip().startswith("[") else []
+        assert list(iter_json_array(path, 1)) == expected
+
+    @pytest.mark.parametrize("text", ["[1, 2", "[1,]", "[1] extra", "[1 2]"])
+    def test_malformed_raises(self, tmp_path: Path, text: str) -> None:
+        path = tmp_path / "f.json"
+        path.write_text(text, encoding="utf-8")
+        with pytest.raises(ValueError):
+            list(iter_json_array(path, 2))
+
+    def test_truncated_bank_skipped(self, question_dir: Path) -> None:
+        path = question_dir / "SAA-C03-test.json"
+        path.write_text(path.read_text(encoding="utf-8")[:-20], encoding="utf-8")
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        assert "SAA-C03-test" not in bank.list_exams()
+        lazy = ExamBank(question_dir, lazy=True)
+        lazy.load_all()
+        assert "SAA-C03-test" not in lazy.list_exams()
+
+
+class TestExamBankSnapshot:
+    """Test the compiled snapshot cache used for fast startup."""
+
+    def test_snapshot_written_and_reused(self, question_dir: Path, tmp_path: Path) -> None:
+        cache = tmp_path / "state" / "bank.snapshot"
+        cold = ExamBank(question_dir, cache_path=cache)
+        cold.load_all()
+        assert cache.exists()
+
+        warm = ExamBank(question_dir, cache_path=cache)
+        with patch("mcp_server.src.aws_exam_tools.exam_bank._parse_exam_file") as parse:
+            warm.load_all()
+        parse.assert_not_called()
+        assert warm.list_exams() == cold.list_exams()
+        assert warm.all_question_ids("SAA-C03-test") == cold.all_question_ids("SAA-C03-test")
+        assert warm.get_question_by_index("SAA-C03-test", 0) == cold.get_question_by_index("SAA-C03-test", 0)
+
+    def test_changed_file_is_reparsed(self, question_dir: Path, tmp_path: Path) -> None:
+        cache = tmp_path / "bank.snapshot"
+        ExamBank(question_dir, cache_path=cache).load_all()
+
+        (question_dir / "CLF-C02-test.json").write_text(
+            json.dumps([{"question": "Only one?", "options": ["A", "B"], "correct": "A"}]),
+            encoding="utf-8",
+        )
+        bank = ExamBank(question_dir, cache_path=cache)
+        bank.load_all()
+        assert bank.question_count("CLF-C02-test") == 1
+        assert bank.question_count("SAA-C03-test") == 5
+
+    def test_removed_file_dropped(self, question_dir: Path, tmp_path: Path) -> None:
+        cache = tmp_path / "bank.snapshot"
+        ExamBank(question_dir, cache_path=cache).load_all()
+        (question_dir / "CLF-C02-test.json").unlink()
+
+        bank = ExamBank(question_dir, cache_path=cache)
+        bank.load_all()
+        assert "CLF-C02-test" not in bank.list_exams()
+
+    def test_tag_rule_change_invalidates(self, question_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        cache = tmp_path / "bank.snapshot"
+        bank = ExamBank(question_dir, cache_path=cache)
+        bank.load_all()
+        assert not bank.has_changes()
+
+        monkeypatch.setattr(tagging, "TAG_RULES", tagging.TAG_RULES + [("ddos", [r"\bDDoS\b"])])
+        try:
+            tagging.refresh_rules()
+            assert bank.has_changes()
+            assert bank.reload() == ["CLF-C02-test", "SAA-C03-test"]
+            ids = bank.all_question_ids("SAA-C03-test")
+            assert any("ddos" in q.tags for q in bank.get_questions(ids))
+
+            fresh = ExamBank(question_dir, cache_path=cache)
+            with patch("mcp_server.src.aws_exam_tools.exam_bank._parse_exam_file") as parse:
+                fresh.load_all()
+            parse.assert_not_called()  # the reload rewrote the snapshot under the new rules
+        finally:
+            monkeypatch.undo()
+            tagging.refresh_rules()
+        assert BankSnapshot.open(cache) is None  # written under the edited rules
+
+    def test_corrupt_snapshot_ignored(self, question_dir: Path, tmp_path: Path) -> None:
+        cache = tmp_path / "bank.snapshot"
+        cache.write_bytes(b"garbage")
+        bank = ExamBank(question_dir, cache_path=cache)
+        bank.load_all()
+        assert bank.question_count("SAA-C03-test") == 5
+        assert cache.read_bytes() != b"garbage"
+
+
+class TestExamBankLazy:
+    """Test lazy per-exam loading with LRU eviction."""
+
+    def test_manifest_without_parsing(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir, lazy=True)
+        bank.load_all()
+        assert bank.list_exams() == {"CLF-C02-test": 3, "SAA-C03-test": 5}
+        assert bank.question_count("SAA-C03-test") == 5
+        assert "Solutions Architect" in bank.get_title("SAA-C03-test")
+        assert bank.resident_exams() == []
+
+    def test_exam_loaded_on_first_use(self, question_dir: Path) -> None:
+        eager = ExamBank(question_dir)
+        eager.load_all()
+        bank = ExamBank(question_dir, lazy=True)
+        bank.load_all()
+
+        qid = eager.get_question_by_index("CLF-C02-test", 1).question_id
+        assert bank.get_question_by_id(qid) == eager.get_question_by_id(qid)
+        assert bank.resident_exams() == ["CLF-C02-test"]
+        assert bank.all_question_ids("SAA-C03-test") == eager.all_question_ids("SAA-C03-test")
+
+    def test_lru_eviction_under_budget(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir, lazy=True, memory_budget_bytes=1)
+        bank.load_all()
+        bank.get_question_by_index("SAA-C03-test", 0)
+        bank.get_question_by_index("CLF-C02-test", 0)
+        # Budget fits nothing, but the exam in use always stays resident
+        assert bank.resident_exams() == ["CLF-C02-test"]
+
+        q = bank.get_question_by_index("SAA-C03-test", 0)
+        assert bank.get_question_by_id(q.question_id) == q
+        assert bank.resident_exams() == ["SAA-C03-test"]
+
+    def test_lru_keeps_recently_used(self, question_dir: Path, tmp_path: Path) -> None:
+        (question_dir / "DOP-C02-test.json").write_text(
+            json.dumps([{"question": "Q?", "options": ["A", "B"], "correct": "A"}]),
+            encoding="utf-8",
+        )
+        sizes = {f.stem: f.stat().st_size for f in question_dir.glob("*.json")}
+        budget = sizes["SAA-C03-test"] + sizes["DOP-C02-test"]
+        bank = ExamBank(question_dir, lazy=True, memory_budget_bytes=budget)
+        bank.load_all()
+        bank.all_question_ids("SAA-C03-test")
+        bank.all_question_ids("DOP-C02-test")
+        bank.all_question_ids("SAA-C03-test")  # touch: DOP-C02 becomes LRU
+        bank.all_question_ids("CLF-C02-test")
+        assert "DOP-C02-test" not in bank.resident_exams()
+        assert bank.resident_exams()[-1] == "CLF-C02-test"
+
+    def test_lazy_uses_snapshot(self, question_dir: Path, tmp_path: Path) -> None:
+        cache = tmp_path / "bank.snapshot"
+        ExamBank(question_dir, cache_path=cache).load_all()
+
+        bank = ExamBank(question_dir, cache_path=cache, lazy=True)
+        with patch("mcp_server.src.aws_exam_tools.exam_bank._parse_exam_file") as parse:
+            bank.load_all()
+            assert bank.question_count("SAA-C03-test") == 5
+            assert len(bank.all_question_ids("SAA-C03-test")) == 5
+        parse.assert_not_called()
+
+    def test_lazy_unknown_exam_raises(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir, lazy=True)
+        bank.load_all()
+        with pytest.raises(KeyError):
+            bank.get_question_by_id("NONEXISTENT:0:000000000000")
+
+    def test_lazy_refreshes_stale_snapshot(self, question_dir: Path, tmp_path: Path) -> None:
+        cache = tmp_path / "bank.snapshot"
+        ExamBank(question_dir, cache_path=cache, lazy=True).load_all()
+        (question_dir / "CLF-C02-test.json").write_text(
+            json.dumps([{"question": "Only one?", "options": ["A", "B"], "correct": "A"}]),
+            encoding="utf-8",
+        )
+        ExamBank(question_dir, cache_path=cache, lazy=True).load_all()
+
+        bank = ExamBank(question_dir, cache_path=cache)
+        with patch("mcp_server.src.aws_exam_tools.exam_bank._parse_exam_file") as parse:
+            bank.load_all()
+        parse.assert_not_called()
+        assert bank.list_exams() == {"CLF-C02-test": 1, "SAA-C03-test": 5}
+
+
+class TestExamBankParallel:
+    """Test the opt-in process-pool loader."""
+
+    def test_parallel_matches_serial(self, question_dir: Path) -> None:
+        serial = ExamBank(question_dir)
+        serial.load_all()
+        parallel = ExamBank(question_dir, workers=2)
+        parallel.load_all()
+        assert list(parallel.list_exams().items()) == list(serial.list_exams().items())
+        for exam_id in serial.list_exams():
+            assert parallel.all_question_ids(exam_id) == serial.all_question_ids(exam_id)
+            assert parallel.get_question_by_index(exam_id, 0) == serial.get_question_by_index(exam_id, 0)
+
+    def test_parallel_with_snapshot(self, question_dir: Path, tmp_path: Path) -> None:
+        cache = tmp_path / "bank.snapshot"
+        ExamBank(question_dir, cache_path=cache, workers=2).load_all()
+        bank = ExamBank(question_dir, cache_path=cache)
+        bank.load_all()
+        assert bank.question_count("SAA-C03-test") == 5
+
+    def test_parallel_lazy_manifest(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir, lazy=True, workers=2)
+        bank.load_all()
+        assert bank.list_exams() == {"CLF-C02-test": 3, "SAA-C03-test": 5}
+
+
+class TestExamBankReload:
+    """Test hot reload of changed question files."""
+
+    def _rewrite_clf(self, question_dir: Path, n: int) -> None:
+        path = question_dir / "CLF-C02-test.json"
+        path.write_text(
+            json.dumps([{"question": f"New {i}?", "options": ["A", "B"], "correct": "A"} for i in range(n)]),
+            encoding="utf-8",
+        )
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))  # defeat coarse mtimes
+
+    def test_no_change_is_noop(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        assert not bank.has_changes()
+        assert bank.reload() == []
+        assert bank.reload_metrics()["reloads"] == 0
+
+    def test_reload_reparses_only_changed(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        saa_q = bank.get_question_by_index("SAA-C03-test", 0)
+        old_clf_id = bank.get_question_by_index("CLF-C02-test", 0).question_id
+
+        self._rewrite_clf(question_dir, 2)
+        assert bank.has_changes()
+        with patch(
+            "mcp_server.src.aws_exam_tools.exam_bank._parse_exam_file",
+            wraps=exam_bank_module._parse_exam_file,
+        ) as parse:
+            assert bank.reload() == ["CLF-C02-test"]
+        assert [c.args[0].stem for c in parse.call_args_list] == ["CLF-C02-test"]
+
+        assert bank.question_count("CLF-C02-test") == 2
+        assert bank.get_question_by_index("SAA-C03-test", 0) is saa_q
+        with pytest.raises(KeyError):
+            bank.get_question_by_id(old_clf_id)
+
+        metrics = bank.reload_metrics()
+        assert metrics["reloads"] == 1
+        assert metrics["files_reparsed"] == 1
+        assert metrics["last_changed"] == ["CLF-C02-test"]
+        assert metrics["last_reload_duration_ms"] is not None
+
+    def test_reload_added_and_removed(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        (question_dir / "CLF-C02-test.json").unlink()
+        (question_dir / "DOP-C02-test.json").write_text(
+            json.dumps([{"question": "Q?", "options": ["A", "B"], "correct": "A"}]),
+            encoding="utf-8",
+        )
+        assert bank.reload() == ["CLF-C02-test", "DOP-C02-test"]
+        assert set(bank.list_exams()) == {"SAA-C03-test", "DOP-C02-test"}
+
+    def test_readers_keep_old_view_until_swap(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        old_state = bank._state
+        self._rewrite_clf(question_dir, 1)
+        bank.reload()
+        assert old_state.manifest["CLF-C02-test"].question_count == 3
+        assert bank.question_count("CLF-C02-test") == 1
+
+    def test_reload_lazy_with_snapshot(self, question_dir: Path, tmp_path: Path) -> None:
+        cache = tmp_path / "bank.snapshot"
+        bank = ExamBank(question_dir, cache_path=cache, lazy=True)
+        bank.load_all()
+        bank.all_question_ids("SAA-C03-test")
+        self._rewrite_clf(question_dir, 4)
+        assert bank.reload() == ["CLF-C02-test"]
+        assert bank.resident_exams() == ["SAA-C03-test"]
+        assert len(bank.all_question_ids("CLF-C02-test")) == 4
+
+        fresh = ExamBank(question_dir, cache_path=cache)
+        with patch("mcp_server.src.aws_exam_tools.exam_bank._parse_exam_file") as parse:
+            fresh.load_all()
+        parse.assert_not_called()
+        assert fresh.question_count("CLF-C02-test") == 4
+
+    def test_watcher_picks_up_change(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        bank.start_watching(interval=0.01)
+        try:
+            self._rewrite_clf(question_dir, 2)
+            deadline = time.monotonic() + 5
+            while bank.question_count("CLF-C02-test") != 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            bank.stop_watching()
+        assert bank.question_count("CLF-C02-test") == 2
+
+
+class TestExamBankDedup:
+    """Test content deduplication across and within banks."""
+
+    SERIES = (
+        "Note: This question is part of a series of questions that present the same scenario. "
+        "You need to build a model that predicts house prices from historical sales data. "
+        "Solution: {}. Does the solution meet the goal?"
+    )
+
+    def _write(self, qdir: Path, exam_id: str, questions: list[dict]) -> None:
+        (qdir / f"{exam_id}.json").write_text(json.dumps(questions), encoding="utf-8")
+
+    def test_identical_questions_share_body(self, question_dir: Path) -> None:
+        (question_dir / "SAA-C03-copy.json").write_bytes((question_dir / "SAA-C03-test.json").read_bytes())
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        a = bank.get_question_by_index("SAA-C03-test", 2)
+        b = bank.get_question_by_index("SAA-C03-copy", 2)
+        assert a.question_id != b.question_id
+        assert a.question is b.question
+        assert a.options is b.options
+        assert bank.duplicates_of(a.question_id) == [b.question_id]
+        metrics = bank.reload_metrics()
+        assert metrics["resident_questions"] == 13
+        assert metrics["unique_questions"] == 8
+
+    def test_near_duplicate_flagged(self, tmp_path: Path) -> None:
+        q = {
+            "question": "A company stores logs in Amazon S3 and must keep them for seven years at the lowest "
+                        "possible cost while retrieving them rarely. Which storage class should be used?",
+            "options": ["A. S3 Standard", "B. S3 Glacier Deep Archive", "C. S3 One Zone-IA"],
+            "correct": "B. S3 Glacier Deep Archive",
+        }
+        self._write(tmp_path, "SAA-C03-v1", [q])
+        self._write(tmp_path, "SAA-C03-v2", [dict(q, question=q["question"].replace("stores logs", "stores  logs "))])
+        bank = ExamBank(tmp_path)
+        bank.load_all()
+        v1 = bank.get_question_by_index("SAA-C03-v1", 0)
+        v2 = bank.get_question_by_index("SAA-C03-v2", 0)
+        assert v1.question is not v2.question
+        assert bank.duplicates_of(v1.question_id) == [v2.question_id]
+
+    def test_unseen_skips_duplicates_of_seen(self, tmp_path: Path) -> None:
+        base = {"options": ["Yes", "No"], "correct": "No"}
+        questions = [
+            dict(base, question=self.SERIES.format("You train a linear regression model")),
+            dict(base, question=self.SERIES.format("You train a linear regression model")),
+            dict(base, question=self.SERIES.format("You train a  linear regression model ")),
+            dict(base, question=self.SERIES.format("You train a k-means clustering model")),
+        ]
+        self._write(tmp_path, "DP-100-test", questions)
+        bank = ExamBank(tmp_path)
+        bank.load_all()
+        ids = bank.all_question_ids("DP-100-test")
+        # Exact and whitespace-only copies are skipped; the other solution is not
+        assert bank.unseen_question_ids("DP-100-test", [ids[0]]) == [ids[3]]
+        assert bank.unseen_question_ids("DP-100-test", []) == ids
+        assert bank.unseen_question_ids("DP-100-test", ["DP-100-test:9:gone"]) == ids
+        # Exam mode: a plain set difference, consistent with the remaining count
+        assert bank.unseen_question_ids("DP-100-test", [ids[0]], skip_duplicates=False) == ids[1:]
+
+    def test_duplicate_index_built_ahead(self, tmp_path: Path) -> None:
+        base = {"options": ["Yes", "No"], "correct": "No"}
+        self._write(tmp_path, "DP-100-test", [
+            dict(base, question=self.SERIES.format("You train a linear regression model")),
+            dict(base, question=self.SERIES.format("You train a  linear regression model ")),
+        ])
+        bank = ExamBank(tmp_path)
+        bank.load_all()
+        bank.build_duplicate_index()
+        state = bank._state
+        assert state.near_exams == {"DP-100-test"}
+        with patch.object(state.near, "add", side_effect=AssertionError("indexed under the lock")):
+            ids = bank.all_question_ids("DP-100-test")
+            assert bank.unseen_question_ids("DP-100-test", [ids[0]]) == []
+
+    def test_duplicates_of_signs_outside_the_lock(self, tmp_path: Path) -> None:
+        base = {"options": ["Yes", "No"], "correct": "No"}
+        self._write(tmp_path, "DP-100-test", [
+            dict(base, question=self.SERIES.format("You train a linear regression model")),
+            dict(base, question=self.SERIES.format("You train a  linear regression model ")),
+        ])
+        bank = ExamBank(tmp_path)
+        bank.load_all()
+        ids = bank.all_question_ids("DP-100-test")
+        with patch.object(bank._state.near, "add", side_effect=AssertionError("indexed under the lock")):
+            assert bank.duplicates_of(ids[0]) == [ids[1]]
+
+
+class TestExamBankSearch:
+    """Test BM25 full-text search over the banks."""
+
+    def test_ranks_best_match_first(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        hits = bank.search("DDoS protection")
+        assert hits
+        top = bank.get_question_by_id(hits[0].question_id)
+        assert "DDoS" in top.question
+        assert hits == sorted(hits, key=lambda h: h.score, reverse=True)
+
+    def test_searches_options_and_explanations(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        # "Elastic Kubernetes Service" appears only in an explanation
+        hits = bank.search("elastic kubernetes service")
+        assert hits[0].question_id == bank.get_question_by_index("SAA-C03-test", 1).question_id
+        # "CloudTrail" appears only in an option
+        hits = bank.search("cloudtrail")
+        assert hits[0].exam_id == "CLF-C02-test"
+
+    def test_exam_filter_and_limit(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        assert {h.exam_id for h in bank.search("EC2 instances", exam_id="CLF-C02-test")} == {"CLF-C02-test"}
+        assert len(bank.search("AWS", limit=2)) == 2
+        assert bank.search("the of and") == []
+        with pytest.raises(KeyError):
+            bank.search("S3", exam_id="NONEXISTENT")
+
+    def test_reload_rebuilds_only_changed_exam(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        bank.build_search_index()
+        saa_index = bank._state.search["SAA-C03-test"]
+        path = question_dir / "CLF-C02-test.json"
+        path.write_text(
+            json.dumps([{"question": "Which service stores container images?", "options": ["ECR", "EBS"], "correct": "ECR"}]),
+            encoding="utf-8",
+        )
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        bank.reload()
+        assert bank._state.search["SAA-C03-test"] is saa_index
+        assert bank.search("container images")[0].exam_id == "CLF-C02-test"
+
+
+class TestExamBankImage:
+    """Test serving banks from the shared memory-mapped image."""
+
+    def test_image_matches_parsed_bank(self, question_dir: Path, tmp_path: Path) -> None:
+        (question_dir / "SAA-C03-copy.json").write_bytes((question_dir / "SAA-C03-test.json").read_bytes())
+        image = tmp_path / "bank.image"
+        parsed = ExamBank(question_dir)
+        parsed.load_all()
+        mapped = ExamBank(question_dir, image_path=image)
+        mapped.load_all()
+        assert image.exists()
+        assert mapped.list_exams() == parsed.list_exams()
+        for exam_id in parsed.list_exams():
+            ids = parsed.all_question_ids(exam_id)
+            assert mapped.all_question_ids(exam_id) == ids
+            assert mapped.get_questions(ids) == parsed.get_questions(ids)
+        qid = parsed.all_question_ids("SAA-C03-test")[2]
+        assert mapped.duplicates_of(qid) == parsed.duplicates_of(qid)
+        assert mapped.reload_metrics()["unique_questions"] == parsed.reload_metrics()["unique_questions"]
+        assert [h.question_id for h in mapped.search("S3")] == [h.question_id for h in parsed.search("S3")]
+
+    def test_image_reused_without_parsing(self, question_dir: Path, tmp_path: Path) -> None:
+        image = tmp_path / "bank.image"
+        ExamBank(question_dir, image_path=image).load_all()
+        mtime = image.stat().st_mtime_ns
+
+        bank = ExamBank(question_dir, image_path=image)
+        with patch("mcp_server.src.aws_exam_tools.exam_bank._parse_exam_file") as parse:
+            bank.load_all()
+        parse.assert_not_called()
+        assert image.stat().st_mtime_ns == mtime
+        assert bank.question_count("SAA-C03-test") == 5
+
+    def test_changed_file_rebuilds_image(self, question_dir: Path, tmp_path: Path) -> None:
+        image = tmp_path / "bank.image"
+        bank = ExamBank(question_dir, image_path=image)
+        bank.load_all()
+        path = question_dir / "CLF-C02-test.json"
+        path.write_text(
+            json.dumps([{"question": "Only one?", "options": ["A", "B"], "correct": "A"}]),
+            encoding="utf-8",
+        )
+        with patch(
+            "mcp_server.src.aws_exam_tools.exam_bank._parse_exam_file",
+            wraps=exam_bank_module._parse_exam_file,
+        ) as parse:
+            assert bank.reload() == ["CLF-C02-test"]
+        assert [c.args[0] for c in parse.call_args_list] == [path]
+        assert bank.question_count("CLF-C02-test") == 1
+        assert bank.get_question_by_index("CLF-C02-test", 0).correct_indices == (0,)
+
+        fresh = ExamBank(question_dir, image_path=image)
+        fresh.load_all()
+        assert fresh.list_exams() == bank.list_exams()
+
+    def test_unwritable_image_falls_back(self, question_dir: Path, tmp_path: Path) -> None:
+        blocker = tmp_path / "not_a_dir"
+        blocker.write_text("", encoding="utf-8")
+        bank = ExamBank(question_dir, image_path=blocker / "bank.image")
+        bank.load_all()
+        assert bank._state.image is None
+        assert bank.question_count("SAA-C03-test") == 5
+
+    def test_tutor_readers_agree(self, question_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        from agent_runtime import ollama_tutor
+
+        (question_dir / "MIXED-test.json").write_text(json.dumps([{
+            "question": "Which service stores objects?",
+            "options": ["A. Amazon S3", "B. Amazon EBS"],
+            "correct": "A",
+            "explanation": "Explanation S3 is object storage.",
+            "references": "https://docs.aws.amazon.com/s3/ https://aws.amazon.com/s3/faqs/",
+        }]), encoding="utf-8")
+        image = tmp_path / "bank.image"
+        ExamBank(question_dir, image_path=image).load_all()
+        monkeypatch.setattr(ollama_tutor, "QUESTION_DIR", question_dir)
+        mapped = ollama_tutor._open_bank_image(image)
+        for path in sorted(question_dir.glob("*.json")):
+            assert ollama_tutor._parse_bank_file(path) == list(mapped[path.stem])
+        q = mapped["MIXED-test"][0]
+        assert q["explanation"] == "S3 is object storage."
+        assert q["references"] == ["https://docs.aws.amazon.com/s3/", "https://aws.amazon.com/s3/faqs/"]
+        assert q["correct_indices"] == [0]
+
+        monkeypatch.setattr(ollama_tutor, "_TAG_RULES_HASH", "other-rules")
+        assert ollama_tutor._open_bank_image(image) is None
+
+
+class TestTagSidecar:
+    """Test batch tagging into the persisted tag sidecar."""
+
+    def test_sidecar_replaces_live_tagging(self, question_dir: Path) -> None:
+        parsed = ExamBank(question_dir)
+        parsed.load_all()
+        assert ExamBank(question_dir, workers=2).write_tag_sidecar() == 8
+        assert (question_dir / SIDECAR_FILENAME).exists()
+
+        bank = ExamBank(question_dir)
+        with patch("mcp_server.src.aws_exam_tools.exam_bank.infer_tags") as infer:
+            bank.load_all()
+        infer.assert_not_called()
+        assert bank.list_exams() == parsed.list_exams()  # the sidecar is not a bank
+        for exam_id in parsed.list_exams():
+            ids = parsed.all_question_ids(exam_id)
+            assert bank.get_questions(ids) == parsed.get_questions(ids)
+
+    def test_edited_question_tagged_live(self, question_dir: Path) -> None:
+        ExamBank(question_dir).write_tag_sidecar()
+        path = question_dir / "CLF-C02-test.json"
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        raw[0]["question"] = "Which service mitigates DDoS attacks at the edge with WAF rules?"
+        path.write_text(json.dumps(raw), encoding="utf-8")
+
+        bank = ExamBank(question_dir)
+        with patch(
+            "mcp_server.src.aws_exam_tools.exam_bank.infer_tags", wraps=infer_tags,
+        ) as infer:
+            bank.load_all()
+        assert [c.args[0] for c in infer.call_args_list] == [raw[0]["question"]]
+        q = bank.get_question_by_index("CLF-C02-test", 0)
+        assert "security_encryption" in q.tags
+
+    def test_stale_rules_fall_back(self, question_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        ExamBank(question_dir).write_tag_sidecar()
+        monkeypatch.setattr(tagging, "TAG_RULES", tagging.TAG_RULES + [("ddos", [r"\bDDoS\b"])])
+        try:
+            tagging.refresh_rules()
+            assert read_sidecar(question_dir / SIDECAR_FILENAME) is None
+            bank = ExamBank(question_dir, lazy=True)
+            bank.load_all()
+            with patch(
+                "mcp_server.src.aws_exam_tools.exam_bank.infer_tags", wraps=infer_tags,
+            ) as infer:
+                assert bank.question_count("SAA-C03-test") == 5
+                bank.get_question_by_index("SAA-C03-test", 0)
+            assert infer.call_count == 5
+        finally:
+            monkeypatch.undo()
+            tagging.refresh_rules()
+        assert read_sidecar(question_dir / SIDECAR_FILENAME) is not None
+
+
+class TestExamBankTagScores:
+    """Test confidence-scored tags served by the bank."""
+
+    def test_scores_every_question(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        scores = bank.score_tags("SAA-C03-test", 0.0)
+        assert list(scores) == bank.all_question_ids("SAA-C03-test")
+        s3 = bank.get_question_by_index("SAA-C03-test", 0)
+        assert scores[s3.question_id][0].tag == "s3_storage"
+        strict = bank.score_tags("SAA-C03-test", 0.3)
+        assert strict == {qid: [s for s in ranked if s.confidence >= 0.3] for qid, ranked in scores.items()}
+        with pytest.raises(KeyError):
+            bank.score_tags("NONEXISTENT")
+
+    def test_fitted_once_until_reload(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir)
+        bank.load_all()
+        with patch.object(exam_bank_module.TagScorer, "fit", autospec=True,
+                          side_effect=exam_bank_module.TagScorer.fit) as fit:
+            bank.score_tags("SAA-C03-test")
+            bank.score_tags("CLF-C02-test")
+            assert fit.call_count == 1
+            path = question_dir / "CLF-C02-test.json"
+            path.write_text(
+                json.dumps([{"question": "Which S3 bucket setting blocks public access?", "options": ["A", "B"], "correct": "A"}]),
+                encoding="utf-8",
+            )
+            st = path.stat()
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            bank.reload()
+            (ranked,) = bank.score_tags("CLF-C02-test", 0.0).values()
+            assert fit.call_count == 2
+        assert ranked[0].tag == "s3_storage"
+
+    def test_fit_keeps_residency_and_lock_free(self, question_dir: Path) -> None:
+        bank = ExamBank(question_dir, lazy=True, memory_budget_bytes=1)
+        bank.load_all()
+        bank.get_question_by_index("SAA-C03-test", 0)
+        resident = bank.resident_exams()
+        lock_free: list[bool] = []
+        fit = exam_bank_module.TagScorer.fit
+
+        def fit_checking_lock(scorer, texts):
+            def other_request() -> None:
+                acquired = bank._state.lock.acquire(timeout=1)
+                lock_free.append(acquired)
+                if acquired:
+                    bank._state.lock.release()
+
+            # Another request can take the bank lock while the fit runs
+            waiter = threading.Thread(target=other_request)
+            waiter.start()
+            waiter.join()
+            return fit(scorer, texts)
+
+        with patch.object(exam_bank_module.TagScorer, "fit", autospec=True, side_effect=fit_checking_lock):
+            scores = bank.score_tags("CLF-C02-test", 0.0)
+        assert lock_free == [True]
+        assert len(scores) == bank.question_count("CLF-C02-test")
+        assert bank.resident_exams() == resident
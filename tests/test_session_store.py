@@ -1,11 +1,20 @@
 """Tests for the session store."""
 from __future__ import annotations
 
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
-from mcp_server.src.aws_exam_tools.session_store import SessionStore
+from mcp_server.src.aws_exam_tools.session_store import (
+    MAX_ASYNC_WRITERS, SCHEMA_VERSION, AsyncSessionStore, SessionStore,
+)
 
 
 class TestSessionCreation:
@@ -144,3 +153,568 @@ class TestWeakStrongTags:
         for i in range(10):
             store.record_answer(s.session_id, f"q-{i}", ["general"], correct=(i < 6))
         assert store.mastery_level(s.session_id) == "intermediate"
+
+
+class TestConnectionPool:
+    """Test pooled WAL-mode connections shared between threads."""
+
+    def test_connections_reused_and_wal(self, db_path: Path) -> None:
+        store = SessionStore(db_path, pool_size=2)
+        with patch.object(store, "_connect", wraps=store._connect) as connect:
+            s = store.create(exam_id="test", mode="learning", user_id=None)
+            for i in range(5):
+                store.record_answer(s.session_id, f"q-{i}", ["iam"], correct=True)
+            store.weak_tags(s.session_id)
+            store.mastery_level(s.session_id)
+        connect.assert_not_called()  # the connection opened at startup is reused
+        with store._read() as c:
+            assert c.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert c.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        store.close()
+
+    def test_pool_is_bounded(self, db_path: Path) -> None:
+        store = SessionStore(db_path, pool_size=2)
+        s = store.create(exam_id="test", mode="learning", user_id=None)
+        with store._read(), store._read():
+            waiter = threading.Thread(target=store.weak_tags, args=(s.session_id,))
+            waiter.start()
+            waiter.join(0.2)
+            assert waiter.is_alive()  # waits for a free connection
+        waiter.join(5)
+        assert not waiter.is_alive()
+        assert len(store._pool._open) == 2
+        with pytest.raises(ValueError):
+            SessionStore(db_path, pool_size=0)
+
+    def test_concurrent_answers_not_lost(self, db_path: Path) -> None:
+        store = SessionStore(db_path, pool_size=4)
+        s = store.create(exam_id="test", mode="learning", user_id=None)
+
+        def answer(worker: int) -> None:
+            for i in range(10):
+                store.record_answer(s.session_id, f"q-{worker}-{i}", ["iam"], correct=bool(i % 2))
+
+        threads = [threading.Thread(target=answer, args=(w,)) for w in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        loaded = store.load(s.session_id)
+        assert len(loaded.answers) == len(loaded.asked_ids) == 60
+        assert (loaded.correct_count, loaded.incorrect_count) == (30, 30)
+        assert loaded.tag_stats["iam"] == {"asked": 60, "correct": 30}
+
+    def test_failed_write_rolls_back(self, db_path: Path) -> None:
+        store = SessionStore(db_path, pool_size=1)
+        s = store.create(exam_id="test", mode="learning", user_id=None)
+        with pytest.raises(RuntimeError):
+            with store._write() as c:
+                c.execute("UPDATE sessions SET correct_count = 99")
+                raise RuntimeError("boom")
+        assert store.load(s.session_id).correct_count == 0
+
+
+class TestNormalizedSchema:
+    """Test append-only answer rows and the migration from JSON columns."""
+
+    def test_load_reads_one_snapshot(self, db_path: Path) -> None:
+        store = SessionStore(db_path, session_cache_size=0)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        writer = SessionStore(db_path)
+        # An answer committed between the session row and the answer rows
+        _interleaving_pool(store, "FROM sessions", lambda: writer.record_answer(sid, "q1", ["iam"], correct=True))
+        s = store.load(sid)
+        assert (s.correct_count, s.asked_ids, s.answers, s.tag_stats) == (0, [], [], {})
+        assert store.load(sid).asked_ids == ["q1"]
+
+    def _legacy_db(self, db_path: Path) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE sessions (
+                session_id TEXT PRIMARY KEY,
+                exam_id TEXT NOT NULL,
+                mode TEXT NOT NULL DEFAULT 'learning',
+                user_id TEXT,
+                created_at REAL NOT NULL,
+                asked_ids TEXT NOT NULL DEFAULT '[]',
+                answers TEXT NOT NULL DEFAULT '[]',
+                correct_count INTEGER NOT NULL DEFAULT 0,
+                incorrect_count INTEGER NOT NULL DEFAULT 0,
+                tag_stats TEXT NOT NULL DEFAULT '{}'
+            )
+        """)
+        answers = [
+            {"question_id": "q2", "tags": ["iam"], "correct": True, "timestamp": 1.0},
+            {"question_id": "q1", "tags": ["iam", "s3_storage"], "correct": False, "timestamp": 2.0},
+            {"question_id": "q2", "tags": ["iam"], "correct": False, "timestamp": 3.0},
+        ]
+        tag_stats = {"iam": {"asked": 3, "correct": 1}, "s3_storage": {"asked": 1, "correct": 0}}
+        with conn:
+            conn.execute(
+                "INSERT INTO sessions VALUES (?,?,?,?,?,?,?,?,?,?)",
+                ("old", "SAA-C03", "learning", "u1", 100.0, json.dumps(["q2", "q1"]),
+                 json.dumps(answers), 1, 2, json.dumps(tag_stats)),
+            )
+            conn.execute(
+                "INSERT INTO sessions(session_id, exam_id, created_at) VALUES ('fresh', 'CLF-C02', 200.0)"
+            )
+        conn.close()
+
+    def test_migrates_json_columns(self, db_path: Path) -> None:
+        self._legacy_db(db_path)
+        store = SessionStore(db_path)
+        s = store.load("old")
+        assert s.asked_ids == ["q2", "q1"]
+        assert [(a.question_id, a.tags, a.correct, a.timestamp) for a in s.answers] == [
+            ("q2", ["iam"], True, 1.0), ("q1", ["iam", "s3_storage"], False, 2.0), ("q2", ["iam"], False, 3.0),
+        ]
+        assert (s.correct_count, s.incorrect_count) == (1, 2)
+        assert s.tag_stats["iam"] == {"asked": 3, "correct": 1}
+        assert store.load("fresh").answers == []
+        with store._read() as c:
+            assert c.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            assert {tuple(r) for r in c.execute("SELECT answers, tag_stats FROM sessions")} == {("[]", "{}")}
+        assert store.weak_tags("old", min_asked=1) == ["s3_storage", "iam"]
+
+        s = store.record_answer("old", "q3", ["vpc_networking"], correct=True)
+        assert s.asked_ids == ["q2", "q1", "q3"]
+        assert len(s.answers) == 4 and s.correct_count == 2
+        store.close()
+        # Reopening does not migrate again
+        assert len(SessionStore(db_path).load("old").answers) == 4
+
+    def test_answers_appended(self, db_path: Path) -> None:
+        store = SessionStore(db_path)
+        s = store.create(exam_id="test", mode="learning", user_id=None)
+        for i in range(3):
+            store.record_answer(s.session_id, "q1" if i < 2 else "q2", ["iam"], correct=i == 0)
+        with store._read() as c:
+            rows = c.execute("SELECT question_id, correct FROM answers ORDER BY id").fetchall()
+            assert [tuple(r) for r in rows] == [("q1", 1), ("q1", 0), ("q2", 0)]
+            assert c.execute("SELECT COUNT(*) FROM asked_questions").fetchone()[0] == 2
+            columns = {r["name"] for r in c.execute("PRAGMA table_info(sessions)")}
+            assert not columns & {"answers", "asked_ids", "tag_stats"}
+        with pytest.raises(KeyError):
+            store.record_answer("missing", "q1", ["iam"], correct=True)
+
+
+def _interleaving_pool(store: SessionStore, after_sql: str, write) -> None:
+    """Make ``store``'s connections run ``write`` once, right after a statement containing ``after_sql``."""
+    connection = store._pool.connection
+    fired: list[bool] = []
+
+    class Interleaved:
+        def __init__(self, conn: sqlite3.Connection):
+            self._conn = conn
+
+        def __getattr__(self, name: str):
+            return getattr(self._conn, name)
+
+        def execute(self, sql: str, *args):
+            cursor = self._conn.execute(sql, *args)
+            if after_sql in sql and not fired:
+                fired.append(True)
+                write()
+            return cursor
+
+    @contextmanager
+    def interleaved():
+        with connection() as conn:
+            yield Interleaved(conn)
+
+    store._pool.connection = interleaved
+
+
+class TestTagCounters:
+    """Test per-tag counters and the ranked tag queries over them."""
+
+    def _reference(self, store: SessionStore, sid: str, min_asked: int, top_n: int, reverse: bool) -> list[str]:
+        """The original in-Python ranking over the loaded tag stats."""
+        scored = [
+            (tag, st["correct"] / st["asked"])
+            for tag, st in store.load(sid).tag_stats.items() if st["asked"] >= min_asked
+        ]
+        scored.sort(key=lambda x: x[1], reverse=reverse)
+        return [t for t, _ in scored[:top_n]]
+
+    def test_matches_in_python_ranking(self, db_path: Path) -> None:
+        store = SessionStore(db_path)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        tags = ["iam", "s3_storage", "vpc_networking", "serverless", "databases", "containers", "ml_ai"]
+        for i in range(60):
+            # Several tags tie on accuracy; ties keep first-seen order
+            store.record_answer(sid, f"q-{i}", [tags[i % 7], tags[(i * 3) % 7]], correct=i % (2 + i % 3) == 0)
+        for min_asked, top_n in ((1, 3), (2, 5), (10, 10), (100, 5)):
+            assert store.weak_tags(sid, min_asked, top_n) == self._reference(store, sid, min_asked, top_n, False)
+            assert store.strong_tags(sid, min_asked, top_n) == self._reference(store, sid, min_asked, top_n, True)
+
+    def test_queries_do_not_load_session(self, db_path: Path) -> None:
+        store = SessionStore(db_path)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        for i in range(6):
+            store.record_answer(sid, f"q-{i}", ["iam", "iam"], correct=i > 0)
+        with patch.object(store, "load") as load:
+            assert store.weak_tags(sid) == ["iam"]
+            assert store.strong_tags(sid) == ["iam"]
+            assert store.mastery_level(sid) == "advanced"
+        load.assert_not_called()
+        assert store.load(sid).tag_stats == {"iam": {"asked": 12, "correct": 10}}
+        for query in (store.weak_tags, store.strong_tags, store.mastery_level):
+            with pytest.raises(KeyError):
+                query("missing")
+
+
+class TestSessionStatus:
+    """Test the single-read, cached session status."""
+
+    def test_matches_separate_queries(self, db_path: Path) -> None:
+        store = SessionStore(db_path)
+        sid = store.create(exam_id="SAA-C03", mode="practice", user_id=None).session_id
+        tags = ["iam", "s3_storage", "vpc_networking", "serverless", "databases", "containers", "ml_ai"]
+        for i in range(40):
+            qid = f"q-{i % 30}"  # some questions asked twice
+            store.record_answer(sid, qid, [tags[i % 7], tags[(i * 3) % 7]], correct=i % (2 + i % 3) == 0)
+        st = store.status(sid)
+        s = store.load(sid)
+        assert (st.exam_id, st.mode, st.asked_count) == ("SAA-C03", "practice", 30)
+        assert (st.correct_count, st.incorrect_count) == (s.correct_count, s.incorrect_count)
+        assert st.accuracy == s.correct_count / 30
+        assert list(st.weak_tags) == store.weak_tags(sid)
+        assert list(st.strong_tags) == store.strong_tags(sid)
+        assert st.mastery_level == store.mastery_level(sid)
+
+        fresh = store.create(exam_id="CLF-C02", mode="learning", user_id=None).session_id
+        st = store.status(fresh)
+        assert (st.asked_count, st.accuracy, st.weak_tags, st.mastery_level) == (0, 0.0, (), "beginner")
+        with pytest.raises(KeyError):
+            store.status("missing")
+
+    def test_cached_until_next_answer(self, db_path: Path) -> None:
+        store = SessionStore(db_path)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        store.record_answer(sid, "q1", ["iam"], correct=True)
+        first = store.status(sid)
+        with patch.object(store._pool, "connection") as connection:
+            assert store.status(sid) is first
+        connection.assert_not_called()
+        store.record_answer(sid, "q2", ["iam"], correct=False)
+        st = store.status(sid)
+        assert (st.asked_count, st.correct_count, st.incorrect_count) == (2, 1, 1)
+
+    def test_read_racing_a_write_is_not_cached(self, db_path: Path) -> None:
+        store = SessionStore(db_path)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        version = store._status_cache.version(sid)
+        stale = store.status(sid)
+        store._status_cache.invalidate(sid)  # as record_answer does after committing
+        store._status_cache.put(sid, version, stale)
+        assert store._status_cache.get(sid) is None
+
+    def test_load_racing_a_write_is_not_cached(self, db_path: Path) -> None:
+        store = SessionStore(db_path)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        store.invalidate(sid)
+        write = store._sessions.write
+
+        def write_then_load(key: str, apply):
+            written = write(key, apply)
+            store.load(key)  # misses the cache and reads the state before the commit
+            return written
+
+        with patch.object(store._sessions, "write", write_then_load):
+            s = store.record_answer(sid, "q1", ["iam"], correct=True)
+        assert s.asked_ids == ["q1"]
+        assert store.load(sid).asked_ids == ["q1"]
+
+    def test_cache_is_bounded(self, db_path: Path) -> None:
+        store = SessionStore(db_path, status_cache_size=2)
+        sids = [store.create(exam_id="test", mode="learning", user_id=None).session_id for _ in range(3)]
+        for sid in sids:
+            store.record_answer(sid, "q1", ["iam"], correct=True)
+            store.status(sid)
+        assert list(store._status_cache._entries) == sids[1:]
+        cache = store._status_cache
+        version = cache.version(sids[0])
+        for i in range(200):  # versions of uncached sessions are forgotten
+            cache.invalidate(f"other-{i}")
+        assert len(cache._versions) <= 2 * 2 + 64
+        cache.put(sids[0], version, "stale")  # still refused after the versions are dropped
+        assert cache.get(sids[0]) is None
+        assert cache.get(sids[2]) is not None
+
+
+class TestSessionCache:
+    """Test the write-through cache of hot sessions."""
+
+    def test_hot_loop_served_from_memory(self, db_path: Path) -> None:
+        store = SessionStore(db_path)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        store.record_answer(sid, "q0", ["iam"], correct=True)
+        with patch.object(store._pool, "connection", wraps=store._pool.connection) as connection:
+            for i in range(1, 4):  # next -> submit -> next ...
+                store.load(sid)
+                s = store.record_answer(sid, f"q{i}", ["iam", "s3_storage"], correct=i % 2 == 0)
+        assert connection.call_count == 3  # one write each, no reads
+        assert s.asked_ids == ["q0", "q1", "q2", "q3"]
+        info = store.cache_info()["sessions"]
+        assert (info["hits"], info["size"]) == (7, 1)  # every load, including record_answer's result
+
+    def test_write_through_matches_database(self, db_path: Path) -> None:
+        store = SessionStore(db_path)
+        sid = store.create(exam_id="test", mode="practice", user_id="u1").session_id
+        store.load(sid)
+        for i in range(8):
+            store.record_answer(sid, f"q{i % 5}", ["iam", "vpc_networking"][: 1 + i % 2], correct=i % 3 == 0)
+        cached = store.load(sid)
+        store.invalidate(sid)
+        assert store.load(sid) == cached
+        assert SessionStore(db_path).load(sid) == cached
+
+    def test_loads_are_copies(self, db_path: Path) -> None:
+        store = SessionStore(db_path)
+        s = store.create(exam_id="test", mode="learning", user_id=None)
+        s.asked_ids.append("not-saved")
+        loaded = store.load(s.session_id)
+        loaded.tag_stats["iam"] = {"asked": 9, "correct": 9}
+        loaded.correct_count = 9
+        assert store.load(s.session_id) == SessionStore(db_path).load(s.session_id)
+        assert store.load(s.session_id).asked_ids == []
+
+    def test_invalidate_and_failed_write(self, db_path: Path) -> None:
+        store = SessionStore(db_path)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        other = SessionStore(db_path)  # another process writing the same database
+        other.record_answer(sid, "q1", ["iam"], correct=True)
+        assert store.load(sid).correct_count == 0  # stale until invalidated
+        store.invalidate()
+        assert store.load(sid).correct_count == 1
+
+        with patch(
+            "mcp_server.src.aws_exam_tools.session_store._apply_answer", side_effect=RuntimeError("boom"),
+        ):
+            with pytest.raises(RuntimeError):
+                store.record_answer(sid, "q2", ["iam"], correct=True)
+        s = store.load(sid)
+        assert (s.asked_ids, s.correct_count) == (["q1"], 1)  # rolled back, cache dropped
+
+    def test_disabled_and_bounded(self, db_path: Path) -> None:
+        store = SessionStore(db_path, session_cache_size=0)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        store.record_answer(sid, "q1", ["iam"], correct=True)
+        assert store.load(sid).correct_count == 1
+        assert store.cache_info()["sessions"]["size"] == 0
+
+        store = SessionStore(db_path, session_cache_size=2)
+        sids = [store.create(exam_id="test", mode="learning", user_id=None).session_id for _ in range(3)]
+        info = store.cache_info()["sessions"]
+        assert (info["size"], info["evictions"]) == (2, 1)
+        store.load(sids[0])
+        info = store.cache_info()["sessions"]
+        assert (info["misses"], info["hit_rate"]) == (1, 0.0)
+        store.load(sids[0])
+        assert store.cache_info()["sessions"]["hit_rate"] == 0.5
+
+
+class TestGroupCommit:
+    """Test write-behind group commit of answers."""
+
+    def test_concurrent_answers_share_a_transaction(self, db_path: Path) -> None:
+        store = SessionStore(db_path, write_behind=True, batch_size=5, batch_delay=10.0)
+        sids = [store.create(exam_id="test", mode="learning", user_id=None).session_id for _ in range(5)]
+        workers = [
+            threading.Thread(target=store.record_answer, args=(sid, "q1", ["iam"], True)) for sid in sids
+        ]
+        with store._group.writer():  # one more writer on its way: hold the batch until it is full
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+        info = store.cache_info()["group_commit"]
+        assert (info["batches"], info["answers"], info["queued"]) == (1, 5, 0)
+        reopened = SessionStore(db_path)
+        assert all(reopened.load(sid).correct_count == 1 for sid in sids)
+        store.close()
+
+    def test_queued_answers_are_read_back(self, db_path: Path) -> None:
+        store = SessionStore(db_path, write_behind=True, durability="queued", batch_delay=10.0)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        s = store.record_answer(sid, "q1", ["iam"], correct=False)
+        assert (s.asked_ids, s.incorrect_count) == (["q1"], 1)
+        assert store.cache_info()["group_commit"]["queued"] == 1
+        store.invalidate(sid)  # a cache miss waits for the session's commit
+        assert store.load(sid) == s
+        store.record_answer(sid, "q2", ["iam"], correct=False)
+        assert store.weak_tags(sid) == ["iam"]
+        assert store.status(sid).asked_count == 2
+        with pytest.raises(KeyError):
+            store.record_answer("nope", "q1", ["iam"], correct=True)
+        store.close()
+
+    def test_uncached_queued_answer_does_not_wait(self, db_path: Path) -> None:
+        store = SessionStore(db_path, session_cache_size=0, write_behind=True, durability="queued", batch_delay=10.0)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        s = store.record_answer(sid, "q1", ["iam"], correct=True)
+        assert (s.asked_ids, s.correct_count, s.tag_stats) == (["q1"], 1, {"iam": {"asked": 1, "correct": 1}})
+        # Waiting would have forced the 10 s batch out early
+        assert store.cache_info()["group_commit"] == {"queued": 1, "batches": 0, "answers": 0, "mean_batch": 0.0}
+        store.close()
+        assert SessionStore(db_path).load(sid) == s
+
+    def test_settling_one_session_does_not_hold_up_another(self, db_path: Path) -> None:
+        store = SessionStore(db_path, session_cache_size=0, write_behind=True, durability="queued", batch_delay=10.0)
+        busy, idle = (store.create(exam_id="test", mode="learning", user_id=None).session_id for _ in range(2))
+        store.record_answer(busy, "q1", ["iam"], correct=True)
+        release = threading.Event()
+        commit = store._group._commit
+        store._group._commit = lambda batch: (release.wait(), commit(batch))
+        # The next uncached answer to ``busy`` waits for the first one's commit
+        settling = threading.Thread(target=store.record_answer, args=(busy, "q2", ["iam"], True))
+        settling.start()
+        while not store._group._urgent:
+            time.sleep(0.001)
+        other = threading.Thread(target=store.record_answer, args=(idle, "q1", ["iam"], True))
+        other.start()
+        other.join(timeout=5)
+        stalled = other.is_alive()
+        release.set()
+        settling.join()
+        other.join()
+        store.close()
+        assert not stalled
+        assert SessionStore(db_path).load(busy).asked_ids == ["q1", "q2"]
+
+    def test_close_commits_queued_answers(self, db_path: Path) -> None:
+        store = SessionStore(db_path, write_behind=True, durability="queued", batch_delay=10.0)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        for i in range(3):
+            store.record_answer(sid, f"q{i}", ["s3_storage"], correct=True)
+        store.close()
+        s = SessionStore(db_path).load(sid)
+        assert (s.asked_ids, s.correct_count) == (["q0", "q1", "q2"], 3)
+        with pytest.raises(RuntimeError):
+            store.record_answer(sid, "q3", ["iam"], correct=True)
+
+    def test_failed_answer_leaves_batch_committed(self, db_path: Path) -> None:
+        store = SessionStore(db_path, write_behind=True, batch_size=2, batch_delay=10.0)
+        good = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        gone = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        with store._write() as c:  # deleted behind the cache's back
+            c.execute("DELETE FROM sessions WHERE session_id = ?", (gone,))
+        errors: list[Exception] = []
+
+        def answer_gone() -> None:
+            try:
+                store.record_answer(gone, "q1", ["iam"], correct=True)
+            except KeyError as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=answer_gone)
+        with store._group.writer():
+            worker.start()
+            s = store.record_answer(good, "q1", ["iam"], correct=True)
+        worker.join()
+        assert len(errors) == 1
+        assert s.correct_count == 1
+        assert SessionStore(db_path).load(good).correct_count == 1
+        assert store.cache_info()["group_commit"]["batches"] == 1
+        store.close()
+
+    def test_lone_writer_is_not_delayed(self, db_path: Path) -> None:
+        store = SessionStore(db_path, write_behind=True, batch_delay=10.0)
+        sid = store.create(exam_id="test", mode="learning", user_id=None).session_id
+        for i in range(3):  # each commits at once: no other writer can join its batch
+            store.record_answer(sid, f"q{i}", ["iam"], correct=True)
+        assert store.cache_info()["group_commit"]["batches"] == 3
+        store.close()
+
+    def test_durability_validation(self, db_path: Path) -> None:
+        with pytest.raises(ValueError):
+            SessionStore(db_path, durability="sometimes")
+        with pytest.raises(ValueError):
+            SessionStore(db_path, durability="queued")
+        store = SessionStore(db_path, durability="fsync")
+        with store._read() as c:
+            assert c.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+
+
+class TestAsyncSessionStore:
+    """Test the awaitable store used by the async tools."""
+
+    def test_round_trip(self, db_path: Path) -> None:
+        store = AsyncSessionStore(SessionStore(db_path))
+
+        async def run() -> tuple:
+            s = await store.create(exam_id="test", mode="learning", user_id=None)
+            await store.record_answer(s.session_id, "q1", ["iam"], correct=False)
+            await store.record_answer(s.session_id, "q2", ["iam"], correct=False)
+            return (
+                await store.load(s.session_id), await store.status(s.session_id),
+                await store.weak_tags(s.session_id), await store.mastery_level(s.session_id),
+            )
+
+        s, st, weak, mastery = asyncio.run(run())
+        store.close()
+        assert (s.asked_ids, st.incorrect_count, weak, mastery) == (["q1", "q2"], 2, ["iam"], st.mastery_level)
+        assert SessionStore(db_path).load(s.session_id) == s
+
+    def test_database_work_leaves_the_event_loop(self, db_path: Path) -> None:
+        store = AsyncSessionStore(SessionStore(db_path, session_cache_size=0))
+        sid = store.store.create(exam_id="test", mode="learning", user_id=None).session_id
+        threads: set[str] = set()
+        read = store.store._read
+
+        def recording_read():
+            threads.add(threading.current_thread().name)
+            return read()
+
+        async def run() -> None:
+            with patch.object(store.store, "_read", recording_read):
+                await asyncio.gather(store.load(sid), store.status(sid), store.weak_tags(sid))
+
+        asyncio.run(run())
+        store.close()
+        assert threads and all(name.startswith("session-store-reader") for name in threads)
+
+    def test_cache_hits_skip_the_executor(self, db_path: Path) -> None:
+        store = AsyncSessionStore(SessionStore(db_path))
+        sid = store.store.create(exam_id="test", mode="learning", user_id=None).session_id
+        store.store.status(sid)
+
+        async def run() -> None:
+            with patch.object(store, "_run") as run_in_executor:
+                await store.load(sid)
+                await store.status(sid)
+            assert run_in_executor.call_count == 0
+
+        asyncio.run(run())
+        store.close()
+
+    def test_misses_counted_once(self, db_path: Path) -> None:
+        store = AsyncSessionStore(SessionStore(db_path))
+        sid = store.store.create(exam_id="test", mode="learning", user_id=None).session_id
+        store.store.invalidate(sid)
+
+        async def run() -> None:
+            await store.load(sid)
+            await store.load(sid)
+            await store.status(sid)
+
+        asyncio.run(run())
+        info = store.cache_info()
+        store.close()
+        assert (info["sessions"]["hits"], info["sessions"]["misses"]) == (1, 1)
+        assert (info["status"]["hits"], info["status"]["misses"]) == (0, 1)
+
+    def test_writer_threads_are_capped(self, db_path: Path) -> None:
+        store = AsyncSessionStore(SessionStore(db_path, write_behind=True, batch_size=50))
+        assert store._writer._max_workers == MAX_ASYNC_WRITERS
+        store.close()
+
+    def test_unknown_session_raises(self, db_path: Path) -> None:
+        store = AsyncSessionStore(SessionStore(db_path))
+        with pytest.raises(KeyError):
+            asyncio.run(store.load("nope"))
+        with pytest.raises(KeyError):
+            asyncio.run(store.record_answer("nope", "q1", ["iam"], correct=True))
+        store.close()
@@ -1,7 +1,21 @@
 """Tests for the auto-tagging engine."""
 from __future__ import annotations
 
-from mcp_server.src.aws_exam_tools.tagging import infer_tags
+import re
+from unittest.mock import patch
+
+import pytest
+
+from mcp_server.src.aws_exam_tools import tagging
+from mcp_server.src.aws_exam_tools.aho_corasick import Automaton, KeywordTagger, expand_pattern
+from mcp_server.src.aws_exam_tools.tagging import TAG_RULES, infer_tags
+from mcp_server.src.aws_exam_tools.tagscoring import TagScore, TagScorer, evaluate
+
+
+def _reference_tags(text: str, rules=TAG_RULES) -> list[str]:
+    """One re.search per pattern: the straightforward definition of tagging."""
+    tags = {tag for tag, patterns in rules if any(re.search(p, text, re.IGNORECASE) for p in patterns)}
+    return sorted(tags) if tags else ["general"]
 
 
 class TestTagging:
@@ -68,3 +82,180 @@ class TestTagging:
     def test_tags_are_unique(self) -> None:
         tags = infer_tags("S3 bucket in S3 with S3 lifecycle")
         assert len(tags) == len(set(tags))
+
+
+class TestCompiledTagging:
+    """The single-pass matcher must agree with per-pattern searching."""
+
+    @pytest.mark.parametrize("text", [
+        "Point Route 53 at the routing table of the VPC",
+        "Use Reserved Instances and SNS topics; load into Redshift",
+        "Enable AWS X-Ray tracing and CI/CD with pre-signed URLs",
+        "federated identities migrating to Snowball Edge",
+        "logging vs logs vs log, streams vs stream, messages",
+        "s3 BUCKET iam Sagemaker kubernetes",
+        "subroutine, policyholder, reroute, XS3, EC2s",
+        "",
+    ])
+    def test_matches_reference(self, text: str) -> None:
+        assert infer_tags(text) == _reference_tags(text)
+
+    def test_patterns_without_literal_prefix_fall_back(self) -> None:
+        rules = [
+            ("odd", [r"(?:foo|bar)baz", r"\bx?yz\b", r"\bab|cd"]),
+            ("plain", [r"\bQueue\b"]),
+        ]
+        dispatch, fallback = tagging._compile(rules)
+        assert [tag for tag, _ in fallback] == ["odd"]
+        assert list(dispatch) == ["qu"]
+        with patch.object(tagging, "_DISPATCH", dispatch), patch.object(tagging, "_FALLBACK", fallback), \
+                patch.object(tagging, "_memo", tagging.TagMemo(0)):
+            for text in ("barbaz", "a yz b", "xcd", "the queue", "nothing here"):
+                assert infer_tags(text) == _reference_tags(text, rules)
+
+
+class TestAhoCorasickBackend:
+    """The keyword automaton must return the regex backend's tags."""
+
+    @pytest.fixture
+    def aho_corasick(self):
+        tagging.use_backend("aho-corasick")
+        yield
+        tagging.use_backend("regex")
+
+    @pytest.mark.parametrize("text", [
+        "Point Route 53 at the routing table of the VPC",
+        "Use Reserved Instances and SNS topics; load into Redshift",
+        "Enable AWS X-Ray tracing and CI/CD with pre-signed URLs",
+        "federated identities migrating to Snowball Edge",
+        "logging vs logs vs log, streams vs stream, messages",
+        "s3 BUCKET iam Sagemaker kubernetes",
+        "subroutine, policyholder, reroute, XS3, EC2s, S3_bucket",
+        "İAM policy in İstanbul",
+        "",
+    ])
+    def test_matches_reference(self, aho_corasick, text: str) -> None:
+        assert infer_tags(text) == _reference_tags(text)
+
+    def test_unknown_backend_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            tagging.use_backend("nope")
+
+    def test_expand_pattern(self) -> None:
+        assert expand_pattern(r"\brout(e|ing)\b") == (["route", "routing"], True)
+        assert expand_pattern(r"\bfederat") == (["federat"], False)
+        assert expand_pattern(r"\bCI/CD\b") == (["ci/cd"], True)
+        assert expand_pattern(r"\bRoute\s*53\b") is None
+        assert expand_pattern(r"\bSTS?\b") is None
+        assert expand_pattern(r"\bab|cd") is None
+        assert expand_pattern(r"EC2") is None
+
+    def test_automaton_reports_overlapping_matches(self) -> None:
+        automaton = Automaton()
+        for keyword in ("he", "she", "his", "hers"):
+            automaton.add(keyword, keyword)
+        automaton.build()
+        assert sorted(automaton.iter("ushers")) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+    def test_non_literal_rules_fall_back_to_regex(self) -> None:
+        tagger = KeywordTagger([("dns", [r"\bRoute\s*53\b", r"\bDNS\b"])])
+        assert [tag for tag, _ in tagger.fallback] == ["dns"]
+        assert tagger.tags("Route   53 records") == {"dns"}
+        assert tagger.tags("plain dns") == {"dns"}
+        assert tagger.tags("Route 54") == set()
+
+
+class TestTagMemo:
+    """Memoized tagging: repeated texts skip matching, rule edits invalidate."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_memo(self):
+        with patch.object(tagging, "_memo", tagging.TagMemo(2)):
+            yield
+
+    def test_repeated_text_is_a_hit(self) -> None:
+        text = "Encrypt the S3 bucket with KMS"
+        with patch.object(tagging, "_regex_tags", wraps=tagging._regex_tags) as match:
+            first = infer_tags(text)
+            assert infer_tags(text) == first
+            first.append("mutated")  # callers get a fresh list each time
+            assert "mutated" not in infer_tags(text)
+        assert match.call_count == 1
+        info = tagging.tag_cache_info()
+        assert (info["hits"], info["misses"], info["size"]) == (2, 1, 1)
+
+    def test_lru_bound(self) -> None:
+        for text in ("IAM role", "VPC subnet", "IAM role", "Lambda function"):
+            infer_tags(text)
+        info = tagging.tag_cache_info()
+        assert (info["size"], info["evictions"]) == (2, 1)
+        infer_tags("IAM role")  # kept: it was used more recently than "VPC subnet"
+        assert tagging.tag_cache_info()["hits"] == 2
+
+    def test_rule_change_invalidates(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        text = "Store images in Amazon ECR and deploy with Copilot"
+        before = infer_tags(text)
+        assert tagging.refresh_rules() is False
+        old_hash = tagging.current_rules_hash()
+        monkeypatch.setattr(tagging, "TAG_RULES", TAG_RULES + [("copilot", [r"\bCopilot\b"])])
+        try:
+            assert tagging.refresh_rules() is True
+            assert tagging.current_rules_hash() != old_hash
+            assert tagging.tag_cache_info()["size"] == 0
+            assert infer_tags(text) == sorted(before + ["copilot"])
+        finally:
+            monkeypatch.undo()
+            tagging.refresh_rules()
+        assert infer_tags(text) == before
+
+    def test_tutor_copy_matches_rules(self) -> None:
+        # The tutor reads the tag sidecar only if its inline rules hash equals ours
+        from agent_runtime import ollama_tutor
+
+        assert ollama_tutor.TAG_RULES == TAG_RULES
+        assert ollama_tutor._TAG_RULES_HASH == tagging.rules_hash()
+
+
+class TestTagScorer:
+    """Test confidence-scored tags from fitted TF-IDF profiles."""
+
+    TEXTS = [
+        "Which S3 storage class suits infrequently accessed objects in a bucket? Use S3 Standard-IA.",
+        "Move old objects in the S3 bucket to Glacier with a lifecycle policy.",
+        "Grant the developers an IAM role with least privilege permissions.",
+        "Attach an IAM policy to the role so the user can assume it.",
+        "Run the function on AWS Lambda behind API Gateway, fully serverless.",
+        "Trigger a Lambda function when a message arrives; no servers to manage.",
+        "Choose an EC2 instance type and an Auto Scaling group for the web tier.",
+        "Launch EC2 instances from an AMI in two Availability Zones.",
+    ]
+
+    def test_ranks_matching_tag_first(self) -> None:
+        scorer = TagScorer()
+        ranked = scorer.score(scorer.fit(self.TEXTS), 0.0)
+        assert [ranked[i][0].tag for i in (0, 2, 4)] == ["s3_storage", "iam", "serverless"]
+        for scores in ranked:
+            confidences = [s.confidence for s in scores]
+            assert confidences == sorted(confidences, reverse=True)
+            assert all(0.0 < c <= 1.0 for c in confidences)
+
+    def test_threshold_and_unseen_text(self) -> None:
+        scorer = TagScorer()
+        scorer.fit(self.TEXTS)
+        everything, strict = (scorer.score_texts(["Store the objects in an S3 bucket."], t)[0] for t in (0.0, 0.5))
+        assert everything[0].tag == "s3_storage"
+        assert strict == [s for s in everything if s.confidence >= 0.5]
+        assert scorer.score_texts(["Nothing relevant here at all."]) == [[]]
+
+    def test_evaluate(self) -> None:
+        predicted = [
+            [TagScore("iam", 0.6), TagScore("s3_storage", 0.2)],
+            [TagScore("serverless", 0.3)],
+        ]
+        labels = [["iam"], ["ec2_compute"]]
+        loose, strict = evaluate(predicted, labels, thresholds=(0.1, 0.5))
+        assert (loose["precision"], loose["recall"]) == (round(1 / 3, 3), 0.5)
+        assert (strict["precision"], strict["recall"], strict["f1"]) == (1.0, 0.5, round(2 / 3, 3))
+        # "general" means no tag: predicting nothing for it is right
+        (row,) = evaluate([[]], [["general"]], thresholds=(0.1,))
+        assert (row["precision"], row["recall"]) == (1.0, 1.0)